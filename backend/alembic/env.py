@@ -30,6 +30,9 @@ target_metadata = AppBase.metadata
 # manually editing alembic.ini. This replaces the sqlalchemy.url from the file.
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
+# arbitrary key for the advisory lock held while migrating
+MIGRATION_LOCK_ID = 7421053
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -74,6 +77,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # serialize concurrent `alembic upgrade` runs (e.g. several instances
+        # deploying at once); the lock is released when the connection closes
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"SELECT pg_advisory_lock({MIGRATION_LOCK_ID})")
+            connection.commit()
+
         context.configure(
             connection=connection, target_metadata=target_metadata
         )
@@ -0,0 +1,86 @@
+"""add user_settings table and import ./user_settings.json
+
+Revision ID: 0b6e3d8a4f21
+Revises: f2c9d41e7a05
+Create Date: 2026-10-19
+"""
+
+import json
+import os
+from pathlib import Path
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '0b6e3d8a4f21'
+down_revision = 'f2c9d41e7a05'
+branch_labels = None
+depends_on = None
+
+# The file the API used to rewrite on every settings change (relative to backend/)
+LEGACY_SETTINGS_FILE = os.getenv(
+    "USER_SETTINGS_IMPORT_FILE",
+    str(Path(__file__).resolve().parents[2] / "user_settings.json"),
+)
+
+
+def _load_legacy_settings():
+    try:
+        with open(LEGACY_SETTINGS_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Skipping settings import, could not read {LEGACY_SETTINGS_FILE}: {e}")
+        return {}
+    rows = {}
+    for key, value in (data or {}).items():
+        try:
+            user_id = int(key)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(value, dict):
+            rows[user_id] = value
+    return rows
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    table_exists = conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = 'user_settings'")
+    ).first() is not None
+
+    if not table_exists:
+        op.create_table(
+            'user_settings',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('settings', postgresql.JSONB(astext_type=sa.Text()), nullable=False,
+                      server_default=sa.text("'{}'::jsonb")),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+
+    legacy = _load_legacy_settings()
+    if legacy:
+        # One statement; entries for users that no longer exist are dropped, rows
+        # already written through the API win over the file.
+        conn.execute(
+            sa.text("""
+                INSERT INTO user_settings (user_id, settings)
+                SELECT t.user_id, CAST(t.settings AS jsonb)
+                FROM unnest(CAST(:user_ids AS integer[]), CAST(:settings AS text[])) AS t(user_id, settings)
+                JOIN users u ON u.id = t.user_id
+                ON CONFLICT (user_id) DO NOTHING
+            """),
+            {
+                "user_ids": list(legacy.keys()),
+                "settings": [json.dumps(v) for v in legacy.values()],
+            },
+        )
+        print(f"Imported settings for up to {len(legacy)} users from {LEGACY_SETTINGS_FILE}")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS user_settings")
@@ -0,0 +1,45 @@
+"""add users.token_version and token_revocations
+
+Revision ID: 1c4f7a9e2b63
+Revises: 0b6e3d8a4f21
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '1c4f7a9e2b63'
+down_revision = '0b6e3d8a4f21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    column_exists = conn.execute(
+        sa.text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'users' AND column_name = 'token_version'"
+        )
+    ).first() is not None
+    if not column_exists:
+        op.add_column('users', sa.Column('token_version', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+    table_exists = conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = 'token_revocations'")
+    ).first() is not None
+    if not table_exists:
+        op.create_table(
+            'token_revocations',
+            sa.Column('user_id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('token_version', sa.Integer(), nullable=False),
+            sa.Column('revoked_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        )
+        op.create_index('ix_token_revocations_revoked_at', 'token_revocations', ['revoked_at'], unique=False)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS token_revocations")
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS token_version")
@@ -0,0 +1,43 @@
+"""add read flag and listing indexes to notifications
+
+Revision ID: 5e2f8a1c9d47
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '5e2f8a1c9d47'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    col_exists = conn.execute(
+        sa.text("SELECT 1 FROM information_schema.columns WHERE table_name = 'notifications' AND column_name = 'read'")
+    ).first() is not None
+
+    if not col_exists:
+        op.add_column('notifications', sa.Column('read', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+
+    # Keyset pagination: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_notifications_user_id_created_at "
+        "ON notifications (user_id, created_at, id)"
+    )
+    # Unread badge: COUNT(*) WHERE user_id = ? AND read = false (index-only scan)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_notifications_user_id_unread "
+        "ON notifications (user_id) WHERE read = false"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_notifications_user_id_unread")
+    op.execute("DROP INDEX IF EXISTS ix_notifications_user_id_created_at")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS read")
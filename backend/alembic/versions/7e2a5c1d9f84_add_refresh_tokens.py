@@ -0,0 +1,44 @@
+"""add refresh_tokens store for rotation and reuse detection
+
+Revision ID: 7e2a5c1d9f84
+Revises: 1c4f7a9e2b63
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '7e2a5c1d9f84'
+down_revision = '1c4f7a9e2b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    table_exists = conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = 'refresh_tokens'")
+    ).first() is not None
+
+    if not table_exists:
+        op.create_table(
+            'refresh_tokens',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('jti_hash', sa.String(length=64), nullable=False),
+            sa.Column('family_id', sa.String(length=32), nullable=False),
+            sa.Column('parent_id', sa.Integer(), nullable=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('expires_at', sa.TIMESTAMP(), nullable=False),
+            sa.Column('used_at', sa.TIMESTAMP(), nullable=True),
+            sa.Column('revoked_at', sa.TIMESTAMP(), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_refresh_tokens_jti_hash', 'refresh_tokens', ['jti_hash'], unique=True)
+        op.create_index('ix_refresh_tokens_family_id', 'refresh_tokens', ['family_id'], unique=False)
+        op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS refresh_tokens")
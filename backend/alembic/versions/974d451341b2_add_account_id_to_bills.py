@@ -4,12 +4,16 @@ Revision ID: 974d451341b2
 Revises: 
 Create Date: 2026-01-03 10:39:06.912545
 
+Baseline of the chain: creates the core tables (as the models defined
+them before the later revisions) when they do not exist yet, so
+`alembic upgrade head` builds a fresh database and is a no-op on one
+that predates migrations. The autogenerated body this revision used to
+have dropped every table.
 """
 from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision: str = '974d451341b2'
@@ -18,129 +22,103 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+def _table_exists(conn, table: str) -> bool:
+    return conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = :t"), {"t": table}
+    ).first() is not None
+
+
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_index(op.f('ix_notifications_id'), table_name='notifications')
-    op.drop_table('notifications')
-    op.drop_table('budgets')
-    op.drop_table('admin_logs')
-    op.drop_table('transactions')
-    op.drop_table('alerts')
-    op.drop_table('rewards')
-    op.drop_table('bills')
-    op.drop_table('accounts')
-    op.drop_table('users')
-    # ### end Alembic commands ###
+    conn = op.get_bind()
+
+    if not _table_exists(conn, 'users'):
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('email', sa.String(length=255), nullable=False),
+            sa.Column('password', sa.String(length=255), nullable=False),
+            sa.Column('phone', sa.String(length=20), nullable=True),
+            sa.Column('role', sa.String(length=50), server_default='user', nullable=False),
+            sa.Column('kyc_status', sa.String(length=20), server_default='unverified', nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_users_id', 'users', ['id'], unique=False)
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    if not _table_exists(conn, 'accounts'):
+        op.create_table(
+            'accounts',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('bank_name', sa.String(length=255), nullable=False),
+            sa.Column('account_type', sa.String(length=20), nullable=False),
+            sa.Column('masked_account', sa.String(length=255), nullable=True),
+            sa.Column('currency', sa.VARCHAR(length=3), server_default='USD', nullable=True),
+            sa.Column('balance', sa.NUMERIC(15, 2), server_default=sa.text('0'), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_accounts_id', 'accounts', ['id'], unique=False)
+
+    if not _table_exists(conn, 'transactions'):
+        op.create_table(
+            'transactions',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('account_id', sa.Integer(), sa.ForeignKey('accounts.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('description', sa.String(length=255), nullable=True),
+            sa.Column('category', sa.String(length=100), nullable=True),
+            sa.Column('amount', sa.NUMERIC(15, 2), nullable=False),
+            sa.Column('currency', sa.VARCHAR(length=3), server_default='USD', nullable=True),
+            sa.Column('txn_type', sa.String(length=50), nullable=False),
+            sa.Column('merchant', sa.String(length=255), nullable=True),
+            sa.Column('txn_date', sa.TIMESTAMP(), nullable=False),
+            sa.Column('posted_date', sa.TIMESTAMP(), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_transactions_id', 'transactions', ['id'], unique=False)
+
+    if not _table_exists(conn, 'bills'):
+        op.create_table(
+            'bills',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('biller_name', sa.String(length=255), nullable=False),
+            sa.Column('due_date', sa.Date(), nullable=False),
+            sa.Column('amount_due', sa.Numeric(12, 2), nullable=False),
+            sa.Column('status', sa.String(length=32), server_default='upcoming', nullable=True),
+            sa.Column('auto_pay', sa.Boolean(), server_default=sa.text('false'), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_bills_id', 'bills', ['id'], unique=False)
+
+    if not _table_exists(conn, 'budgets'):
+        op.create_table(
+            'budgets',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('month', sa.Integer(), nullable=False),
+            sa.Column('year', sa.Integer(), nullable=False),
+            sa.Column('category', sa.String(length=100), nullable=True),
+            sa.Column('limit_amount', sa.Numeric(12, 2), server_default=sa.text('0'), nullable=False),
+            sa.Column('spent_amount', sa.Numeric(12, 2), server_default=sa.text('0'), nullable=False),
+            sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_budgets_id', 'budgets', ['id'], unique=False)
+
+    if not _table_exists(conn, 'rewards'):
+        op.create_table(
+            'rewards',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('program_name', sa.String(length=255), nullable=False),
+            sa.Column('points_balance', sa.Integer(), server_default=sa.text('0'), nullable=True),
+            sa.Column('last_updated', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_rewards_id', 'rewards', ['id'], unique=False)
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.create_table('users',
-    sa.Column('id', sa.INTEGER(), server_default=sa.text("nextval('users_id_seq'::regclass)"), autoincrement=True, nullable=False),
-    sa.Column('name', sa.VARCHAR(length=255), autoincrement=False, nullable=False),
-    sa.Column('email', sa.VARCHAR(length=255), autoincrement=False, nullable=False),
-    sa.Column('password', sa.VARCHAR(length=255), autoincrement=False, nullable=False),
-    sa.Column('phone', sa.VARCHAR(length=20), autoincrement=False, nullable=True),
-    sa.Column('kyc_status', sa.VARCHAR(length=20), server_default=sa.text("'unverified'::character varying"), autoincrement=False, nullable=False),
-    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=False),
-    sa.Column('role', sa.VARCHAR(length=50), server_default=sa.text("'user'::character varying"), autoincrement=False, nullable=False),
-    sa.PrimaryKeyConstraint('id', name='users_pkey'),
-    sa.UniqueConstraint('email', name='users_email_key'),
-    postgresql_ignore_search_path=False
-    )
-    op.create_table('accounts',
-    sa.Column('id', sa.INTEGER(), server_default=sa.text("nextval('accounts_id_seq'::regclass)"), autoincrement=True, nullable=False),
-    sa.Column('user_id', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('bank_name', sa.VARCHAR(length=255), autoincrement=False, nullable=False),
-    sa.Column('account_type', sa.VARCHAR(length=20), autoincrement=False, nullable=False),
-    sa.Column('masked_account', sa.VARCHAR(length=32), autoincrement=False, nullable=False),
-    sa.Column('currency', sa.CHAR(length=3), autoincrement=False, nullable=False),
-    sa.Column('balance', sa.NUMERIC(precision=18, scale=2), server_default=sa.text('0'), autoincrement=False, nullable=False),
-    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=False),
-    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='accounts_user_id_fkey', ondelete='CASCADE'),
-    sa.PrimaryKeyConstraint('id', name='accounts_pkey'),
-    postgresql_ignore_search_path=False
-    )
-    op.create_table('bills',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('user_id', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('biller_name', sa.VARCHAR(length=255), autoincrement=False, nullable=False),
-    sa.Column('due_date', sa.DATE(), autoincrement=False, nullable=False),
-    sa.Column('amount_due', sa.NUMERIC(precision=18, scale=2), autoincrement=False, nullable=False),
-    sa.Column('status', sa.VARCHAR(length=20), server_default=sa.text("'upcoming'::character varying"), autoincrement=False, nullable=False),
-    sa.Column('auto_pay', sa.BOOLEAN(), server_default=sa.text('false'), autoincrement=False, nullable=False),
-    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=False),
-    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('bills_user_id_fkey'), ondelete='CASCADE'),
-    sa.PrimaryKeyConstraint('id', name=op.f('bills_pkey'))
-    )
-    op.create_table('rewards',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('user_id', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('program_name', sa.VARCHAR(length=255), autoincrement=False, nullable=False),
-    sa.Column('points_balance', sa.INTEGER(), server_default=sa.text('0'), autoincrement=False, nullable=False),
-    sa.Column('last_updated', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=False),
-    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('rewards_user_id_fkey'), ondelete='CASCADE'),
-    sa.PrimaryKeyConstraint('id', name=op.f('rewards_pkey'))
-    )
-    op.create_table('alerts',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('user_id', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('type', sa.VARCHAR(length=30), autoincrement=False, nullable=False),
-    sa.Column('message', sa.TEXT(), autoincrement=False, nullable=False),
-    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=False),
-    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('alerts_user_id_fkey'), ondelete='CASCADE'),
-    sa.PrimaryKeyConstraint('id', name=op.f('alerts_pkey'))
-    )
-    op.create_table('transactions',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('account_id', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('description', sa.VARCHAR(length=255), autoincrement=False, nullable=True),
-    sa.Column('category', sa.VARCHAR(length=100), autoincrement=False, nullable=True),
-    sa.Column('amount', sa.NUMERIC(precision=18, scale=2), autoincrement=False, nullable=False),
-    sa.Column('currency', sa.CHAR(length=3), autoincrement=False, nullable=False),
-    sa.Column('txn_type', sa.VARCHAR(length=10), autoincrement=False, nullable=False),
-    sa.Column('merchant', sa.VARCHAR(length=255), autoincrement=False, nullable=True),
-    sa.Column('txn_date', postgresql.TIMESTAMP(), autoincrement=False, nullable=False),
-    sa.Column('posted_date', postgresql.TIMESTAMP(), autoincrement=False, nullable=True),
-    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=False),
-    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], name=op.f('transactions_account_id_fkey'), ondelete='CASCADE'),
-    sa.PrimaryKeyConstraint('id', name=op.f('transactions_pkey'))
-    )
-    op.create_table('admin_logs',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('admin_id', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('action', sa.TEXT(), autoincrement=False, nullable=False),
-    sa.Column('target_type', sa.VARCHAR(length=50), autoincrement=False, nullable=True),
-    sa.Column('target_id', sa.INTEGER(), autoincrement=False, nullable=True),
-    sa.Column('timestamp', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=False),
-    sa.ForeignKeyConstraint(['admin_id'], ['users.id'], name=op.f('admin_logs_admin_id_fkey'), ondelete='CASCADE'),
-    sa.PrimaryKeyConstraint('id', name=op.f('admin_logs_pkey'))
-    )
-    op.create_table('budgets',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('user_id', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('month', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('year', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('category', sa.VARCHAR(length=100), autoincrement=False, nullable=False),
-    sa.Column('limit_amount', sa.NUMERIC(precision=18, scale=2), autoincrement=False, nullable=False),
-    sa.Column('spent_amount', sa.NUMERIC(precision=18, scale=2), server_default=sa.text('0'), autoincrement=False, nullable=False),
-    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=False),
-    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('budgets_user_id_fkey'), ondelete='CASCADE'),
-    sa.PrimaryKeyConstraint('id', name=op.f('budgets_pkey'))
-    )
-    op.create_table('notifications',
-    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
-    sa.Column('user_id', sa.INTEGER(), autoincrement=False, nullable=False),
-    sa.Column('type', sa.VARCHAR(length=50), autoincrement=False, nullable=False),
-    sa.Column('title', sa.VARCHAR(length=255), autoincrement=False, nullable=False),
-    sa.Column('message', sa.TEXT(), autoincrement=False, nullable=False),
-    sa.Column('scheduled_date', postgresql.TIMESTAMP(), autoincrement=False, nullable=True),
-    sa.Column('sent', sa.BOOLEAN(), autoincrement=False, nullable=True),
-    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), autoincrement=False, nullable=True),
-    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('notifications_user_id_fkey')),
-    sa.PrimaryKeyConstraint('id', name=op.f('notifications_pkey'))
-    )
-    op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
-    # ### end Alembic commands ###
+    for table in ('rewards', 'budgets', 'bills', 'transactions', 'accounts', 'users'):
+        op.execute(f"DROP TABLE IF EXISTS {table}")
@@ -0,0 +1,120 @@
+"""cascade account deletes: account_id FKs with ON DELETE CASCADE, purge_jobs
+
+Revision ID: 9a3d6f1b7c52
+Revises: 7e2a5c1d9f84
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '9a3d6f1b7c52'
+down_revision = '7e2a5c1d9f84'
+branch_labels = None
+depends_on = None
+
+# foreign keys to accounts(id) that must cascade; earlier migrations created
+# bills.account_id without it
+CASCADE_FKS = (
+    ('transactions', 'account_id', 'transactions_account_id_fkey'),
+    ('bills', 'account_id', 'bills_account_id_fkey'),
+)
+
+
+def _non_cascading_fks(conn, table, column):
+    return [
+        r[0] for r in conn.execute(
+            sa.text(
+                "SELECT c.conname FROM pg_constraint c "
+                "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey) "
+                "WHERE c.contype = 'f' AND c.conrelid = CAST(:table AS regclass) "
+                "AND c.confrelid = CAST('accounts' AS regclass) AND a.attname = :column "
+                "AND c.confdeltype <> 'c'"
+            ),
+            {"table": table, "column": column},
+        )
+    ]
+
+
+def _is_not_valid(conn, table, name):
+    return conn.execute(
+        sa.text(
+            "SELECT 1 FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table) AND conname = :name AND NOT convalidated"
+        ),
+        {"table": table, "name": name},
+    ).first() is not None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    for table, column, fk_name in CASCADE_FKS:
+        column_exists = conn.execute(
+            sa.text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = :column"
+            ),
+            {"table": table, "column": column},
+        ).first() is not None
+        if not column_exists:
+            continue
+        for name in _non_cascading_fks(conn, table, column):
+            op.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+            # NOT VALID: the swap skips the row check; it is validated below, after commit
+            op.execute(
+                f'ALTER TABLE {table} ADD CONSTRAINT "{fk_name}" FOREIGN KEY ({column}) '
+                f'REFERENCES accounts (id) ON DELETE CASCADE NOT VALID'
+            )
+
+    column_exists = conn.execute(
+        sa.text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'accounts' AND column_name = 'deleted_at'"
+        )
+    ).first() is not None
+    if not column_exists:
+        op.add_column('accounts', sa.Column('deleted_at', sa.TIMESTAMP(), nullable=True))
+
+    table_exists = conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = 'purge_jobs'")
+    ).first() is not None
+    if not table_exists:
+        op.create_table(
+            'purge_jobs',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('kind', sa.String(length=20), nullable=False),
+            sa.Column('target_id', sa.Integer(), nullable=False),
+            sa.Column('requested_by', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=20), server_default='pending', nullable=False),
+            sa.Column('rows_deleted', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+            sa.Column('batches', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+            sa.Column('finished_at', sa.TIMESTAMP(), nullable=True),
+        )
+        op.create_index('ix_purge_jobs_id', 'purge_jobs', ['id'], unique=False)
+        op.create_index('ix_purge_jobs_status_id', 'purge_jobs', ['status', 'id'], unique=False)
+        op.create_index('ix_purge_jobs_kind_target_id', 'purge_jobs', ['kind', 'target_id'], unique=False)
+
+    # The block commits the swap first, so VALIDATE runs in its own transaction
+    # and takes only SHARE UPDATE EXCLUSIVE: writes continue while rows are checked.
+    # Cascading and batched deletes look transactions up by account_id.
+    with op.get_context().autocommit_block():
+        for table, _, fk_name in CASCADE_FKS:
+            if _is_not_valid(conn, table, fk_name):
+                op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{fk_name}"')
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_account_id "
+            "ON transactions (account_id)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_transactions_account_id")
+    op.execute("DROP TABLE IF EXISTS purge_jobs")
+    op.execute("ALTER TABLE accounts DROP COLUMN IF EXISTS deleted_at")
+    # the cascading foreign keys are kept: the models declare them
@@ -0,0 +1,88 @@
+"""add notification delivery attempts and skip pre-existing unsent rows
+
+Revision ID: a7c2e9d4b810
+Revises: f1a8c3e5b749
+Create Date: 2026-10-19
+
+Adds the delivery bookkeeping columns (attempts, last_error, claimed_until,
+skipped_at). Notifications created before email delivery existed were
+never meant to be mailed; every unsent one is marked skipped when the
+columns are added, so the first delivery run does not email the backlog.
+
+The delivery queue index now excludes skipped rows; it is built
+concurrently like the indexes of e9f4b2a7c160.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'a7c2e9d4b810'
+down_revision = 'f1a8c3e5b749'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default=sa.text('0')),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('claimed_until', sa.DateTime(), nullable=True),
+    sa.Column('skipped_at', sa.DateTime(), nullable=True),
+)
+
+QUEUE_INDEX = ('ix_notifications_pending_id', '(id) WHERE sent IS NOT TRUE AND skipped_at IS NULL')
+OLD_QUEUE_INDEX = ('ix_notifications_unsent_id', '(id) WHERE sent IS NOT TRUE')
+
+
+def _column_exists(conn, name):
+    return conn.execute(
+        sa.text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'notifications' AND column_name = :name"
+        ),
+        {"name": name},
+    ).first() is not None
+
+
+def _is_invalid(conn, name):
+    return conn.execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first() is not None
+
+
+def _create_index(conn, name, definition):
+    if _is_invalid(conn, name):
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON notifications {definition}")
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    backfill = not _column_exists(conn, 'attempts')
+    for column in COLUMNS:
+        if not _column_exists(conn, column.name):
+            op.add_column('notifications', column.copy())
+    if backfill:
+        # same transaction as the columns: a re-run never skips rows queued since
+        op.execute(
+            "UPDATE notifications SET skipped_at = now(), "
+            "last_error = 'skipped: created before email delivery was enabled' "
+            "WHERE sent IS NOT TRUE"
+        )
+
+    with op.get_context().autocommit_block():
+        _create_index(conn, *QUEUE_INDEX)
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {OLD_QUEUE_INDEX[0]}")
+
+
+def downgrade():
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        _create_index(conn, *OLD_QUEUE_INDEX)
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {QUEUE_INDEX[0]}")
+    for column in reversed(COLUMNS):
+        op.execute(f"ALTER TABLE notifications DROP COLUMN IF EXISTS {column.name}")
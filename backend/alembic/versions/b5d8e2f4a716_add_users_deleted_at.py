@@ -0,0 +1,32 @@
+"""add users.deleted_at tombstone for background erasure
+
+Revision ID: b5d8e2f4a716
+Revises: 9a3d6f1b7c52
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'b5d8e2f4a716'
+down_revision = '9a3d6f1b7c52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    column_exists = conn.execute(
+        sa.text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'users' AND column_name = 'deleted_at'"
+        )
+    ).first() is not None
+    if not column_exists:
+        op.add_column('users', sa.Column('deleted_at', sa.TIMESTAMP(), nullable=True))
+
+
+def downgrade():
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS deleted_at")
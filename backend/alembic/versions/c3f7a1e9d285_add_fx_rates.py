@@ -0,0 +1,64 @@
+"""add fx_rates and seed it from app/data/fx_rates.json
+
+Revision ID: c3f7a1e9d285
+Revises: b5d8e2f4a716
+Create Date: 2026-10-19
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'c3f7a1e9d285'
+down_revision = 'b5d8e2f4a716'
+branch_labels = None
+depends_on = None
+
+RATES_FILE = Path(__file__).resolve().parents[2] / 'app' / 'data' / 'fx_rates.json'
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    table_exists = conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = 'fx_rates'")
+    ).first() is not None
+    if not table_exists:
+        op.create_table(
+            'fx_rates',
+            sa.Column('currency', sa.String(length=3), primary_key=True, nullable=False),
+            sa.Column('per_usd', sa.NUMERIC(20, 10), nullable=False),
+            sa.Column('as_of', sa.TIMESTAMP(), nullable=True),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+
+    path = Path(os.getenv('FX_RATES_FILE') or RATES_FILE)
+    if not path.exists():
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rates = {str(k).upper(): float(v) for k, v in (data.get('rates') or {}).items()}
+    base = str(data.get('base') or 'USD').upper()
+    if base != 'USD':
+        usd = rates['USD']
+        rates = {k: v / usd for k, v in rates.items()}
+    as_of = datetime.fromisoformat(data['as_of']) if data.get('as_of') else None
+
+    # seed only currencies not present yet, so rates maintained since are kept
+    for currency, per_usd in rates.items():
+        conn.execute(
+            sa.text(
+                "INSERT INTO fx_rates (currency, per_usd, as_of) VALUES (:currency, :per_usd, :as_of) "
+                "ON CONFLICT (currency) DO NOTHING"
+            ),
+            {"currency": currency, "per_usd": per_usd, "as_of": as_of},
+        )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS fx_rates")
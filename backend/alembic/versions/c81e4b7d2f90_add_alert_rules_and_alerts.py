@@ -0,0 +1,83 @@
+"""add alert rules, alerts and known merchants
+
+Revision ID: c81e4b7d2f90
+Revises: 5e2f8a1c9d47
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'c81e4b7d2f90'
+down_revision = '5e2f8a1c9d47'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = :t"), {"t": name}
+    ).first() is not None
+
+
+def _column_exists(conn, table, column):
+    return conn.execute(
+        sa.text("SELECT 1 FROM information_schema.columns WHERE table_name = :t AND column_name = :c"),
+        {"t": table, "c": column},
+    ).first() is not None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    if not _table_exists(conn, 'alert_rules'):
+        op.create_table(
+            'alert_rules',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('rule_type', sa.String(length=50), nullable=False),
+            sa.Column('threshold', sa.NUMERIC(15, 2), nullable=True),
+            sa.Column('account_id', sa.Integer(), sa.ForeignKey('accounts.id', ondelete='CASCADE'), nullable=True),
+            sa.Column('category', sa.String(length=100), nullable=True),
+            sa.Column('enabled', sa.Boolean(), server_default=sa.text('true'), nullable=False),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_alert_rules_user_id', 'alert_rules', ['user_id'], unique=False)
+
+    # An older deployment may still carry a bare `alerts` table; extend it in place.
+    if not _table_exists(conn, 'alerts'):
+        op.create_table(
+            'alerts',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('rule_id', sa.Integer(), sa.ForeignKey('alert_rules.id', ondelete='CASCADE'), nullable=True),
+            sa.Column('transaction_id', sa.Integer(), sa.ForeignKey('transactions.id', ondelete='SET NULL'), nullable=True),
+            sa.Column('type', sa.String(length=50), nullable=False),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+    else:
+        if not _column_exists(conn, 'alerts', 'rule_id'):
+            op.add_column('alerts', sa.Column('rule_id', sa.Integer(), sa.ForeignKey('alert_rules.id', ondelete='CASCADE'), nullable=True))
+        if not _column_exists(conn, 'alerts', 'transaction_id'):
+            op.add_column('alerts', sa.Column('transaction_id', sa.Integer(), sa.ForeignKey('transactions.id', ondelete='SET NULL'), nullable=True))
+        op.execute("ALTER TABLE alerts ALTER COLUMN type TYPE VARCHAR(50)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_alerts_user_id_created_at ON alerts (user_id, created_at)")
+
+    if not _table_exists(conn, 'alert_known_merchants'):
+        op.create_table(
+            'alert_known_merchants',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('merchant', sa.String(length=255), nullable=False),
+            sa.Column('first_seen', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+            sa.PrimaryKeyConstraint('user_id', 'merchant'),
+        )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS alert_known_merchants")
+    op.execute("DROP INDEX IF EXISTS ix_alerts_user_id_created_at")
+    op.execute("DROP TABLE IF EXISTS alerts")
+    op.execute("DROP INDEX IF EXISTS ix_alert_rules_user_id")
+    op.execute("DROP TABLE IF EXISTS alert_rules")
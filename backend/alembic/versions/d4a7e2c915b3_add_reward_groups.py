@@ -0,0 +1,74 @@
+"""add reward_groups and point rewards.group_id at it
+
+Revision ID: d4a7e2c915b3
+Revises: c81e4b7d2f90
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'd4a7e2c915b3'
+down_revision = 'c81e4b7d2f90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    table_exists = conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = 'reward_groups'")
+    ).first() is not None
+
+    if not table_exists:
+        op.create_table(
+            'reward_groups',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('program_name', sa.String(length=255), nullable=False),
+            sa.Column('points_balance', sa.Integer(), server_default=sa.text('0'), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+        op.create_index('ix_reward_groups_id', 'reward_groups', ['id'], unique=False)
+
+    # Existing groups were keyed by their master reward's id; keep those ids so
+    # clients calling PUT /api/rewards/group/{id} keep working.
+    op.execute("""
+        INSERT INTO reward_groups (id, program_name, points_balance, created_at, updated_at)
+        SELECT DISTINCT ON (r.group_id) r.group_id, COALESCE(m.program_name, r.program_name),
+               COALESCE(m.points_balance, r.points_balance), now(), now()
+        FROM rewards r
+        LEFT JOIN rewards m ON m.id = r.group_id
+        WHERE r.group_id IS NOT NULL
+        ORDER BY r.group_id, r.id
+        ON CONFLICT (id) DO NOTHING
+    """)
+    op.execute("""
+        SELECT setval(pg_get_serial_sequence('reward_groups', 'id'),
+                      GREATEST((SELECT COALESCE(MAX(id), 0) FROM reward_groups), 1))
+    """)
+
+    op.execute("ALTER TABLE rewards DROP CONSTRAINT IF EXISTS rewards_group_id_fkey")
+    op.execute("ALTER TABLE rewards ALTER COLUMN group_id TYPE INTEGER USING group_id::integer")
+    op.create_foreign_key(
+        'rewards_group_id_fkey',
+        'rewards', 'reward_groups',
+        ['group_id'], ['id'],
+        ondelete='CASCADE',
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_rewards_group_id_user_id ON rewards (group_id, user_id)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_rewards_group_id_user_id")
+    op.execute("ALTER TABLE rewards DROP CONSTRAINT IF EXISTS rewards_group_id_fkey")
+    # Restore the old self-referencing key only where the group id is still a reward id
+    op.execute("UPDATE rewards SET group_id = NULL WHERE group_id NOT IN (SELECT id FROM rewards)")
+    op.create_foreign_key(
+        'rewards_group_id_fkey',
+        'rewards', 'rewards',
+        ['group_id'], ['id'],
+    )
+    op.execute("DROP TABLE IF EXISTS reward_groups")
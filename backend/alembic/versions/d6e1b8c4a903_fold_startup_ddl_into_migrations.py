@@ -0,0 +1,56 @@
+"""fold startup DDL and ad-hoc scripts into the chain
+
+Replaces the `ensure_role_column` / `promote_render_test_to_admin` startup
+hooks, /admin/fix-db, add_role_column.py, fix_render_db.py and
+migrations/convert_txn_type.sql (migrations/add_bills_account_id.sql is
+already revision 73399f3ddb24).
+
+Revision ID: d6e1b8c4a903
+Revises: c3f7a1e9d285
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'd6e1b8c4a903'
+down_revision = 'c3f7a1e9d285'
+branch_labels = None
+depends_on = None
+
+DEFAULT_ADMIN_EMAIL = 'render.test@example.com'
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    role_exists = conn.execute(
+        sa.text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'users' AND column_name = 'role'"
+        )
+    ).first() is not None
+    if not role_exists:
+        op.add_column('users', sa.Column('role', sa.String(length=50), server_default='user', nullable=False))
+
+    # transactions.txn_type was once an enum / varchar(10)
+    txn_type = conn.execute(
+        sa.text(
+            "SELECT data_type, character_maximum_length FROM information_schema.columns "
+            "WHERE table_name = 'transactions' AND column_name = 'txn_type'"
+        )
+    ).first()
+    if txn_type is not None and (txn_type[0] != 'character varying' or (txn_type[1] or 0) < 50):
+        op.execute("ALTER TABLE transactions ALTER COLUMN txn_type TYPE VARCHAR(50) USING txn_type::text")
+
+    # deployments relied on this account being promoted at startup
+    op.execute(
+        sa.text("UPDATE users SET role = 'admin' WHERE email = :email AND role <> 'admin'")
+        .bindparams(email=DEFAULT_ADMIN_EMAIL)
+    )
+
+
+def downgrade():
+    # role and the widened txn_type are kept: the models require them
+    pass
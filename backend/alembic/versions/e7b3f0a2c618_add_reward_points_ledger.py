@@ -0,0 +1,77 @@
+"""add reward points ledger and per-program balances
+
+Revision ID: e7b3f0a2c618
+Revises: d4a7e2c915b3
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'e7b3f0a2c618'
+down_revision = 'd4a7e2c915b3'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = :name"), {"name": name}
+    ).first() is not None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    if not _table_exists(conn, 'reward_points_ledger'):
+        op.create_table(
+            'reward_points_ledger',
+            sa.Column('id', sa.BigInteger(), primary_key=True, nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('program_name', sa.String(length=255), nullable=False),
+            sa.Column('reward_id', sa.Integer(), sa.ForeignKey('rewards.id', ondelete='SET NULL'), nullable=True),
+            sa.Column('entry_type', sa.String(length=20), nullable=False),
+            sa.Column('points', sa.Integer(), nullable=False),
+            sa.Column('balance_after', sa.Integer(), nullable=False),
+            sa.Column('note', sa.String(length=255), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        )
+        op.create_index('ix_reward_points_ledger_user_id_id', 'reward_points_ledger', ['user_id', 'id'])
+        op.create_index('ix_reward_points_ledger_user_program_id', 'reward_points_ledger',
+                        ['user_id', 'program_name', 'id'])
+
+    if not _table_exists(conn, 'reward_balances'):
+        op.create_table(
+            'reward_balances',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('program_name', sa.String(length=255), primary_key=True),
+            sa.Column('balance', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('earned_total', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('spent_total', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        )
+
+    # Opening balances: every existing reward becomes an `earn` entry, in id order.
+    # They are dated now, not at rewards.last_updated: expiry counts from here.
+    op.execute("""
+        INSERT INTO reward_points_ledger (user_id, program_name, reward_id, entry_type, points, balance_after, note, created_at)
+        SELECT r.user_id, r.program_name, r.id, 'earn', COALESCE(r.points_balance, 0),
+               SUM(COALESCE(r.points_balance, 0)) OVER (PARTITION BY r.user_id, r.program_name ORDER BY r.id),
+               'opening balance', now()
+        FROM rewards r
+        WHERE NOT EXISTS (SELECT 1 FROM reward_points_ledger)
+        ORDER BY r.id
+    """)
+    op.execute("""
+        INSERT INTO reward_balances (user_id, program_name, balance, earned_total, spent_total, updated_at)
+        SELECT user_id, program_name, SUM(points), SUM(points), 0, now()
+        FROM reward_points_ledger
+        GROUP BY user_id, program_name
+        ON CONFLICT (user_id, program_name) DO NOTHING
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS reward_balances")
+    op.execute("DROP TABLE IF EXISTS reward_points_ledger")
@@ -0,0 +1,82 @@
+"""index hot foreign keys and filters
+
+Revision ID: e9f4b2a7c160
+Revises: d6e1b8c4a903
+Create Date: 2026-10-19
+
+Every index is built with CREATE INDEX CONCURRENTLY, so reads and writes
+continue while it builds. A concurrent build that fails (or is cancelled)
+leaves an INVALID index behind which IF NOT EXISTS would then skip; those
+are dropped and rebuilt. `scripts/check_indexes.py` verifies the plans.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'e9f4b2a7c160'
+down_revision = 'd6e1b8c4a903'
+branch_labels = None
+depends_on = None
+
+# name -> (table, index definition)
+INDEXES = {
+    # account transaction pages: WHERE account_id = ? ORDER BY created_at DESC;
+    # also serves the per-account lookups of ix_transactions_account_id
+    'ix_transactions_account_id_created_at': ('transactions', '(account_id, created_at)'),
+    # every per-user listing and the joins from users to their transactions
+    'ix_accounts_user_id': ('accounts', '(user_id)'),
+    'ix_bills_user_id': ('bills', '(user_id)'),
+    # ON DELETE CASCADE from accounts
+    'ix_bills_account_id': ('bills', '(account_id)'),
+    # reminder sweep: WHERE status <> 'paid' AND due_date <= ?
+    'ix_bills_unpaid_due_date': ('bills', "(due_date) WHERE status <> 'paid'"),
+    # WHERE user_id = ? [AND year = ? AND month = ?], and the spend updates
+    'ix_budgets_user_id_year_month': ('budgets', '(user_id, year, month)'),
+    'ix_rewards_user_id': ('rewards', '(user_id)'),
+    # delivery queue: WHERE sent IS NOT TRUE AND id > ? ORDER BY id
+    'ix_notifications_unsent_id': ('notifications', '(id) WHERE sent IS NOT TRUE'),
+    # ON DELETE SET NULL / CASCADE lookups when transactions, rules,
+    # accounts or rewards are deleted
+    'ix_alerts_transaction_id': ('alerts', '(transaction_id)'),
+    'ix_alerts_rule_id': ('alerts', '(rule_id)'),
+    'ix_alert_rules_account_id': ('alert_rules', '(account_id)'),
+    'ix_reward_points_ledger_reward_id': ('reward_points_ledger', '(reward_id)'),
+    # logout-everywhere and user erasure: WHERE user_id = ?
+    'ix_refresh_tokens_user_id': ('refresh_tokens', '(user_id)'),
+}
+
+# prefix of ix_transactions_account_id_created_at
+REPLACED = ('ix_transactions_account_id', 'transactions', '(account_id)')
+
+
+def _is_invalid(conn, name):
+    return conn.execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first() is not None
+
+
+def _create(conn, name, table, definition):
+    if _is_invalid(conn, name):
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for name, (table, definition) in INDEXES.items():
+            _create(conn, name, table, definition)
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {REPLACED[0]}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        _create(conn, *REPLACED)
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,142 @@
+"""partition transactions by month on txn_date
+
+Revision ID: f1a8c3e5b749
+Revises: e9f4b2a7c160
+Create Date: 2026-10-19
+
+`transactions` becomes a RANGE (txn_date) partitioned table with one
+partition per month, from the oldest row's month (at most HISTORY_MONTHS
+back) through MONTHS_AHEAD months past today, plus a default partition
+holding outliers such as mistyped CSV dates. Later months are created by
+app.transactions.partitions on the scheduler.
+
+The rows are copied while the old table is locked in EXCLUSIVE mode:
+reads continue, writes wait until the migration commits. On a large table
+run it in a quiet window.
+
+The primary key becomes (id, txn_date): a partitioned table can only
+enforce uniqueness over keys that include the partition key. Nothing can
+therefore reference transactions(id) any more, so alerts.transaction_id
+loses its foreign key and stays as a plain reference.
+"""
+
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'f1a8c3e5b749'
+down_revision = 'e9f4b2a7c160'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+# a stray 1900 date must not create a thousand partitions under the lock
+HISTORY_MONTHS = 120
+
+INDEXES = (
+    ('ix_transactions_id', '(id)'),
+    ('ix_transactions_account_id_created_at', '(account_id, created_at)'),
+)
+# account + date range: pruned to the months, then an index range scan
+ADDED_INDEXES = (
+    ('ix_transactions_account_id_txn_date', '(account_id, txn_date)'),
+)
+
+
+def _add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _is_partitioned(conn):
+    return conn.execute(
+        sa.text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = 'transactions'"
+        )
+    ).first() is not None
+
+
+def _foreign_keys_to_transactions(conn):
+    return conn.execute(
+        sa.text(
+            "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+            "WHERE contype = 'f' AND confrelid = CAST('transactions' AS regclass)"
+        )
+    ).all()
+
+
+def _finish_table(primary_key, indexes):
+    """Keys, foreign key, indexes and sequence ownership of the new `transactions`."""
+    op.execute(f"ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY ({primary_key})")
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_account_id_fkey FOREIGN KEY (account_id) "
+        "REFERENCES accounts (id) ON DELETE CASCADE"
+    )
+    for name, columns in indexes:
+        op.execute(f"CREATE INDEX {name} ON transactions {columns}")
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+
+
+def upgrade():
+    conn = op.get_bind()
+    if _is_partitioned(conn):
+        return
+
+    # writers wait (readers do not) until the copy is committed
+    op.execute("LOCK TABLE transactions IN EXCLUSIVE MODE")
+    today = date.today()
+    this_month = date(today.year, today.month, 1)
+    oldest = conn.execute(sa.text("SELECT min(txn_date) FROM transactions")).scalar()
+    first = date(oldest.year, oldest.month, 1) if oldest else this_month
+    first = min(max(first, _add_months(this_month, -HISTORY_MONTHS)), this_month)
+    last = _add_months(this_month, MONTHS_AHEAD)
+
+    op.execute(
+        "CREATE TABLE transactions_partitioned (LIKE transactions INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (txn_date)"
+    )
+    month = first
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE transactions_{month.year:04d}_{month.month:02d} PARTITION OF transactions_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions_partitioned DEFAULT")
+    op.execute("INSERT INTO transactions_partitioned SELECT * FROM transactions")
+
+    for table, name in _foreign_keys_to_transactions(conn):
+        op.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+    # keep the id sequence (and its position) when the old table goes
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE transactions")
+    op.execute("ALTER TABLE transactions_partitioned RENAME TO transactions")
+    _finish_table("id, txn_date", INDEXES + ADDED_INDEXES)
+
+
+def downgrade():
+    conn = op.get_bind()
+    if not _is_partitioned(conn):
+        return
+
+    op.execute("LOCK TABLE transactions IN EXCLUSIVE MODE")
+    op.execute("CREATE TABLE transactions_unpartitioned (LIKE transactions INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO transactions_unpartitioned SELECT * FROM transactions")
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE transactions")  # drops every partition with it
+    op.execute("ALTER TABLE transactions_unpartitioned RENAME TO transactions")
+    _finish_table("id", INDEXES)
+
+    # restore the alerts reference, clearing ids whose transaction is gone
+    op.execute(
+        "UPDATE alerts SET transaction_id = NULL WHERE transaction_id IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM transactions t WHERE t.id = alerts.transaction_id)"
+    )
+    op.execute(
+        "ALTER TABLE alerts ADD CONSTRAINT alerts_transaction_id_fkey FOREIGN KEY (transaction_id) "
+        "REFERENCES transactions (id) ON DELETE SET NULL"
+    )
@@ -0,0 +1,50 @@
+"""add reward_expiry_runs checkpoints and ledger credits index
+
+Revision ID: f2c9d41e7a05
+Revises: e7b3f0a2c618
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'f2c9d41e7a05'
+down_revision = 'e7b3f0a2c618'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    table_exists = conn.execute(
+        sa.text("SELECT 1 FROM information_schema.tables WHERE table_name = 'reward_expiry_runs'")
+    ).first() is not None
+
+    if not table_exists:
+        op.create_table(
+            'reward_expiry_runs',
+            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False, server_default='running'),
+            sa.Column('started_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.Column('finished_at', sa.TIMESTAMP(), nullable=True),
+            sa.Column('last_user_id', sa.Integer(), nullable=True),
+            sa.Column('last_program_name', sa.String(length=255), nullable=True),
+            sa.Column('batches', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('accounts_expired', sa.Integer(), server_default=sa.text('0'), nullable=False),
+            sa.Column('points_expired', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        )
+        op.create_index('ix_reward_expiry_runs_id', 'reward_expiry_runs', ['id'], unique=False)
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_reward_points_ledger_credits
+        ON reward_points_ledger (user_id, program_name, created_at)
+        INCLUDE (points)
+        WHERE entry_type IN ('earn', 'adjust')
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_reward_points_ledger_credits")
+    op.execute("DROP TABLE IF EXISTS reward_expiry_runs")
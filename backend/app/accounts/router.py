@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
-from app.dependencies import get_current_user, require_read_access, require_write_access
+from app.dependencies import get_current_user, require_read_access, require_write_access, get_current_principal, require_admin_only
 from app.models.user import User
-from app.accounts.schemas import AccountCreate, AccountUpdate, AccountResponse
+from app.accounts.schemas import (
+    AccountCreate, AccountUpdate, AccountResponse, AccountSummaryResponse,
+    NetWorthResponse, FxRatesResponse, FxRatesUpdate,
+)
 from app.accounts.service import AccountService
+from app.models.purge import PurgeJob
+from app.utils import purge, fx
 
 router = APIRouter()
 
@@ -20,7 +27,7 @@ async def create_account(
 
 @router.get("/", response_model=List[AccountResponse])
 async def get_accounts(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     # Admins may see all accounts; regular users see only their own
@@ -31,10 +38,81 @@ async def get_accounts(
         accounts = AccountService.get_user_accounts(db, current_user.id)
     return accounts
 
+@router.get("/summary", response_model=List[AccountSummaryResponse])
+async def get_account_summary(
+    current_user: User = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Accounts with transaction count, last activity and this month's debits/credits.
+
+    Lets the dashboard render from one request instead of one per account.
+    Admins get every account, like GET /.
+    """
+    if getattr(current_user, "role", "user") == "admin":
+        return AccountService.get_account_summaries(db)
+    return AccountService.get_account_summaries(db, current_user.id)
+
+@router.get("/net-worth", response_model=NetWorthResponse)
+async def get_net_worth(
+    base: str = Query("USD", min_length=3, max_length=3),
+    current_user: User = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Sum of account balances converted into `base` with the server's FX rates."""
+    user_id = None if getattr(current_user, "role", "user") == "admin" else current_user.id
+    try:
+        return AccountService.get_net_worth(db, base, user_id)
+    except fx.UnknownCurrency as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/fx-rates", response_model=FxRatesResponse)
+async def get_fx_rates(
+    base: str = Query("USD", min_length=3, max_length=3),
+    current_user: User = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Units of each currency per 1 `base`, from the server-side rate store."""
+    rates, as_of = fx.fx_rates.rates(db)
+    base = fx.normalize_currency(base)
+    if base not in rates:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"No FX rate for {base}")
+    return {
+        "base": base,
+        "rates_as_of": as_of,
+        "rates": {code: rate / rates[base] for code, rate in sorted(rates.items())},
+    }
+
+@router.put("/fx-rates", response_model=FxRatesResponse)
+async def update_fx_rates(
+    payload: FxRatesUpdate,
+    current_user: User = Depends(require_admin_only),
+    db: Session = Depends(get_db)
+):
+    """Admin-only: upsert rates (units per 1 USD). Other workers pick them up within FX_RATES_CACHE_SECONDS."""
+    if any(rate <= 0 for rate in payload.rates.values()):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Rates must be positive")
+    fx.set_rates(db, payload.rates, payload.as_of)
+    rates, as_of = fx.fx_rates.rates(db)
+    return {"base": "USD", "rates_as_of": as_of, "rates": dict(sorted(rates.items()))}
+
+@router.get("/deletions/{job_id}")
+async def get_deletion_progress(
+    job_id: int,
+    current_user: User = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Progress of a background account deletion started by DELETE /{account_id}."""
+    job = db.query(PurgeJob).filter(PurgeJob.id == job_id, PurgeJob.kind == "account").first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion not found")
+    if getattr(current_user, "role", "user") != "admin" and job.requested_by != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion not found")
+    return purge.progress(job)
+
 @router.get("/{account_id}", response_model=AccountResponse)
 async def get_account(
     account_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     # Fetch account without owner filter, then enforce access rules:
@@ -98,7 +176,13 @@ async def delete_account(
     if getattr(current_user, "role", "user") != "admin" and account.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Own account only")
 
-    result = AccountService.delete_account(db, account)
+    result = AccountService.delete_account(db, account, current_user.id)
+    if "job" in result:
+        # large account: hidden now, rows are removed in the background
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder({
+            "message": f"Account {account_id} scheduled for deletion",
+            "job": result["job"]
+        }))
     return {
         "message": f"Account {account_id} deleted",
         "transactions_deleted": result.get("txns_deleted", 0),
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -29,3 +29,46 @@ class AccountResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class AccountSummaryResponse(BaseModel):
+    id: int
+    user_id: int
+    bank_name: str
+    account_type: str
+    masked_account: Optional[str] = None
+    currency: str
+    balance: Decimal
+    transaction_count: int = 0
+    last_txn_date: Optional[datetime] = None
+    month_debit_total: Decimal = Decimal("0")
+    month_credit_total: Decimal = Decimal("0")
+
+
+class CurrencyTotal(BaseModel):
+    currency: str
+    accounts: int
+    balance: Decimal
+    rate: Decimal
+    converted: Decimal
+
+
+class NetWorthResponse(BaseModel):
+    base: str
+    total: Decimal
+    rates_as_of: Optional[datetime] = None
+    currencies: List[CurrencyTotal] = []
+    # currencies held in some account but without a rate; excluded from `total`
+    unconverted: List[str] = []
+
+
+class FxRatesResponse(BaseModel):
+    base: str
+    rates_as_of: Optional[datetime] = None
+    rates: Dict[str, Decimal]
+
+
+class FxRatesUpdate(BaseModel):
+    # units of each currency per 1 USD
+    rates: Dict[str, Decimal]
+    as_of: Optional[datetime] = None
@@ -1,9 +1,23 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import inspect
+from sqlalchemy import case, func, select
+from app.config import settings
 from app.models.account import Account
+from app.models.user import User
 from app.accounts.schemas import AccountCreate, AccountUpdate
 from app.models.transaction import Transaction
 from app.models.bill import Bill
+from app.utils import purge
+from app.utils.schema import schema_facts
+from app.utils import fx
+
+
+def owner_not_erased():
+    # an erased user's accounts stay until the purge reaches them; hide them meanwhile
+    return Account.user_id.in_(select(User.id).where(User.deleted_at.is_(None)))
+
 
 class AccountService:
     @staticmethod
@@ -34,25 +48,119 @@ class AccountService:
     
     @staticmethod
     def get_user_accounts(db: Session, user_id: int):
-        return db.query(Account).filter(Account.user_id == user_id).all()
+        return db.query(Account).filter(Account.user_id == user_id, Account.deleted_at.is_(None)).all()
     
     @staticmethod
     def get_all_accounts(db: Session):
-        return db.query(Account).all()
+        return db.query(Account).filter(Account.deleted_at.is_(None), owner_not_erased()).all()
 
     @staticmethod
     def get_account_by_id_any(db: Session, account_id: int):
         return db.query(Account).filter(
-            Account.id == account_id
+            Account.id == account_id,
+            Account.deleted_at.is_(None),
+            owner_not_erased()
         ).first()
     
     @staticmethod
     def get_account_by_id(db: Session, account_id: int, user_id: int):
         return db.query(Account).filter(
             Account.id == account_id,
-            Account.user_id == user_id
+            Account.user_id == user_id,
+            Account.deleted_at.is_(None)
         ).first()
     
+    @staticmethod
+    def get_account_summaries(db: Session, user_id: Optional[int] = None, as_of: Optional[datetime] = None):
+        """Accounts with their transaction stats, in one statement.
+
+        Per account: transaction count, latest `txn_date` and the debit and
+        credit totals since the start of `as_of`'s month (UTC now by default).
+        Transactions are aggregated per account_id in a subquery that is
+        outer-joined to the accounts, so accounts without activity still
+        appear. `user_id=None` summarises every account (admin view).
+        """
+        as_of = as_of or datetime.utcnow()
+        month_start = as_of.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        txn_type = func.lower(Transaction.txn_type)
+        this_month = Transaction.txn_date >= month_start
+
+        accounts_filter = [Account.deleted_at.is_(None), owner_not_erased()]
+        if user_id is not None:
+            accounts_filter.append(Account.user_id == user_id)
+
+        stats = (
+            select(
+                Transaction.account_id.label("account_id"),
+                func.count(Transaction.id).label("transaction_count"),
+                func.max(Transaction.txn_date).label("last_txn_date"),
+                func.sum(case((this_month & (txn_type == "debit"), Transaction.amount), else_=0)).label("month_debit_total"),
+                func.sum(case((this_month & (txn_type == "credit"), Transaction.amount), else_=0)).label("month_credit_total"),
+            )
+            .where(Transaction.account_id.in_(select(Account.id).where(*accounts_filter)))
+            .group_by(Transaction.account_id)
+            .subquery()
+        )
+        rows = db.execute(
+            select(
+                Account,
+                func.coalesce(stats.c.transaction_count, 0),
+                stats.c.last_txn_date,
+                func.coalesce(stats.c.month_debit_total, 0),
+                func.coalesce(stats.c.month_credit_total, 0),
+            )
+            .outerjoin(stats, stats.c.account_id == Account.id)
+            .where(*accounts_filter)
+            .order_by(Account.id)
+        ).all()
+
+        return [
+            {
+                "id": a.id,
+                "user_id": a.user_id,
+                "bank_name": a.bank_name,
+                "account_type": a.account_type.value if hasattr(a.account_type, 'value') else a.account_type,
+                "masked_account": a.masked_account,
+                "currency": a.currency,
+                "balance": a.balance if a.balance is not None else 0,
+                "transaction_count": int(count or 0),
+                "last_txn_date": last_txn,
+                "month_debit_total": debits or 0,
+                "month_credit_total": credits or 0,
+            }
+            for a, count, last_txn, debits, credits in rows
+        ]
+
+    @staticmethod
+    def get_net_worth(db: Session, base: str, user_id: Optional[int] = None):
+        """Total balance in `base`: one grouped query per currency, converted with cached rates.
+
+        Raises fx.UnknownCurrency if `base` has no rate.
+        """
+        filters = [Account.deleted_at.is_(None), owner_not_erased()]
+        if user_id is not None:
+            filters.append(Account.user_id == user_id)
+        currency = func.upper(func.coalesce(Account.currency, "USD"))
+        grouped = db.execute(
+            select(currency, func.count(Account.id), func.coalesce(func.sum(Account.balance), 0))
+            .where(*filters)
+            .group_by(currency)
+        ).all()
+
+        totals = {code: amount for code, _, amount in grouped}
+        counts = {code: n for code, n, _ in grouped}
+        rows, missing = fx.convert_totals(db, totals, base)
+        _, as_of = fx.fx_rates.rates(db)
+        for row in rows:
+            row["accounts"] = counts[row["currency"]]
+        return {
+            "base": fx.normalize_currency(base),
+            "total": sum((r["converted"] for r in rows), Decimal("0")),
+            "rates_as_of": as_of,
+            "currencies": rows,
+            "unconverted": missing,
+        }
+
     @staticmethod
     def update_account(db: Session, account: Account, account_data: AccountUpdate):
         data = account_data.dict(exclude_unset=True)
@@ -73,40 +181,65 @@ class AccountService:
         return account
     
     @staticmethod
-    def delete_account(db: Session, account: Account):
-        # Delete related transactions and bills first to avoid FK constraint issues.
-        # Commit after deleting dependents so a failure there doesn't leave the
-        # session in an aborted state when we try to delete the account itself.
-        txns_deleted = 0
-        bills_deleted = 0
-        try:
-            txns_deleted = db.query(Transaction).filter(Transaction.account_id == account.id).delete(synchronize_session=False)
-            # Some deployments / schemas may not have `bills.account_id` column in the DB.
-            # Inspect the database to confirm the physical column exists before issuing the DELETE.
-            try:
-                inspector = inspect(db.bind)
-                bill_columns = [col['name'] for col in inspector.get_columns('bills')]
-            except Exception:
-                bill_columns = []
-
-            if 'account_id' in bill_columns:
-                bills_deleted = db.query(Bill).filter(Bill.account_id == account.id).delete(synchronize_session=False)
+    def _count_transactions(db: Session, account_id: int, limit: int) -> int:
+        # bounded: stops reading the account_id index after `limit` rows
+        probe = select(Transaction.id).where(Transaction.account_id == account_id).limit(limit).subquery()
+        return db.execute(select(func.count()).select_from(probe)).scalar() or 0
 
-            db.commit()
-        except Exception:
-            db.rollback()
-            raise
+    @staticmethod
+    def _delete_dependents(db: Session, account_id: int, transactions: bool = True) -> int:
+        """Delete the account's bills (and transactions) the database would not cascade to."""
+        facts = schema_facts()
+        deleted = 0
+        if transactions and not facts.cascades_on_delete("transactions", "account_id"):
+            deleted += db.query(Transaction).filter(Transaction.account_id == account_id).delete(synchronize_session=False)
+        # some deployments have no `bills.account_id` column at all
+        if facts.has_column("bills", "account_id") and not facts.cascades_on_delete("bills", "account_id"):
+            deleted += db.query(Bill).filter(Bill.account_id == account_id).delete(synchronize_session=False)
+        return deleted
+
+    @staticmethod
+    def delete_account(db: Session, account: Account, requested_by: int = None):
+        """Delete an account with its transactions and bills.
 
-        # Now delete the account in a fresh transaction. If this fails, it will
-        # raise and leave the DB consistent because dependents were already removed.
+        Normally one short transaction: the account row is deleted and the
+        ON DELETE CASCADE foreign keys remove the dependents. Accounts with
+        more than ACCOUNT_PURGE_THRESHOLD transactions are hidden at once
+        (`deleted_at`) and purged in bounded batches by a background job;
+        the result then carries that job's progress under "job".
+        """
+        threshold = settings.ACCOUNT_PURGE_THRESHOLD
         try:
-            db.delete(account)
+            txns = AccountService._count_transactions(db, account.id, threshold + 1)
+            if threshold > 0 and txns > threshold:
+                account.deleted_at = datetime.utcnow()
+                job = purge.enqueue(db, "account", account.id, requested_by)
+                db.commit()
+                purge.start_purge(job.id)
+                return {"job": purge.progress(job)}
+
+            bills = 0
+            if schema_facts().has_column("bills", "account_id"):
+                bills = db.query(func.count(Bill.id)).filter(Bill.account_id == account.id).scalar() or 0
+            AccountService._delete_dependents(db, account.id)
+            db.query(Account).filter(Account.id == account.id).delete(synchronize_session=False)
             db.commit()
         except Exception:
             db.rollback()
             raise
 
         return {
-            "txns_deleted": int(txns_deleted or 0),
-            "bills_deleted": int(bills_deleted or 0)
+            "txns_deleted": int(txns),
+            "bills_deleted": int(bills)
         }
+
+    @staticmethod
+    def purge_step(db: Session, account_id: int, batch_size: int):
+        """One batch of a background account purge (see `app.utils.purge`)."""
+        deleted = purge.delete_batch(db, Transaction, Transaction.account_id == account_id, batch_size)
+        if deleted >= batch_size:
+            return deleted, False
+        # the remainder is small: finish with the account row itself
+        deleted += AccountService._delete_dependents(db, account_id, transactions=False)
+        deleted += db.query(Account).filter(Account.id == account_id).delete(synchronize_session=False)
+        return deleted, True
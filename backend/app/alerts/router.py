@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.dependencies import get_current_user, require_write_access, get_current_principal
+from app.models.user import User
+from app.models.account import Account
+from app.alerts.schemas import AlertRuleCreate, AlertRuleUpdate, AlertRuleResponse, AlertResponse
+from app.alerts import service as alerts_service
+
+router = APIRouter()
+
+
+def _check_account_owner(db: Session, account_id, current_user: User):
+    if account_id is None:
+        return
+    account = db.query(Account).filter(Account.id == account_id).first()
+    if not account or account.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Referenced account not found")
+
+
+@router.get("/", response_model=List[AlertResponse])
+async def list_alerts(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Alerts triggered for the current user, newest first."""
+    return alerts_service.get_alerts_for_user(db, current_user.id, skip, limit)
+
+
+@router.get("/rules", response_model=List[AlertRuleResponse])
+async def list_rules(current_user: User = Depends(get_current_principal), db: Session = Depends(get_db)):
+    return alerts_service.get_rules_for_user(db, current_user.id)
+
+
+@router.post("/rules", response_model=AlertRuleResponse)
+async def create_rule(
+    rule_data: AlertRuleCreate,
+    current_user: User = Depends(require_write_access),
+    db: Session = Depends(get_db)
+):
+    _check_account_owner(db, rule_data.account_id, current_user)
+    return alerts_service.create_rule(db, current_user.id, rule_data)
+
+
+@router.put("/rules/{rule_id}", response_model=AlertRuleResponse)
+async def update_rule(
+    rule_id: int,
+    rule_data: AlertRuleUpdate,
+    current_user: User = Depends(require_write_access),
+    db: Session = Depends(get_db)
+):
+    rule = alerts_service.get_rule(db, rule_id, current_user.id)
+    if not rule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert rule not found")
+    _check_account_owner(db, rule_data.account_id, current_user)
+    return alerts_service.update_rule(db, rule, rule_data)
+
+
+@router.delete("/rules/{rule_id}")
+async def delete_rule(
+    rule_id: int,
+    current_user: User = Depends(require_write_access),
+    db: Session = Depends(get_db)
+):
+    rule = alerts_service.get_rule(db, rule_id, current_user.id)
+    if not rule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert rule not found")
+    alerts_service.delete_rule(db, rule)
+    return {"message": "Alert rule deleted"}
@@ -0,0 +1,74 @@
+from pydantic import BaseModel, validator
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.alert import AlertRuleTypeEnum
+
+
+RULE_TYPES = {t.value for t in AlertRuleTypeEnum}
+# rule types that are meaningless without a threshold
+THRESHOLD_REQUIRED = {"low_balance", "budget_percent", "large_transaction"}
+
+
+class AlertRuleCreate(BaseModel):
+    rule_type: str
+    threshold: Optional[Decimal] = None
+    account_id: Optional[int] = None
+    category: Optional[str] = None
+    enabled: bool = True
+
+    @validator("rule_type")
+    def _check_rule_type(cls, v):
+        v = (v or "").strip().lower()
+        if v not in RULE_TYPES:
+            raise ValueError(f"rule_type must be one of: {', '.join(sorted(RULE_TYPES))}")
+        return v
+
+    @validator("threshold", always=True)
+    def _check_threshold(cls, v, values):
+        if v is None and values.get("rule_type") in THRESHOLD_REQUIRED:
+            raise ValueError("threshold is required for this rule_type")
+        if v is not None and v < 0:
+            raise ValueError("threshold must be non-negative")
+        return v
+
+
+class AlertRuleUpdate(BaseModel):
+    threshold: Optional[Decimal] = None
+    account_id: Optional[int] = None
+    category: Optional[str] = None
+    enabled: Optional[bool] = None
+
+    @validator("threshold")
+    def _check_threshold(cls, v):
+        if v is not None and v < 0:
+            raise ValueError("threshold must be non-negative")
+        return v
+
+
+class AlertRuleResponse(BaseModel):
+    id: int
+    user_id: int
+    rule_type: str
+    threshold: Optional[Decimal]
+    account_id: Optional[int]
+    category: Optional[str]
+    enabled: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AlertResponse(BaseModel):
+    id: int
+    user_id: int
+    rule_id: Optional[int]
+    transaction_id: Optional[int]
+    type: str
+    message: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,355 @@
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.account import Account
+from app.models.alert import Alert, AlertRule, KnownMerchant
+from app.models.transaction import Transaction
+from app.notifications.events import publish_event
+from app.notifications.models import Notification
+from app.alerts.schemas import AlertRuleCreate, AlertRuleUpdate
+from app.utils.db import dialect_insert
+
+
+# Minimal view of a written transaction; lets callers evaluate rules from
+# values they already hold instead of reloading expired ORM rows.
+TxnFacts = namedtuple("TxnFacts", ["id", "account_id", "amount", "txn_type", "merchant", "category"])
+
+_PendingAlert = namedtuple("_PendingAlert", ["rule_id", "type", "message", "transaction_id"])
+
+_ALERT_TITLES = {
+    "low_balance": "Low balance",
+    "budget_percent": "Budget alert",
+    "large_transaction": "Large transaction",
+    "unusual_merchant": "New merchant",
+}
+
+
+def _dec(value) -> Decimal:
+    if value is None:
+        return Decimal("0")
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _norm(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = value.strip().lower()
+    return value[:255] or None
+
+
+def _is_debit(txn_type: Optional[str]) -> bool:
+    return (txn_type or "").strip().lower() == "debit"
+
+
+class CompiledRuleSet:
+    """A user's enabled rules grouped by type with thresholds pre-parsed.
+
+    An empty rule set is falsy, so users without rules cost nothing per write.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule]):
+        self.low_balance: List[Tuple[int, Optional[int], Decimal]] = []
+        self.budget_percent: List[Tuple[int, Optional[str], Decimal]] = []
+        self.large_transaction: List[Tuple[int, Optional[int], Optional[str], Decimal]] = []
+        self.unusual_merchant: List[Tuple[int, Optional[int], Decimal]] = []
+        for r in rules:
+            threshold = _dec(r.threshold)
+            if r.rule_type == "low_balance":
+                self.low_balance.append((r.id, r.account_id, threshold))
+            elif r.rule_type == "budget_percent":
+                self.budget_percent.append((r.id, _norm(r.category), threshold))
+            elif r.rule_type == "large_transaction":
+                self.large_transaction.append((r.id, r.account_id, _norm(r.category), threshold))
+            elif r.rule_type == "unusual_merchant":
+                self.unusual_merchant.append((r.id, r.account_id, threshold))
+
+    def __bool__(self):
+        return bool(self.low_balance or self.budget_percent or self.large_transaction or self.unusual_merchant)
+
+    def check_transaction(self, txn: TxnFacts, balance_before: Decimal, balance_after: Decimal,
+                          new_merchants: Set[str]) -> List[_PendingAlert]:
+        pending = []
+        amount = _dec(txn.amount)
+        category = _norm(txn.category)
+
+        for rule_id, account_id, threshold in self.low_balance:
+            if account_id is not None and account_id != txn.account_id:
+                continue
+            # fire only when the balance crosses the threshold, not on every txn below it
+            if balance_before >= threshold > balance_after:
+                pending.append(_PendingAlert(rule_id, "low_balance",
+                                             f"Account {txn.account_id} balance fell to {balance_after} (below {threshold}).",
+                                             txn.id))
+
+        for rule_id, account_id, rule_cat, threshold in self.large_transaction:
+            if account_id is not None and account_id != txn.account_id:
+                continue
+            if rule_cat is not None and rule_cat != category:
+                continue
+            if amount >= threshold:
+                pending.append(_PendingAlert(rule_id, "large_transaction",
+                                             f"Large {txn.txn_type} of {amount} on account {txn.account_id}"
+                                             + (f" at {txn.merchant}." if txn.merchant else "."),
+                                             txn.id))
+
+        merchant = _norm(txn.merchant)
+        if merchant is not None and merchant in new_merchants:
+            for rule_id, account_id, threshold in self.unusual_merchant:
+                if account_id is not None and account_id != txn.account_id:
+                    continue
+                if amount >= threshold:
+                    pending.append(_PendingAlert(rule_id, "unusual_merchant",
+                                                 f"First payment to '{txn.merchant}' ({amount}) on account {txn.account_id}.",
+                                                 txn.id))
+        return pending
+
+    def covers_budget(self, category: Optional[str]) -> bool:
+        """True if a budget_percent rule watches budgets of `category`."""
+        category = _norm(category)
+        return any(rule_cat is None or rule_cat == category for _, rule_cat, _ in self.budget_percent)
+
+    def check_budget(self, budget, old_spent: Decimal, new_spent: Decimal,
+                     transaction_id: Optional[int] = None) -> List[_PendingAlert]:
+        pending = []
+        limit = _dec(budget.limit_amount)
+        if limit <= 0:
+            return pending
+        budget_cat = _norm(budget.category)
+        old_pct = _dec(old_spent) * 100 / limit
+        new_pct = _dec(new_spent) * 100 / limit
+        for rule_id, rule_cat, threshold in self.budget_percent:
+            if rule_cat is not None and rule_cat != budget_cat:
+                continue
+            if old_pct < threshold <= new_pct:
+                label = budget.category or "overall"
+                pending.append(_PendingAlert(rule_id, "budget_percent",
+                                             f"Budget '{label}' for {budget.month}/{budget.year} reached "
+                                             f"{new_pct:.0f}% of its limit ({new_spent} of {limit}).",
+                                             transaction_id))
+        return pending
+
+
+_cache_lock = threading.Lock()
+_ruleset_cache: Dict[int, Tuple[float, CompiledRuleSet]] = {}
+
+
+def get_ruleset(db: Session, user_id: int) -> CompiledRuleSet:
+    """Return the user's compiled rules, cached per process for ALERT_RULES_CACHE_SECONDS."""
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _ruleset_cache.get(user_id)
+    if hit is not None and now - hit[0] < settings.ALERT_RULES_CACHE_SECONDS:
+        return hit[1]
+    rules = db.query(AlertRule).filter(AlertRule.user_id == user_id, AlertRule.enabled.is_(True)).all()
+    ruleset = CompiledRuleSet(rules)
+    with _cache_lock:
+        _ruleset_cache[user_id] = (now, ruleset)
+    return ruleset
+
+
+def invalidate_ruleset(user_id: int) -> None:
+    with _cache_lock:
+        _ruleset_cache.pop(user_id, None)
+
+
+def _record_merchants(db: Session, user_id: int, merchants: Iterable[Optional[str]]) -> Set[str]:
+    """Remember merchants for the user; returns the ones never seen before."""
+    names = {n for n in (_norm(m) for m in merchants) if n}
+    if not names:
+        return set()
+    insert = dialect_insert(db)
+    if insert is None:
+        known = {r[0] for r in db.query(KnownMerchant.merchant).filter(
+            KnownMerchant.user_id == user_id, KnownMerchant.merchant.in_(names)).all()}
+        new = names - known
+        db.add_all([KnownMerchant(user_id=user_id, merchant=m) for m in new])
+        return new
+    stmt = (
+        insert(KnownMerchant)
+        .values([{"user_id": user_id, "merchant": m} for m in names])
+        .on_conflict_do_nothing()
+        .returning(KnownMerchant.merchant)
+    )
+    return {r[0] for r in db.execute(stmt)}
+
+
+def _seed_known_merchants(db: Session, user_id: int) -> None:
+    """One-time set-based import of the user's historical merchants."""
+    insert = dialect_insert(db)
+    if insert is None:
+        return
+    merchant = func.lower(func.trim(Transaction.merchant))
+    history = (
+        select(literal(user_id), merchant)
+        .select_from(Transaction)
+        .join(Account, Account.id == Transaction.account_id)
+        .where(Account.user_id == user_id, Transaction.merchant.isnot(None), func.trim(Transaction.merchant) != "")
+        .distinct()
+    )
+    db.execute(insert(KnownMerchant).from_select(["user_id", "merchant"], history).on_conflict_do_nothing())
+
+
+def _emit(db: Session, user_id: int, pending: List[_PendingAlert]) -> List[Alert]:
+    alerts = [
+        Alert(user_id=user_id, rule_id=p.rule_id, transaction_id=p.transaction_id, type=p.type, message=p.message)
+        for p in pending
+    ]
+    notifications = [
+        Notification(user_id=user_id, type="alert", title=_ALERT_TITLES.get(p.type, "Alert"), message=p.message, sent=False)
+        for p in pending
+    ]
+    db.add_all(alerts)
+    db.add_all(notifications)
+    db.flush()
+    for n in notifications:
+        publish_event(db, user_id, "notification", {"id": n.id, "type": n.type, "title": n.title})
+    return alerts
+
+
+class AlertService:
+    @staticmethod
+    def create_rule(db: Session, user_id: int, data: AlertRuleCreate):
+        rule = AlertRule(
+            user_id=user_id,
+            rule_type=data.rule_type,
+            threshold=data.threshold,
+            account_id=data.account_id,
+            category=data.category,
+            enabled=data.enabled,
+        )
+        db.add(rule)
+        if rule.rule_type == "unusual_merchant":
+            _seed_known_merchants(db, user_id)
+        db.commit()
+        db.refresh(rule)
+        invalidate_ruleset(user_id)
+        return rule
+
+    @staticmethod
+    def get_rules_for_user(db: Session, user_id: int):
+        return db.query(AlertRule).filter(AlertRule.user_id == user_id).order_by(AlertRule.id).all()
+
+    @staticmethod
+    def get_rule(db: Session, rule_id: int, user_id: int):
+        return db.query(AlertRule).filter(AlertRule.id == rule_id, AlertRule.user_id == user_id).first()
+
+    @staticmethod
+    def update_rule(db: Session, rule: AlertRule, data: AlertRuleUpdate):
+        changes = data.dict(exclude_unset=True)
+        re_enabled = changes.get("enabled") is True and not rule.enabled
+        for key, value in changes.items():
+            setattr(rule, key, value)
+        if re_enabled and rule.rule_type == "unusual_merchant":
+            # merchants seen while the rule was off must not count as new
+            _seed_known_merchants(db, rule.user_id)
+        db.commit()
+        db.refresh(rule)
+        invalidate_ruleset(rule.user_id)
+        return rule
+
+    @staticmethod
+    def delete_rule(db: Session, rule: AlertRule):
+        user_id = rule.user_id
+        db.delete(rule)
+        db.commit()
+        invalidate_ruleset(user_id)
+
+    @staticmethod
+    def get_alerts_for_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+        return db.query(Alert).filter(Alert.user_id == user_id).order_by(
+            Alert.created_at.desc(), Alert.id.desc()
+        ).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def evaluate_transaction(db: Session, user_id: int, txn: TxnFacts, balance_after,
+                             budget_change: Optional[Tuple] = None) -> List[Alert]:
+        """Evaluate the user's rules against one newly written transaction.
+
+        `balance_after` is the account balance including `txn`; `budget_change`
+        is the optional `(budget, old_spent, new_spent)` produced by the same write.
+        """
+        ruleset = get_ruleset(db, user_id)
+        if not ruleset:
+            return []
+
+        amount = _dec(txn.amount)
+        after = _dec(balance_after)
+        before = after + amount if _is_debit(txn.txn_type) else after - amount
+
+        new_merchants = _record_merchants(db, user_id, [txn.merchant]) if ruleset.unusual_merchant else set()
+        pending = ruleset.check_transaction(txn, before, after, new_merchants)
+        if budget_change is not None:
+            budget, old_spent, new_spent = budget_change
+            pending += ruleset.check_budget(budget, old_spent, new_spent, txn.id)
+
+        alerts = _emit(db, user_id, pending) if pending else []
+        db.commit()
+        return alerts
+
+    @staticmethod
+    def evaluate_import(db: Session, user_id: int, account_id: int, txns: List[TxnFacts], start_balance,
+                        budget_changes: Optional[List[Tuple]] = None) -> List[Alert]:
+        """Evaluate rules over a freshly imported batch in one pass.
+
+        Balances are replayed in memory from `start_balance`, new merchants are
+        detected with one multi-row insert, and all alerts are written together.
+        `budget_changes` are the `(budget, old_spent, new_spent)` the import
+        applied; budget rules are checked once per budget, not per row.
+        """
+        ruleset = get_ruleset(db, user_id)
+        if not ruleset or not txns:
+            return []
+
+        new_merchants = _record_merchants(db, user_id, [t.merchant for t in txns]) if ruleset.unusual_merchant else set()
+        pending: List[_PendingAlert] = []
+        flagged: Set[str] = set()
+        running = _dec(start_balance)
+        for t in txns:
+            before = running
+            amount = _dec(t.amount)
+            running = before - amount if _is_debit(t.txn_type) else before + amount
+            merchant = _norm(t.merchant)
+            # only the first occurrence of a new merchant within the batch is unusual
+            fresh = {merchant} if merchant in new_merchants and merchant not in flagged else set()
+            flagged |= fresh
+            pending += ruleset.check_transaction(t, before, running, fresh)
+        for budget, old_spent, new_spent in budget_changes or ():
+            pending += ruleset.check_budget(budget, old_spent, new_spent)
+
+        alerts = _emit(db, user_id, pending) if pending else []
+        db.commit()
+        return alerts
+
+
+# Compatibility wrappers
+def create_rule(db: Session, user_id: int, data: AlertRuleCreate):
+    return AlertService.create_rule(db, user_id, data)
+
+def get_rules_for_user(db: Session, user_id: int):
+    return AlertService.get_rules_for_user(db, user_id)
+
+def get_rule(db: Session, rule_id: int, user_id: int):
+    return AlertService.get_rule(db, rule_id, user_id)
+
+def update_rule(db: Session, rule: AlertRule, data: AlertRuleUpdate):
+    return AlertService.update_rule(db, rule, data)
+
+def delete_rule(db: Session, rule: AlertRule):
+    return AlertService.delete_rule(db, rule)
+
+def get_alerts_for_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    return AlertService.get_alerts_for_user(db, user_id, skip, limit)
+
+def evaluate_transaction(db: Session, user_id: int, txn: TxnFacts, balance_after, budget_change: Optional[Tuple] = None):
+    return AlertService.evaluate_transaction(db, user_id, txn, balance_after, budget_change)
+
+def evaluate_import(db: Session, user_id: int, account_id: int, txns: List[TxnFacts], start_balance,
+                    budget_changes: Optional[List[Tuple]] = None):
+    return AlertService.evaluate_import(db, user_id, account_id, txns, start_balance, budget_changes)
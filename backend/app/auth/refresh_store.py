@@ -0,0 +1,117 @@
+"""Server-side state for refresh-token rotation.
+
+Only a SHA-256 of each token's `jti` is stored. A refresh consumes its row
+with one UPDATE on the unique `jti_hash` index; the extra lookup for reuse
+detection only runs when that fails.
+"""
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import RefreshToken
+from app.utils.db import dialect_insert
+
+
+def hash_jti(jti: str) -> str:
+    return hashlib.sha256(jti.encode("utf-8")).hexdigest()
+
+
+def store_refresh_token(db: Session, user_id: int, jti: str, family_id: str,
+                        parent_id: Optional[int] = None) -> None:
+    """Record a newly issued refresh token; caller commits."""
+    db.add(RefreshToken(
+        jti_hash=hash_jti(jti),
+        family_id=family_id,
+        parent_id=parent_id,
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+
+
+def consume_refresh_token(db: Session, jti: str):
+    """Mark the token used if it is still live; returns (id, family_id, user_id) or None."""
+    now = datetime.utcnow()
+    return db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti_hash == hash_jti(jti),
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(RefreshToken.id, RefreshToken.family_id, RefreshToken.user_id)
+    ).first()
+
+
+def legacy_jti(refresh_token: str) -> str:
+    """Stand-in jti for tokens issued before rotation was tracked (they carry none)."""
+    return "legacy:" + refresh_token
+
+
+def claim_legacy_token(db: Session, user_id: int, jti: str, expires_at: datetime):
+    """Record a jti-less token as used on its first refresh; caller commits.
+
+    Returns (id, family_id, user_id) like `consume_refresh_token`, or None if
+    the token was already claimed: from then on it is an ordinary consumed
+    token, and replaying it revokes the family it started.
+    """
+    values = dict(
+        jti_hash=hash_jti(jti),
+        family_id=uuid.uuid4().hex,
+        user_id=user_id,
+        expires_at=expires_at,
+        used_at=datetime.utcnow(),
+    )
+    returning = (RefreshToken.id, RefreshToken.family_id, RefreshToken.user_id)
+    insert = dialect_insert(db)
+    if insert is not None:
+        return db.execute(
+            insert(RefreshToken).values(**values)
+            .on_conflict_do_nothing(index_elements=[RefreshToken.jti_hash])
+            .returning(*returning)
+        ).first()
+    if db.execute(select(RefreshToken.id).where(RefreshToken.jti_hash == values["jti_hash"])).first():
+        return None
+    row = RefreshToken(**values)
+    db.add(row)
+    db.flush()
+    return db.execute(select(*returning).where(RefreshToken.id == row.id)).first()
+
+
+def revoke_family_on_reuse(db: Session, jti: str) -> bool:
+    """If `jti` was already rotated, revoke its whole family (caller commits).
+
+    A consumed token coming back means it was copied: whoever holds the
+    family's newest token is cut off too and must sign in again.
+    """
+    row = db.execute(
+        select(RefreshToken.family_id, RefreshToken.used_at).where(RefreshToken.jti_hash == hash_jti(jti))
+    ).first()
+    if row is None or row.used_at is None:
+        return False
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == row.family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    return True
+
+
+def purge_expired_refresh_tokens(db: Session, batch_size: int = 5000) -> int:
+    """Delete expired rows in small batches so no long lock is held."""
+    total = 0
+    while True:
+        ids = select(RefreshToken.id).where(RefreshToken.expires_at < datetime.utcnow()).limit(batch_size)
+        deleted = db.execute(
+            delete(RefreshToken).where(RefreshToken.id.in_(ids)).execution_options(synchronize_session=False)
+        ).rowcount or 0
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
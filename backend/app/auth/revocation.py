@@ -0,0 +1,146 @@
+"""Token revocation for the stateless auth mode.
+
+Every issued token carries the user's `token_version` as `ver`. Revoking
+bumps the version and records it in `token_revocations`; rows only need to
+live as long as an access token, so each worker keeps the whole table in
+memory (`revocations`) and reloads it every AUTH_REVOCATION_REFRESH_SECONDS.
+Checking a token is then a dict lookup instead of a users query.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.user import TokenRevocation, User
+from app.utils.db import dialect_insert
+
+# a set not refreshed for this many intervals is stale: callers fall back to the DB
+STALE_AFTER_REFRESHES = 3
+
+# version recorded for deleted accounts: no token can ever match it
+DELETED_USER_VERSION = 2 ** 31 - 1
+
+
+def _horizon() -> datetime:
+    # past this age every token issued before the revocation has expired anyway
+    return datetime.utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES + 5)
+
+
+class RevocationCache:
+    def __init__(self):
+        self._min_versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    @property
+    def fresh(self) -> bool:
+        """Loaded, and refreshed within STALE_AFTER_REFRESHES refresh intervals."""
+        loaded_at = self.loaded_at
+        if loaded_at is None:
+            return False
+        max_age = settings.AUTH_REVOCATION_REFRESH_SECONDS * STALE_AFTER_REFRESHES
+        return time.monotonic() - loaded_at <= max_age
+
+    def is_revoked(self, user_id: int, token_version: int) -> bool:
+        with self._lock:
+            return token_version < self._min_versions.get(user_id, 0)
+
+    def note(self, user_id: int, min_version: int) -> None:
+        """Apply a revocation made by this process without waiting for the next refresh."""
+        with self._lock:
+            if min_version > self._min_versions.get(user_id, 0):
+                self._min_versions[user_id] = min_version
+
+    def refresh(self, db: Session) -> int:
+        rows = db.execute(
+            select(TokenRevocation.user_id, TokenRevocation.token_version)
+            .where(TokenRevocation.revoked_at >= _horizon())
+        ).all()
+        with self._lock:
+            self._min_versions = {r.user_id: r.token_version for r in rows}
+            self.loaded_at = time.monotonic()
+        return len(rows)
+
+
+revocations = RevocationCache()
+
+
+def revoke_user_tokens(db: Session, user_id: int, deleted: bool = False) -> int:
+    """Invalidate every token issued to `user_id` so far; the caller commits.
+
+    Returns the new minimum token version.
+    """
+    if deleted:
+        version = DELETED_USER_VERSION
+    else:
+        version = db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+            .returning(User.token_version)
+        ).scalar() or 0
+    insert = dialect_insert(db)
+    if insert is not None:
+        stmt = insert(TokenRevocation).values(user_id=user_id, token_version=version, revoked_at=datetime.utcnow())
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[TokenRevocation.user_id],
+            set_={"token_version": stmt.excluded.token_version, "revoked_at": stmt.excluded.revoked_at},
+        ))
+    else:
+        db.merge(TokenRevocation(user_id=user_id, token_version=version, revoked_at=datetime.utcnow()))
+    revocations.note(user_id, version)
+    return version
+
+
+def purge_expired_revocations(db: Session) -> int:
+    result = db.execute(delete(TokenRevocation).where(TokenRevocation.revoked_at < _horizon()))
+    db.commit()
+    return result.rowcount or 0
+
+
+def refresh_once() -> int:
+    db = SessionLocal()
+    try:
+        purge_expired_revocations(db)
+        return revocations.refresh(db)
+    finally:
+        db.close()
+
+
+_refresher_thread: Optional[threading.Thread] = None
+
+
+def _refresh_loop(interval_seconds: int):
+    # the first load happens here, off the boot path; until it succeeds (and
+    # whenever refreshes keep failing) the set is not fresh and requests fall
+    # back to loading the user
+    while True:
+        try:
+            refresh_once()
+        except Exception as e:
+            print("Token revocation refresh failed:", e)
+        time.sleep(interval_seconds)
+
+
+def start_refresher() -> bool:
+    """Load the revocation set and keep it fresh (stateless mode only)."""
+    global _refresher_thread
+    if not settings.AUTH_STATELESS:
+        return False
+    if _refresher_thread is not None and _refresher_thread.is_alive():
+        return True
+    _refresher_thread = threading.Thread(
+        target=_refresh_loop, args=(settings.AUTH_REVOCATION_REFRESH_SECONDS,),
+        name="token-revocations", daemon=True,
+    )
+    _refresher_thread.start()
+    return True
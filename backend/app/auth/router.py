@@ -8,12 +8,25 @@ from app.models.user import User
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.users.service import UserService
+from app.utils.password_hash import PasswordHasherBusy
+from app.auth.revocation import revoke_user_tokens
 
 router = APIRouter()
 
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many sign-in requests in progress, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=AuthResponse)
 async def register(user_data: UserRegister, db: Session = Depends(get_db)):
-    user, error = AuthService.register_user(db, user_data)
+    try:
+        user, error = await AuthService.register_user_async(db, user_data)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     
     if error:
         raise HTTPException(
@@ -21,7 +34,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
             detail=error
         )
     
-    access_token, refresh_token = AuthService.create_tokens(user.id, getattr(user, "role", "user"))
+    access_token, refresh_token = AuthService.issue_tokens(db, user)
     
     return {
         "user": UserResponse.from_orm(user),
@@ -39,7 +52,10 @@ async def get_current_user_profile(db: Session = Depends(get_db), current_user:
 
 @router.post("/login", response_model=AuthResponse)
 async def login(login_data: UserLogin, db: Session = Depends(get_db)):
-    user, error = AuthService.login_user(db, login_data)
+    try:
+        user, error = await AuthService.login_user_async(db, login_data)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     
     if error:
         raise HTTPException(
@@ -47,7 +63,7 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
             detail=error
         )
     
-    access_token, refresh_token = AuthService.create_tokens(user.id, getattr(user, "role", "user"))
+    access_token, refresh_token = AuthService.issue_tokens(db, user)
     
     return {
         "user": UserResponse.from_orm(user),
@@ -74,3 +90,11 @@ async def refresh_tokens(data: RefreshRequest, db: Session = Depends(get_db)):
         "refresh_token": refresh_token,
         "token_type": "bearer"
     }
+
+
+@router.post("/logout-all")
+async def logout_all(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Revoke every access and refresh token issued to the current user."""
+    revoke_user_tokens(db, current_user.id)
+    db.commit()
+    return {"message": "All sessions have been signed out"}
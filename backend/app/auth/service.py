@@ -1,8 +1,70 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Set
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
 from app.models.user import User
 from app.auth.schemas import UserRegister, UserLogin
-from app.utils.password_hash import hash_password, verify_password
+from app.utils.password_hash import (
+    hash_password, verify_password, hash_password_async, verify_password_async,
+    needs_rehash, PasswordHasherBusy,
+)
 from app.utils.jwt_handler import create_access_token, create_refresh_token, verify_token
+from app.auth import refresh_store
+
+# strong references to running rehash tasks, and the users they are for
+_rehash_tasks: Set[asyncio.Task] = set()
+_rehash_users: Set[int] = set()
+
+
+def _store_rehash(user_id: int, old_hash: str, new_hash: str) -> bool:
+    # Compare-and-set: a password changed meanwhile must not be overwritten
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            update(User).where(User.id == user_id, User.password == old_hash).values(password=new_hash)
+        )
+        db.commit()
+        return result.rowcount == 1
+    finally:
+        db.close()
+
+
+async def _rehash(user_id: int, password: str, old_hash: str):
+    try:
+        new_hash = await hash_password_async(password)
+        await asyncio.get_running_loop().run_in_executor(None, _store_rehash, user_id, old_hash, new_hash)
+    except PasswordHasherBusy:
+        # logins have priority for the pool; the next login retries
+        pass
+    except Exception as e:
+        print(f"Password rehash failed for user {user_id}:", e)
+    finally:
+        _rehash_users.discard(user_id)
+
+
+def schedule_rehash(user: User, password: str) -> bool:
+    """Re-hash `user`'s password with the current parameters after the response, if outdated.
+
+    Only acts inside a running event loop; returns True if a rehash was scheduled.
+    """
+    if not settings.PASSWORD_REHASH_ON_LOGIN or not needs_rehash(user.password):
+        return False
+    if user.id in _rehash_users:
+        return False
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    _rehash_users.add(user.id)
+    task = loop.create_task(_rehash(user.id, password, user.password))
+    _rehash_tasks.add(task)
+    task.add_done_callback(_rehash_tasks.discard)
+    return True
+
 
 class AuthService:
     @staticmethod
@@ -38,9 +100,66 @@ class AuthService:
         return user, None
     
     @staticmethod
-    def create_tokens(user_id: int, role: str = "user"):
-        access_token = create_access_token({"sub": str(user_id), "role": role})
-        refresh_token = create_refresh_token({"sub": str(user_id), "role": role})
+    async def register_user_async(db: Session, user_data: UserRegister):
+        """`register_user` with the Argon2 hash computed on the hashing pool.
+
+        Raises PasswordHasherBusy when the pool is saturated.
+        """
+        existing_user = db.query(User).filter(User.email == user_data.email).first()
+        if existing_user:
+            return None, "Email already registered"
+
+        hashed_password = await hash_password_async(user_data.password)
+        new_user = User(
+            name=user_data.name,
+            email=user_data.email,
+            password=hashed_password,
+            phone=user_data.phone,
+            role=(getattr(user_data, "role", None) or "user")
+        )
+
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+
+        return new_user, None
+
+    @staticmethod
+    async def login_user_async(db: Session, login_data: UserLogin):
+        """`login_user` with verification on the hashing pool, keeping the event loop free.
+
+        Hashes made with outdated Argon2 parameters are upgraded in the
+        background. Raises PasswordHasherBusy when the pool is saturated.
+        """
+        user = db.query(User).filter(User.email == login_data.email).first()
+
+        if not user or not await verify_password_async(login_data.password, user.password):
+            return None, "Invalid credentials"
+
+        schedule_rehash(user, login_data.password)
+        return user, None
+
+    @staticmethod
+    def create_tokens(user_id: int, role: str = "user", token_version: int = 0):
+        claims = {"sub": str(user_id), "role": role, "ver": token_version or 0}
+        access_token = create_access_token(claims)
+        refresh_token = create_refresh_token(claims)
+        return access_token, refresh_token
+
+    @staticmethod
+    def issue_tokens(db: Session, user: User, family_id: str = None, parent_id: int = None):
+        """Create an access/refresh pair and record the refresh token (commits).
+
+        A new login starts a new refresh family; rotation passes the family
+        and the consumed token's id.
+        """
+        claims = {"sub": str(user.id), "role": getattr(user, "role", "user"), "ver": user.token_version or 0}
+        jti = uuid.uuid4().hex
+        family_id = family_id or uuid.uuid4().hex
+        access_token = create_access_token(claims)
+        refresh_token = create_refresh_token({**claims, "jti": jti})
+        refresh_store.store_refresh_token(db, user.id, jti, family_id, parent_id)
+        db.commit()
         return access_token, refresh_token
 
     @staticmethod
@@ -53,15 +172,34 @@ class AuthService:
         if user_id is None:
             return None, "Invalid token payload"
 
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        jti = payload.get("jti")
+        if jti:
+            consumed = refresh_store.consume_refresh_token(db, jti)
+        else:
+            # tokens issued before rotation was tracked carry no jti: the first
+            # refresh records them as used and starts a family, replays are reuse
+            jti = refresh_store.legacy_jti(refresh_token)
+            expires_at = datetime.utcfromtimestamp(payload["exp"]) if payload.get("exp") else (
+                datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+            consumed = refresh_store.claim_legacy_token(db, int(user_id), jti, expires_at)
+        if consumed is None or consumed.user_id != int(user_id):
+            reused = refresh_store.revoke_family_on_reuse(db, jti)
+            db.commit()
+            if reused:
+                return None, "Refresh token reuse detected; please sign in again"
+            return None, "Invalid or expired refresh token"
+        family_id, parent_id = consumed.family_id, consumed.id
+
+        user = db.query(User).filter(User.id == int(user_id), User.deleted_at.is_(None)).first()
         if not user:
+            db.rollback()
             return None, "User not found"
 
+        if int(payload.get("ver") or 0) < (user.token_version or 0):
+            db.rollback()
+            return None, "Refresh token has been revoked"
+
         # Preserve role claim in newly issued tokens to ensure callers
         # who rely on token role (e.g., admin checks) continue to work.
-        role = getattr(user, "role", "user")
-        access_token = create_access_token({"sub": str(user.id), "role": role})
-        # rotate refresh token and include role as well
-        new_refresh_token = create_refresh_token({"sub": str(user.id), "role": role})
-
-        return (access_token, new_refresh_token), None
+        # The consumed token and its replacement are committed together.
+        return AuthService.issue_tokens(db, user, family_id, parent_id), None
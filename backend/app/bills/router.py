@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from typing import List
 from sqlalchemy.orm import Session
-from app.dependencies import get_current_user, RoleChecker, require_admin, require_write_access
+from app.dependencies import get_current_user, RoleChecker, require_admin, require_write_access, get_current_principal
 from app.models.user import User
 from app.models.account import Account
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.bills import service as bills_service
 from app.bills.schemas import BillCreate, BillUpdate, BillResponse
 from app.transactions.service import TransactionService
@@ -18,7 +18,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[BillResponse])
-def list_bills(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def list_bills(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_principal)):
 	# Admins can list all bills; regular users only their own.
 	print(f"DEBUG: Fetching bills for user_id={getattr(current_user, 'id', None)}")
 	try:
@@ -51,7 +51,7 @@ def list_bills(db: Session = Depends(get_db), current_user: User = Depends(get_c
 @router.post("/accounts/{account_id}/bills", response_model=BillResponse)
 def create_bill(account_id: int, payload: BillCreate, db: Session = Depends(get_db), current_user: User = Depends(require_write_access)):
 	# Verify account exists and belongs to the current user (unless admin)
-	account = db.query(Account).filter(Account.id == account_id).first()
+	account = db.query(Account).filter(Account.id == account_id, Account.deleted_at.is_(None)).first()
 	if not account:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
 
@@ -113,7 +113,7 @@ def update_bill(bill_id: int, payload: BillUpdate, db: Session = Depends(get_db)
 
 
 @router.get("/{bill_id}", response_model=BillResponse)
-def get_bill(bill_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_bill(bill_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
 	# Allow admins to fetch any bill; regular users only their own
 	bill = bills_service.get_bill_by_id(db, bill_id)
 	if not bill:
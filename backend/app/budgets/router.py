@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.dependencies import get_current_user, require_user_or_admin, require_write_access
+from app.database import get_db, get_read_db
+from app.dependencies import get_current_user, require_user_or_admin, require_write_access, get_current_principal
 from app.models.user import User
 from app.budgets.schemas import BudgetCreate, BudgetUpdate, BudgetResponse
 from app.budgets.service import BudgetService
@@ -25,7 +25,7 @@ async def get_budgets(
 	month: Optional[int] = Query(None),
 	year: Optional[int] = Query(None),
 	current_user: User = Depends(require_user_or_admin),
-	db: Session = Depends(get_db)
+	db: Session = Depends(get_read_db)
 ):
 	# Admins can list all budgets; regular users get only their own.
 	user_role = getattr(current_user, "role", "user")
@@ -41,7 +41,7 @@ async def get_budgets(
 @router.get("/{budget_id}", response_model=BudgetResponse)
 async def get_budget(
 	budget_id: int,
-	current_user: User = Depends(get_current_user),
+	current_user: User = Depends(get_current_principal),
 	db: Session = Depends(get_db)
 ):
 	budget = BudgetService.get_budget_by_id(db, budget_id, current_user.id)
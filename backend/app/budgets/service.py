@@ -1,4 +1,6 @@
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.models.budget import Budget
 from app.budgets.schemas import BudgetCreate, BudgetUpdate
 
@@ -62,32 +64,91 @@ class BudgetService:
 		db.commit()
 
 
-def update_budget_spent(db: Session, transaction, user_id: int):
-	"""Update matching budget's spent_amount for same month/year/category.
+def budget_thresholds_crossed(old_spent, new_spent, limit_amount, thresholds=None):
+	"""Return the percent thresholds passed when spend moved from old to new (ascending)."""
+	from decimal import Decimal
 
-	This function quietly does nothing if no matching budget exists or
-	the transaction isn't a debit.
+	limit = Decimal(str(limit_amount or 0))
+	if limit <= 0:
+		return []
+	old_pct = Decimal(str(old_spent or 0)) * 100 / limit
+	new_pct = Decimal(str(new_spent or 0)) * 100 / limit
+	levels = thresholds if thresholds is not None else settings.BUDGET_ALERT_THRESHOLDS
+	return sorted(t for t in levels if old_pct < Decimal(str(t)) <= new_pct)
+
+
+def _notify_budget_threshold(db: Session, user_id: int, budget, threshold, new_spent):
+	"""Add (uncommitted) a notification for the highest threshold just crossed."""
+	from app.notifications.models import Notification
+	from app.notifications.events import publish_event
+
+	label = budget.category or "overall"
+	if threshold >= 100:
+		title = f"Budget exceeded: {label}"
+	else:
+		title = f"Budget {threshold}% used: {label}"
+	message = (
+		f"You have spent {new_spent} of your {budget.limit_amount} '{label}' budget "
+		f"for {budget.month}/{budget.year}."
+	)
+	n = Notification(user_id=user_id, type="budget_alert", title=title, message=message, sent=False)
+	db.add(n)
+	db.flush()
+	publish_event(db, user_id, "notification", {"id": n.id, "type": n.type, "title": title})
+
+
+def _increment_spent(db: Session, user_id: int, year: int, month: int, category: str, amt):
+	"""Add `amt` to the first budget matching (year, month, normalized category); no commit.
+
+	Returns `(budget_row, old_spent, new_spent)` or None when no budget matches.
+	The increment is a single `UPDATE ... RETURNING`, so the old and new
+	totals come from the same atomic statement; when the change crosses one
+	of `BUDGET_ALERT_THRESHOLDS` a notification is added to the transaction,
+	unless the user has a `budget_percent` alert rule for this budget: then
+	the rule alone notifies, once.
 	"""
-	# Import here to avoid circular imports at module import time
-	from app.models.budget import Budget
+	from decimal import Decimal
+	from app.alerts.service import get_ruleset
 
-	# transaction.txn_date is a datetime-like object
+	target = select(Budget.id).where(
+		Budget.user_id == user_id,
+		Budget.month == month,
+		Budget.year == year,
+		func.lower(func.trim(func.coalesce(Budget.category, ''))) == category,
+	).order_by(Budget.id).limit(1).scalar_subquery()
+
+	stmt = (
+		update(Budget)
+		.where(Budget.id == target)
+		.values(spent_amount=func.coalesce(Budget.spent_amount, 0) + amt)
+		.returning(Budget.id, Budget.spent_amount, Budget.limit_amount, Budget.category, Budget.month, Budget.year)
+		.execution_options(synchronize_session=False)
+	)
+	row = db.execute(stmt).first()
+	if row is None:
+		return None
+
+	new_spent = Decimal(str(row.spent_amount))
+	old_spent = new_spent - amt
 	try:
-		txn_month = transaction.txn_date.month
-		txn_year = transaction.txn_date.year
-	except Exception:
-		return
+		crossed = budget_thresholds_crossed(old_spent, new_spent, row.limit_amount)
+		if crossed and not get_ruleset(db, user_id).covers_budget(row.category):
+			# savepoint: a failed insert must not abort the spend increment
+			with db.begin_nested():
+				_notify_budget_threshold(db, user_id, row, crossed[-1], new_spent)
+	except Exception as e:
+		# never lose the spend increment because of a notification problem
+		print(f"[BUDGET] Could not create threshold notification for budget {row.id}: {e}")
+	return row, old_spent, new_spent
 
-	# Load budgets for the user/month/year then match category in Python
-	candidates = db.query(Budget).filter(
-		Budget.user_id == user_id,
-		Budget.month == txn_month,
-		Budget.year == txn_year,
-	).all()
 
-	if not candidates:
-		return
+def update_budget_spent(db: Session, transaction, user_id: int):
+	"""Update matching budget's spent_amount for same month/year/category.
 
+	This function quietly does nothing if no matching budget exists or
+	the transaction isn't a debit. Returns `(budget, old_spent, new_spent)`
+	when a budget was updated, otherwise None (see `_increment_spent`).
+	"""
 	# Only update for outgoing/debit transactions (any type indicating money left the account)
 	txn_type = (getattr(transaction, 'txn_type', None) or '').lower()
 	# Match debit, money out, withdraw, expense, payment, transfer out, etc.
@@ -95,6 +156,13 @@ def update_budget_spent(db: Session, transaction, user_id: int):
 	if not is_outgoing:
 		return
 
+	# transaction.txn_date is a datetime-like object
+	try:
+		txn_month = transaction.txn_date.month
+		txn_year = transaction.txn_date.year
+	except Exception:
+		return
+
 	from decimal import Decimal
 	try:
 		amt = Decimal(str(transaction.amount))
@@ -106,19 +174,39 @@ def update_budget_spent(db: Session, transaction, user_id: int):
 
 	txn_cat = (transaction.category or '').strip().lower()
 
-	for budget in candidates:
-		bud_cat = (budget.category or '').strip().lower()
-		if bud_cat == txn_cat:
-			try:
-				current = Decimal(str(budget.spent_amount)) if budget.spent_amount is not None else Decimal("0")
-			except Exception:
-				current = Decimal("0")
-
-			budget.spent_amount = current + amt
-			db.commit()
-			try:
-				db.refresh(budget)
-			except Exception:
-				pass
-			# update only the first matching budget
-			return
+	# update only the first matching budget
+	change = _increment_spent(db, user_id, txn_year, txn_month, txn_cat, amt)
+	if change is None:
+		return
+	db.commit()
+	return change
+
+
+def apply_import_spend(db: Session, rows, user_id: int):
+	"""Add a batch of imported `(txn_type, txn_date, category, amount)` rows to the matching budgets and commit.
+
+	Debits are summed per (year, month, category) first, so each budget gets
+	one increment however many rows it matches. Returns the
+	`(budget, old_spent, new_spent)` of every budget updated.
+	"""
+	from collections import defaultdict
+	from decimal import Decimal
+
+	totals = defaultdict(Decimal)
+	for txn_type, txn_date, category, amount in rows:
+		if (txn_type or '').lower() != 'debit':
+			continue
+		try:
+			key = (txn_date.year, txn_date.month, (category or '').strip().lower())
+			totals[key] += Decimal(str(amount))
+		except Exception:
+			continue
+
+	changes = []
+	for (year, month, category), amt in sorted(totals.items()):
+		change = _increment_spent(db, user_id, year, month, category, amt)
+		if change is not None:
+			changes.append(change)
+	if changes:
+		db.commit()
+	return changes
@@ -1,17 +1,11 @@
 import os
 import json
 from pydantic_settings import BaseSettings
-from sqlalchemy import create_engine
 from dotenv import load_dotenv
 
 load_dotenv()  # ye backend/.env ko load karega
 
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-engine = create_engine(DATABASE_URL, echo=True)
-
-
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", )
     
@@ -20,6 +14,15 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Stateless auth: read-only routes authorize from the verified JWT claims
+    # without loading the user; revocations reach every worker within
+    # AUTH_REVOCATION_REFRESH_SECONDS.
+    AUTH_STATELESS: bool = False
+    AUTH_REVOCATION_REFRESH_SECONDS: int = 15
+    # verified-token payloads kept per worker (0 disables the cache)
+    TOKEN_CACHE_SIZE: int = 1024
+    # how often expired rows are deleted from the refresh-token store
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
     
     # CORS
     CORS_ORIGINS: list = [
@@ -35,7 +38,108 @@ class Settings(BaseSettings):
     # Server
     SERVER_HOST: str = "0.0.0.0"
     SERVER_PORT: int = 8000
-    
+
+    # Password hashing (Argon2id). Memory cost is in KiB and is paid per
+    # concurrent hash, so PASSWORD_HASH_WORKERS * ARGON2_MEMORY_COST bounds RAM use.
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    # hashing threads per worker process (0 = one per CPU core) and how many
+    # hashes may be running or queued before requests get 429 (0 = 4 per thread)
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 0
+    # after a successful login, re-hash passwords stored with outdated Argon2
+    # parameters in the background (lets ARGON2_* change without password resets)
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+
+    # Email delivery
+    # EMAIL_TRANSPORT: "console" (print), "smtp", "file" (write .eml files) or "memory"
+    EMAIL_TRANSPORT: str = os.getenv("EMAIL_TRANSPORT", "console")
+    EMAIL_FROM: str = os.getenv("EMAIL_FROM", "no-reply@modern-banking.local")
+    EMAIL_FILE_DIR: str = os.getenv("EMAIL_FILE_DIR", "./outbox")
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "localhost")
+    SMTP_PORT: int = 587
+    SMTP_USER: str = os.getenv("SMTP_USER", "")
+    SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    SMTP_USE_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: int = 30
+
+    # Notification delivery worker
+    NOTIFICATION_BATCH_SIZE: int = 500
+    NOTIFICATION_SEND_CONCURRENCY: int = 8
+    # a notification is tried at most 1 + NOTIFICATION_MAX_RETRIES times, one
+    # attempt per run, waiting NOTIFICATION_RETRY_BACKOFF_SECONDS (doubling)
+    # between attempts; then it is skipped
+    NOTIFICATION_MAX_RETRIES: int = 3
+    NOTIFICATION_RETRY_BACKOFF_SECONDS: int = 60
+    # claimed rows are left to their worker this long (then re-claimable)
+    NOTIFICATION_CLAIM_SECONDS: int = 300
+    NOTIFICATION_DELIVERY_INTERVAL_SECONDS: int = 60
+
+    # Real-time event stream (Postgres LISTEN/NOTIFY -> SSE)
+    EVENTS_CHANNEL: str = "tivra_events"
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+
+    # Alerts: how long a worker may serve a user's compiled rule set before reloading
+    ALERT_RULES_CACHE_SECONDS: int = 60
+
+    # Budgets: percent-of-limit levels that trigger a notification when crossed
+    BUDGET_ALERT_THRESHOLDS: list = [50, 80, 100]
+
+    # Reward points expiry (opt-in): points older than the window expire (oldest first).
+    # Per-program overrides as {"program": days}; 0 days means never expire.
+    REWARD_POINTS_EXPIRY_DAYS: int = 0
+    REWARD_POINTS_EXPIRY_OVERRIDES: dict = {}
+    REWARD_EXPIRY_BATCH_SIZE: int = 1000
+    REWARD_EXPIRY_INTERVAL_SECONDS: int = 24 * 3600
+    # batches one POST /api/rewards/points/expire runs at most (the scheduler resumes the rest)
+    REWARD_EXPIRY_REQUEST_MAX_BATCHES: int = 10
+
+    # User settings: per-process read-through cache (entries are dropped on write
+    # in the same process; other workers pick changes up within the TTL, so keep
+    # it short: it only has to absorb bursts of reads)
+    USER_SETTINGS_CACHE_SECONDS: int = 5
+    USER_SETTINGS_CACHE_SIZE: int = 10000
+
+    # Account deletion: accounts with more transactions than the threshold are
+    # hidden at once and purged in the background, PURGE_BATCH_SIZE rows per
+    # transaction; the worker also sweeps for pending jobs every interval
+    ACCOUNT_PURGE_THRESHOLD: int = 50000
+    PURGE_BATCH_SIZE: int = 5000
+    PURGE_INTERVAL_SECONDS: int = 60
+    # a running job whose heartbeat is older than this is taken over
+    PURGE_STALE_SECONDS: int = 600
+
+    # FX rates (units per 1 USD) come from the fx_rates table, seeded from
+    # FX_RATES_FILE (default: app/data/fx_rates.json); cached per process
+    FX_RATES_FILE: str = ""
+    FX_RATES_CACHE_SECONDS: int = 3600
+
+    # Worker boot: background loops wait this long (plus up to as much again,
+    # spread across workers) before their first database access, and a boot
+    # slower than the budget is logged with its slowest routers
+    BACKGROUND_START_DELAY_SECONDS: int = 15
+    BOOT_TIME_BUDGET_SECONDS: float = 5.0
+
+    # Read replicas: comma-separated URLs. Read-only listings use them unless
+    # the caller wrote within READ_YOUR_WRITES_SECONDS (then the primary)
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Deployment role (app.main.PROFILES): "all", "dashboard", "ingestion" or
+    # "worker". APP_ROUTERS (comma-separated router tags) overrides its router set.
+    APP_PROFILE: str = os.getenv("APP_PROFILE", "all")
+    APP_ROUTERS: str = os.getenv("APP_ROUTERS", "")
+
+    # transactions is partitioned by month of txn_date (PostgreSQL); a daily
+    # job keeps partitions ready this many months ahead
+    TRANSACTION_PARTITION_MONTHS_AHEAD: int = 3
+    TRANSACTION_PARTITION_INTERVAL_SECONDS: int = 24 * 3600
+    # listings without `since` cover this many days back, so they only read
+    # recent partitions (0 = all history; callers pass `since` to bound it)
+    TRANSACTION_LIST_DEFAULT_DAYS: int = 0
+
     class Config:
         env_file = ".env"
         case_sensitive = True
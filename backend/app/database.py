@@ -1,22 +1,76 @@
+import itertools
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql import Select
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=True,  
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600
-)
+
+def _create_engine(url: str):
+    return create_engine(
+        url,
+        echo=True,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+# read replicas (DATABASE_REPLICA_URLS); without any, every read uses the primary
+replica_engines = [_create_engine(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+_replicas = itertools.cycle(replica_engines)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+class RoutingSession(Session):
+    """Session that reads from one replica and sends everything else to the primary.
+
+    Flushes, DML, SELECT ... FOR UPDATE and raw connections go to the
+    primary, and so does every statement after the first of those: a
+    request never reads older data than it has just written.
+    """
+
+    def __init__(self, *args, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.pinned = replica is None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.pinned:
+            is_read = isinstance(clause, Select) and clause._for_update_arg is None
+            if self._flushing or not is_read:
+                self.pinned = True
+        return engine if self.pinned else self.replica
+
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autoflush=False)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db(request: Request):
+    """`get_db` for read-only routes: a replica session (round-robin).
+
+    Falls back to the primary when no replica is configured or the caller
+    wrote within READ_YOUR_WRITES_SECONDS (see app.utils.read_routing).
+    """
+    from app.utils.read_routing import reads_from_primary
+
+    if not replica_engines or reads_from_primary(request.headers):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal(replica=next(_replicas))
+    try:
+        yield db
+    finally:
+        db.close()
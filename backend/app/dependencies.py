@@ -1,18 +1,43 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.database import get_db
 from app.utils.jwt_handler import verify_token
 from app.models.user import User
+from app.auth.revocation import revocations
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
-    payload = verify_token(token)
+
+def _token_version(payload: dict) -> int:
+    # tokens issued before versioning carry no `ver`
+    try:
+        return int(payload.get("ver") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class TokenPrincipal:
+    """The caller as described by verified JWT claims.
+
+    Stands in for `User` on read-only routes in stateless mode; only `id`,
+    `role` and `token_version` are available.
+    """
+
+    __slots__ = ("id", "role", "token_version")
+
+    def __init__(self, id: int, role: str, token_version: int = 0):
+        self.id = id
+        self.role = role
+        self.token_version = token_version
+
+    def __repr__(self):
+        return f"<TokenPrincipal(id={self.id}, role={self.role})>"
+
+def user_from_token(token: str, db: Session) -> User:
+    """Verify `token` and load its user, rejecting deleted users and revoked versions (401)."""
+    payload = verify_token(token) if token else None
     
     if payload is None:
         raise HTTPException(
@@ -22,7 +47,7 @@ async def get_current_user(
     
     user_id = payload.get("sub")
     token_role = payload.get("role")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
     
     if user is None:
         raise HTTPException(
@@ -30,6 +55,12 @@ async def get_current_user(
             detail="User not found"
         )
 
+    if _token_version(payload) < (getattr(user, "token_version", 0) or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+
     # Attach role from token to returned user object.
     # If the DB doesn't have a role, treat as 'user' by default.
     if token_role:
@@ -45,6 +76,47 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    return user_from_token(credentials.credentials, db)
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Authenticate for read-only routes.
+
+    With AUTH_STATELESS the verified claims (sub, role, ver) are trusted as
+    long as the token version is not revoked, so no query is made; otherwise
+    (or while the revocation set is not loaded or has gone stale because
+    refreshes fail) this is `get_current_user`.
+    """
+    if not settings.AUTH_STATELESS or not revocations.fresh:
+        return await get_current_user(credentials, db)
+
+    payload = verify_token(credentials.credentials)
+    if payload is None or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+    try:
+        user_id = int(payload["sub"])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+
+    version = _token_version(payload)
+    if revocations.is_revoked(user_id, version):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    return TokenPrincipal(user_id, payload.get("role") or "user", version)
+
+
 class RoleChecker:
     """Dependency class for role-based access control.
 
@@ -72,7 +144,7 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def require_user_or_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_user_or_admin(current_user: User = Depends(get_current_principal)) -> User:
     """Require the current user to be either a regular user or an admin.
 
     Use this on endpoints where owners (users) and admins are allowed.
@@ -85,7 +157,7 @@ def require_user_or_admin(current_user: User = Depends(get_current_user)) -> Use
 
 
 
-def require_read_access(current_user: User = Depends(get_current_user)) -> User:
+def require_read_access(current_user: User = Depends(get_current_principal)) -> User:
     """All authenticated users may read (user, admin)."""
     return current_user
 
@@ -1,216 +1,284 @@
-import fastapi
-from fastapi import Depends
+import time
+
+_import_started = time.perf_counter()
+
+import importlib
 import os
+import fastapi
+from fastapi import APIRouter, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import engine, Base
-from app.auth.router import router as auth_router
-from app.accounts.router import router as accounts_router
-from app.transactions.router import router as transactions_router
-from app.budgets.router import router as budgets_router
-from app.users.router import router as users_router
-from app.bills.router import router as bills_router
-from app.rewards.router import router as rewards_router
-from app.notifications.router import router as notifications_router
-from app.notifications import scheduler as notifications_scheduler
-from app.dependencies import require_admin_only
-from app.models.user import User
-
-# Create tables - wrapped in try/except to handle database connection issues
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception as e:
-    print(f"Warning: Could not create database tables: {e}")
-    print("Make sure PostgreSQL is running with correct credentials")
-
-app = fastapi.FastAPI(
-    title="Modern Digital Banking Dashboard",
-    description="Unified personal banking hub",
-    version="1.0.0"
+from app.utils.read_routing import PRIMARY_UNTIL_HEADER, ReadYourWritesMiddleware
+
+# The schema is owned by Alembic: run `alembic upgrade head` once per deploy,
+# before the workers start. Startup itself issues no DDL or catalog queries,
+# and background loops wait BACKGROUND_START_DELAY_SECONDS before their first
+# database access.
+#
+# `app` is built on first access (`uvicorn app.main:app`, `from app.main
+# import app`), so importing this module is cheap; routers are imported by
+# `create_app`. `python scripts/profile_startup.py` shows where boot time goes.
+
+# (module, prefix, tag) of every API router, in mounting order
+ROUTERS = (
+    ("app.auth.router", "/api/auth", "auth"),
+    ("app.accounts.router", "/api/accounts", "accounts"),
+    ("app.transactions.router", "/api/transactions", "transactions"),
+    ("app.budgets.router", "/api/budgets", "budgets"),
+    ("app.users.router", "/api/user", "user"),
+    ("app.bills.router", "/api/bills", "bills"),
+    ("app.rewards.router", "/api/rewards", "rewards"),
+    ("app.notifications.router", "/api/notifications", "notifications"),
+    ("app.alerts.router", "/api/alerts", "alerts"),
 )
+ALL_ROUTERS = tuple(tag for _module, _prefix, tag in ROUTERS)
 
-# CORS middleware
-# Apply CORS middleware. Use configured origins when provided; fall back to permissive
-# wildcard during development to avoid Swagger "Failed to fetch" errors caused by
-# origin mismatches. In production you should lock this down to your frontend host.
-
-# Use CORS origins from settings so deploy-time env var can control allowed origins.
-# Be robust: `CORS_ORIGINS` may be a list (from Settings), or a string from env (JSON or comma-separated).
-raw_cors = getattr(settings, "CORS_ORIGINS", None)
-if isinstance(raw_cors, str):
-    try:
-        import json
-
-        parsed = json.loads(raw_cors)
-        origins = list(parsed) if isinstance(parsed, (list, tuple)) else [str(parsed)]
-    except Exception:
-        origins = [s.strip() for s in raw_cors.split(",") if s.strip()]
-elif isinstance(raw_cors, (list, tuple)):
-    origins = list(raw_cors)
-else:
-    origins = []
-
-# Ensure deployed frontend origins used during demo are included (no-ops if already present).
-
-# Ensure deployed frontend origins used during demo are included (no-ops if already present).
-extra_prod_origins = [
-    "https://modern-digital-banking-dashboard-pe-lemon.vercel.app",
-    "https://modern-digital-banking-dashboard-personal-so6b-6n6w2uhz5.vercel.app",
-]
-for o in extra_prod_origins:
-    if o not in origins:
-        origins.append(o)
-
-# If no origins configured, allow a permissive fallback for local development.
-# In production you should set `CORS_ORIGINS` to your frontend host(s).
-use_origin_regex = False
-if not origins:
-    env = os.getenv("ENV", os.getenv("PY_ENV", "development")).lower()
-    if env in ("dev", "development", "local") or os.getenv("DEBUG", "0") == "1":
-        use_origin_regex = True
-
-print("CORS origins:", origins, "use_origin_regex:", use_origin_regex)
-
-# Allow common Vercel preview domains via regex when appropriate (keeps credentials support).
-# Enable via either presence of a vercel origin in `origins` or by setting `ALLOW_VERCEL_PREVIEWS=1`.
-vercel_allowed = any("vercel.app" in (o or "") for o in origins) or os.getenv("ALLOW_VERCEL_PREVIEWS", "0") == "1"
-vercel_regex = r"^https?://([a-zA-Z0-9-]+\.)?vercel\.app$"
-if vercel_allowed:
-    print("Vercel previews allowed via origin regex:", vercel_regex)
-
-mw_kwargs = dict(
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# every mapped class: relationships refer to each other by name, so they are
+# all registered whichever routers a profile mounts
+MODELS = (
+    "app.models.user",
+    "app.models.account",
+    "app.models.transaction",
+    "app.models.bill",
+    "app.models.budget",
+    "app.models.reward",
+    "app.models.alert",
+    "app.models.purge",
+    "app.models.fx_rate",
+    "app.notifications.models",
 )
-if use_origin_regex:
-    # Allow any origin (development only) while still supporting credentials.
-    mw_kwargs["allow_origins"] = []
-    mw_kwargs["allow_origin_regex"] = ".*"
-else:
-    mw_kwargs["allow_origins"] = origins
-    # If configured to allow Vercel previews, add a targeted regex in addition
-    # to the explicit origins list so dynamic preview URLs work.
+
+# Deployment roles: which routers a fleet serves and whether it runs the
+# background jobs (reminders, delivery, expiry, purges). Split fleets are
+# routed by path prefix (/api/transactions to ingestion, the rest to
+# dashboard) and need one `worker` deployment for the jobs.
+PROFILES = {
+    "all": {"routers": ALL_ROUTERS, "jobs": True},
+    "dashboard": {"routers": tuple(t for t in ALL_ROUTERS if t != "transactions"), "jobs": False},
+    "ingestion": {"routers": ("transactions",), "jobs": False},
+    "worker": {"routers": (), "jobs": True},
+}
+
+_import_seconds = time.perf_counter() - _import_started
+
+
+def _cors_options() -> dict:
+    # Apply CORS middleware. Use configured origins when provided; fall back to permissive
+    # wildcard during development to avoid Swagger "Failed to fetch" errors caused by
+    # origin mismatches. In production you should lock this down to your frontend host.
+
+    # Use CORS origins from settings so deploy-time env var can control allowed origins.
+    # Be robust: `CORS_ORIGINS` may be a list (from Settings), or a string from env (JSON or comma-separated).
+    raw_cors = getattr(settings, "CORS_ORIGINS", None)
+    if isinstance(raw_cors, str):
+        try:
+            import json
+
+            parsed = json.loads(raw_cors)
+            origins = list(parsed) if isinstance(parsed, (list, tuple)) else [str(parsed)]
+        except Exception:
+            origins = [s.strip() for s in raw_cors.split(",") if s.strip()]
+    elif isinstance(raw_cors, (list, tuple)):
+        origins = list(raw_cors)
+    else:
+        origins = []
+
+    # Ensure deployed frontend origins used during demo are included (no-ops if already present).
+    extra_prod_origins = [
+        "https://modern-digital-banking-dashboard-pe-lemon.vercel.app",
+        "https://modern-digital-banking-dashboard-personal-so6b-6n6w2uhz5.vercel.app",
+    ]
+    for o in extra_prod_origins:
+        if o not in origins:
+            origins.append(o)
+
+    # If no origins configured, allow a permissive fallback for local development.
+    # In production you should set `CORS_ORIGINS` to your frontend host(s).
+    use_origin_regex = False
+    if not origins:
+        env = os.getenv("ENV", os.getenv("PY_ENV", "development")).lower()
+        if env in ("dev", "development", "local") or os.getenv("DEBUG", "0") == "1":
+            use_origin_regex = True
+
+    print("CORS origins:", origins, "use_origin_regex:", use_origin_regex)
+
+    # Allow common Vercel preview domains via regex when appropriate (keeps credentials support).
+    # Enable via either presence of a vercel origin in `origins` or by setting `ALLOW_VERCEL_PREVIEWS=1`.
+    vercel_allowed = any("vercel.app" in (o or "") for o in origins) or os.getenv("ALLOW_VERCEL_PREVIEWS", "0") == "1"
+    vercel_regex = r"^https?://([a-zA-Z0-9-]+\.)?vercel\.app$"
     if vercel_allowed:
-        mw_kwargs["allow_origin_regex"] = vercel_regex
-
-app.add_middleware(CORSMiddleware, **mw_kwargs)
-# Include routers
-app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
-app.include_router(accounts_router, prefix="/api/accounts", tags=["accounts"])
-app.include_router(transactions_router, prefix="/api/transactions", tags=["transactions"])
-app.include_router(budgets_router, prefix="/api/budgets", tags=["budgets"])
-app.include_router(users_router, prefix="/api/user", tags=["user"])
-app.include_router(bills_router, prefix="/api/bills", tags=["bills"])
-app.include_router(rewards_router, prefix="/api/rewards", tags=["rewards"])
-app.include_router(notifications_router, prefix="/api/notifications", tags=["notifications"])
-
-
-@app.on_event("startup")
-def start_notifications_scheduler():
-    try:
-        # start background scheduler (runs daily by default)
-        notifications_scheduler.start_scheduler()
-    except Exception as e:
-        print("Warning: could not start notifications scheduler:", e)
-
-@app.get("/")
+        print("Vercel previews allowed via origin regex:", vercel_regex)
+
+    mw_kwargs = dict(
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # read-your-writes pin, echoed back by the frontend
+        expose_headers=[PRIMARY_UNTIL_HEADER],
+    )
+    if use_origin_regex:
+        # Allow any origin (development only) while still supporting credentials.
+        mw_kwargs["allow_origins"] = []
+        mw_kwargs["allow_origin_regex"] = ".*"
+    else:
+        mw_kwargs["allow_origins"] = origins
+        # If configured to allow Vercel previews, add a targeted regex in addition
+        # to the explicit origins list so dynamic preview URLs work.
+        if vercel_allowed:
+            mw_kwargs["allow_origin_regex"] = vercel_regex
+    return mw_kwargs
+
+
+def resolve_profile(profile: str = None, routers: str = None):
+    """Return (profile name, router tags, run jobs) for a deployment role.
+
+    `profile` defaults to APP_PROFILE; `routers` (default APP_ROUTERS), a
+    comma-separated list of router tags, replaces the profile's router set.
+    Raises ValueError for an unknown profile or router.
+    """
+    name = (profile or settings.APP_PROFILE or "all").strip().lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown app profile {name!r}; expected one of {', '.join(PROFILES)}")
+    tags = PROFILES[name]["routers"]
+    routers = settings.APP_ROUTERS if routers is None else routers
+    if routers and routers.strip():
+        tags = tuple(t.strip().lower() for t in routers.split(",") if t.strip())
+        unknown = [t for t in tags if t not in ALL_ROUTERS]
+        if unknown:
+            raise ValueError(f"Unknown router(s) {', '.join(unknown)}; expected any of {', '.join(ALL_ROUTERS)}")
+    return name, tags, PROFILES[name]["jobs"]
+
+
+def _start_background_work(tags, jobs: bool):
+    """Start the background threads this worker's role needs; none of them touches the database yet."""
+    if jobs:
+        from app.notifications import scheduler as notifications_scheduler
+        try:
+            # start background scheduler (runs daily by default)
+            notifications_scheduler.start_scheduler()
+        except Exception as e:
+            print("Warning: could not start notifications scheduler:", e)
+    if "notifications" in tags:
+        from app.notifications import events as notifications_events
+        try:
+            # one LISTEN connection per worker feeds the SSE hub (PostgreSQL only)
+            notifications_events.start_listener()
+        except Exception as e:
+            print("Warning: could not start events listener:", e)
+    if tags:
+        from app.auth import revocation as auth_revocation
+        try:
+            # stateless auth only: keep this worker's revocation set in sync with the DB
+            auth_revocation.start_refresher()
+        except Exception as e:
+            print("Warning: could not start token revocation refresher:", e)
+
+
+core_router = APIRouter()
+
+
+@core_router.get("/")
 def read_root():
     return {"message": "Modern Digital Banking Dashboard API", "version": "1.0.0"}
 
-@app.get("/health")
+
+@core_router.get("/health")
 def health_check():
     return {"status": "ok"}
 
 
-# Startup migration: ensure `users.role` exists. Safe to run repeatedly.
-@app.on_event("startup")
-def ensure_role_column():
-    from sqlalchemy import text
-    from sqlalchemy.exc import SQLAlchemyError
-    from app.database import engine
-
-    check_sql = text("SELECT column_name FROM information_schema.columns WHERE table_name = 'users' AND column_name = 'role'")
-    alter_sql = text("ALTER TABLE users ADD COLUMN role VARCHAR(50) NOT NULL DEFAULT 'user';")
-
-    try:
-        with engine.connect() as conn:
-            r = conn.execute(check_sql)
-            exists = r.fetchone() is not None
-            if exists:
-                print('Role column exists — no migration needed')
-            else:
-                print('Role column missing — applying migration...')
-                conn.execute(alter_sql)
-                try:
-                    conn.commit()
-                except Exception:
-                    pass
-                print('✅ Role column migration completed')
-    except SQLAlchemyError as e:
-        print('Warning: could not run role-column migration on startup:', e)
-    except Exception as e:
-        print('Unexpected error during startup migration:', e)
-
-
-@app.on_event("startup")
-def promote_render_test_to_admin():
-    """If a user with email `render.test@example.com` exists, make them an admin.
-
-    This is a safe no-op if the user is not present; it helps automated deployments
-    where you want a default admin user to exist for testing.
+def _admin_metrics_router() -> APIRouter:
+    from app.dependencies import require_admin_only
+    from app.models.user import User
+
+    router = APIRouter()
+
+    @router.get("/admin/metrics/token-cache")
+    def token_cache_metrics(current_user: User = Depends(require_admin_only)):
+        """Admin-only: hit/miss counters of this worker's decoded-token cache."""
+        from app.utils.jwt_handler import token_cache
+        return token_cache.stats()
+
+    @router.get("/admin/metrics/boot")
+    def boot_metrics(request: Request, current_user: User = Depends(require_admin_only)):
+        """Admin-only: how long this worker took to boot, by phase and router."""
+        return request.app.state.boot
+
+    return router
+
+
+def create_app(profile: str = None, routers: str = None) -> fastapi.FastAPI:
+    """Build the API for a deployment role (see PROFILES and `resolve_profile`).
+
+    Only the role's routers are imported and mounted, and only the
+    background work it needs is started. Boot timings (module import, each
+    router import, startup hooks) are kept on `app.state.boot` and logged
+    once the worker has started.
     """
-    try:
-        from app.database import SessionLocal
-        from app.models.user import User
-
-        db = SessionLocal()
-        target_email = "render.test@example.com"
-        user = db.query(User).filter(User.email == target_email).first()
-        if user:
-            if getattr(user, "role", None) != "admin":
-                user.role = "admin"
-                db.add(user)
-                db.commit()
-                print(f"Promoted {target_email} to admin on startup")
-            else:
-                print(f"{target_email} already admin")
-        else:
-            print(f"No user with email {target_email} found on startup — skipping admin promotion")
-    except Exception as e:
-        # Don't fail app startup if DB isn't available yet
-        print("Warning: could not promote render.test@example.com to admin on startup:", e)
-
-
-@app.post("/admin/fix-db")
-async def fix_db(current_user: User = Depends(require_admin_only)):
-    """Temporary endpoint to fix role column - DELETE AFTER USE"""
-    from sqlalchemy import text
-    from sqlalchemy.exc import SQLAlchemyError
-    from app.database import engine
-
-    try:
-        with engine.connect() as conn:
-            # Use IF NOT EXISTS logic via information_schema check to avoid errors
-            r = conn.execute(text("SELECT column_name FROM information_schema.columns WHERE table_name = 'users' AND column_name = 'role'"))
-            exists = r.fetchone() is not None
-            if exists:
-                return {"status": "Role column fixed"}
-
-            conn.execute(text("ALTER TABLE users ADD COLUMN role VARCHAR(50) NOT NULL DEFAULT 'user';"))
-            try:
-                conn.commit()
-            except Exception:
-                pass
-            print('✅ Role column migration completed via /admin/fix-db')
-            return {"status": "Role column fixed"}
-    except SQLAlchemyError as e:
-        print('Error running /admin/fix-db:', e)
-        return {"error": str(e)}
-    except Exception as e:
-        print('Unexpected error running /admin/fix-db:', e)
-        return {"error": str(e)}
+    started = time.perf_counter()
+    profile, tags, jobs = resolve_profile(profile, routers)
+    app = fastapi.FastAPI(
+        title="Modern Digital Banking Dashboard",
+        description="Unified personal banking hub",
+        version="1.0.0"
+    )
+    # outermost last: CORS wraps the read-your-writes pin
+    app.add_middleware(ReadYourWritesMiddleware)
+    app.add_middleware(CORSMiddleware, **_cors_options())
+
+    for module in MODELS:
+        importlib.import_module(module)
+    router_seconds = {}
+    for module, prefix, tag in ROUTERS:
+        if tag not in tags:
+            continue
+        t = time.perf_counter()
+        app.include_router(importlib.import_module(module).router, prefix=prefix, tags=[tag])
+        router_seconds[tag] = round(time.perf_counter() - t, 4)
+    app.include_router(core_router)
+    app.include_router(_admin_metrics_router())
+
+    app.state.profile = profile
+    app.state.boot = {
+        "pid": os.getpid(),
+        "profile": profile,
+        "jobs": jobs,
+        "import_seconds": round(_import_seconds, 4),
+        "create_app_seconds": round(time.perf_counter() - started, 4),
+        "routers": router_seconds,
+        "startup_seconds": None,
+        "total_seconds": None,
+    }
+
+    @app.on_event("startup")
+    def start_worker():
+        t = time.perf_counter()
+        _start_background_work(tags, jobs)
+        boot = app.state.boot
+        boot["startup_seconds"] = round(time.perf_counter() - t, 4)
+        boot["total_seconds"] = round(boot["import_seconds"] + boot["create_app_seconds"] + boot["startup_seconds"], 4)
+        print(
+            f"Worker {boot['pid']} ({profile}) booted in {boot['total_seconds']:.2f}s "
+            f"(import {boot['import_seconds']:.2f}s, app {boot['create_app_seconds']:.2f}s, "
+            f"startup {boot['startup_seconds']:.2f}s)"
+        )
+        if boot["total_seconds"] > settings.BOOT_TIME_BUDGET_SECONDS:
+            slowest = sorted(boot["routers"].items(), key=lambda kv: kv[1], reverse=True)[:3]
+            print(f"Warning: worker boot exceeded BOOT_TIME_BUDGET_SECONDS={settings.BOOT_TIME_BUDGET_SECONDS}; "
+                  f"slowest routers: {slowest}")
+
+    return app
+
+
+def __getattr__(name):
+    # `uvicorn app.main:app` and `from app.main import app` build the app on first access
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
@@ -16,13 +16,15 @@ class Account(Base):
     __tablename__ = "accounts"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     bank_name = Column(String(255), nullable=False)
     account_type = Column(Enum(AccountTypeEnum), nullable=False)
     masked_account = Column(String(255))
     currency = Column(VARCHAR(3), default="USD")
     balance = Column(NUMERIC(15, 2), default=0.0)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    # set when a large account is handed to the background purge; hidden from then on
+    deleted_at = Column(TIMESTAMP, nullable=True)
     # cascade and passive_deletes allow DB-level ON DELETE CASCADE to remove related rows
     transactions = relationship(
         "Transaction",
@@ -0,0 +1,60 @@
+from sqlalchemy import Column, Integer, String, Boolean, Text, NUMERIC, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.sql import func
+import enum
+from app.database import Base
+
+
+class AlertRuleTypeEnum(str, enum.Enum):
+    low_balance = "low_balance"
+    budget_percent = "budget_percent"
+    large_transaction = "large_transaction"
+    unusual_merchant = "unusual_merchant"
+
+
+class AlertRule(Base):
+    __tablename__ = "alert_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    rule_type = Column(String(50), nullable=False)
+    # amount for low_balance / large_transaction / unusual_merchant, percent for budget_percent
+    threshold = Column(NUMERIC(15, 2), nullable=True)
+    # optional scoping: a single account and/or a single category
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=True, index=True)
+    category = Column(String(100), nullable=True)
+    enabled = Column(Boolean, nullable=False, default=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    def __repr__(self):
+        return f"<AlertRule(id={self.id}, user_id={self.user_id}, type={self.rule_type})>"
+
+
+class Alert(Base):
+    __tablename__ = "alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    rule_id = Column(Integer, ForeignKey("alert_rules.id", ondelete="CASCADE"), nullable=True, index=True)
+    # no foreign key: transactions is partitioned on PostgreSQL and its key is
+    # (id, txn_date), so this may point at a transaction since deleted
+    transaction_id = Column(Integer, nullable=True, index=True)
+    type = Column(String(50), nullable=False)
+    message = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_alerts_user_id_created_at", "user_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<Alert(id={self.id}, user_id={self.user_id}, type={self.type})>"
+
+
+class KnownMerchant(Base):
+    """Merchants a user has already paid, so `unusual_merchant` is a single-row lookup."""
+
+    __tablename__ = "alert_known_merchants"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    merchant = Column(String(255), primary_key=True)
+    first_seen = Column(TIMESTAMP, server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, Numeric, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Boolean, Numeric, TIMESTAMP, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -7,8 +7,8 @@ class Bill(Base):
     __tablename__ = "bills"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=True, index=True)
     biller_name = Column(String(255), nullable=False)
     due_date = Column(Date, nullable=False)
     amount_due = Column(Numeric(12, 2), nullable=False)
@@ -16,5 +16,10 @@ class Bill(Base):
     auto_pay = Column(Boolean, default=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        # reminder sweep: WHERE status <> 'paid' AND due_date <= ?
+        Index("ix_bills_unpaid_due_date", "due_date", postgresql_where=text("status <> 'paid'")),
+    )
+
     def __repr__(self):
         return f"<Bill(id={self.id}, user_id={self.user_id}, biller={self.biller_name})>"
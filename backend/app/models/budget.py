@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -15,4 +15,9 @@ class Budget(Base):
     spent_amount = Column(Numeric(12, 2), nullable=False, default=0.0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # WHERE user_id = ? [AND year = ? AND month = ?]
+        Index("ix_budgets_user_id_year_month", "user_id", "year", "month"),
+    )
+
     user = relationship("User", back_populates="budgets")
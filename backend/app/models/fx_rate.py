@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, NUMERIC, TIMESTAMP
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class FxRate(Base):
+    """Exchange rate of one currency, as units of it per 1 USD (USD itself is 1)."""
+
+    __tablename__ = "fx_rates"
+
+    currency = Column(String(3), primary_key=True)
+    per_usd = Column(NUMERIC(20, 10), nullable=False)
+    as_of = Column(TIMESTAMP, nullable=True)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<FxRate({self.currency}={self.per_usd})>"
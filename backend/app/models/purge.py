@@ -0,0 +1,34 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, TIMESTAMP, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class PurgeJob(Base):
+    """Background deletion of a large object graph, done in bounded batches.
+
+    `rows_deleted`/`batches` are committed together with each batch, so they
+    are exact progress; `updated_at` doubles as the worker's heartbeat.
+    """
+
+    __tablename__ = "purge_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)
+    target_id = Column(Integer, nullable=False)
+    requested_by = Column(Integer, nullable=True)
+    # pending -> running -> done | failed
+    status = Column(String(20), nullable=False, default="pending")
+    rows_deleted = Column(BigInteger, nullable=False, default=0)
+    batches = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        Index("ix_purge_jobs_status_id", "status", "id"),
+        Index("ix_purge_jobs_kind_target_id", "kind", "target_id"),
+    )
+
+    def __repr__(self):
+        return f"<PurgeJob(id={self.id}, kind={self.kind}, target={self.target_id}, status={self.status})>"
@@ -1,17 +1,113 @@
-from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Column, BigInteger, Integer, String, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.sql import func, text
 from app.database import Base
 
 
+class RewardGroup(Base):
+    """A reward campaign assigned to many users; member rows live in `rewards`."""
+
+    __tablename__ = "reward_groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    program_name = Column(String(255), nullable=False)
+    points_balance = Column(Integer, default=0)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<RewardGroup(id={self.id}, program={self.program_name})>"
+
+
 class Reward(Base):
     __tablename__ = "rewards"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     program_name = Column(String(255), nullable=False)
     points_balance = Column(Integer, default=0)
-    group_id = Column(String(100), nullable=True)
+    group_id = Column(Integer, ForeignKey("reward_groups.id", ondelete="CASCADE"), nullable=True)
     last_updated = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # group membership diffs: WHERE group_id = ? [AND user_id ...]
+        Index("ix_rewards_group_id_user_id", "group_id", "user_id"),
+    )
+
     def __repr__(self):
         return f"<Reward(id={self.id}, user_id={self.user_id}, program={self.program_name})>"
+
+
+class RewardPointsEntry(Base):
+    """Append-only points ledger; rows are never updated or deleted.
+
+    `points` is signed (earn/adjust credits are positive, redeem/expire debits
+    negative) and `balance_after` is the account balance once the entry applied.
+    """
+
+    __tablename__ = "reward_points_ledger"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    program_name = Column(String(255), nullable=False)
+    reward_id = Column(Integer, ForeignKey("rewards.id", ondelete="SET NULL"), nullable=True, index=True)
+    entry_type = Column(String(20), nullable=False)
+    points = Column(Integer, nullable=False)
+    balance_after = Column(Integer, nullable=False)
+    note = Column(String(255), nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # history pages: WHERE user_id = ? [AND program_name = ?] ORDER BY id DESC
+        Index("ix_reward_points_ledger_user_id_id", "user_id", "id"),
+        Index("ix_reward_points_ledger_user_program_id", "user_id", "program_name", "id"),
+        # expiry sums credits older than a cutoff per account without touching the heap
+        Index(
+            "ix_reward_points_ledger_credits",
+            "user_id", "program_name", "created_at",
+            postgresql_where=text("entry_type IN ('earn', 'adjust')"),
+            postgresql_include=["points"],
+        ),
+    )
+
+    def __repr__(self):
+        return f"<RewardPointsEntry(id={self.id}, user_id={self.user_id}, type={self.entry_type}, points={self.points})>"
+
+
+class RewardBalance(Base):
+    """Running totals per (user, program), maintained in the same transaction as the ledger.
+
+    balance = earned_total - spent_total, where earned_total sums earn/adjust
+    entries and spent_total sums redeemed and expired points.
+    """
+
+    __tablename__ = "reward_balances"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    program_name = Column(String(255), primary_key=True)
+    balance = Column(Integer, nullable=False, default=0)
+    earned_total = Column(Integer, nullable=False, default=0)
+    spent_total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<RewardBalance(user_id={self.user_id}, program={self.program_name}, balance={self.balance})>"
+
+
+class RewardExpiryRun(Base):
+    """Checkpoint of a points-expiry batch run; a crashed run resumes after `last_*`."""
+
+    __tablename__ = "reward_expiry_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), nullable=False, default="running")
+    # cutoffs are computed from this instant, so a resumed run expires the same points
+    started_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    finished_at = Column(TIMESTAMP, nullable=True)
+    last_user_id = Column(Integer, nullable=True)
+    last_program_name = Column(String(255), nullable=True)
+    batches = Column(Integer, nullable=False, default=0)
+    accounts_expired = Column(Integer, nullable=False, default=0)
+    points_expired = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RewardExpiryRun(id={self.id}, status={self.status}, batches={self.batches})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, VARCHAR, DateTime, NUMERIC, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, String, VARCHAR, DateTime, NUMERIC, ForeignKey, TIMESTAMP, Index
 from sqlalchemy.sql import func
 import enum
 from datetime import datetime
@@ -22,6 +22,17 @@ class Transaction(Base):
     txn_date = Column(TIMESTAMP, nullable=False)
     posted_date = Column(TIMESTAMP)
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+    # On PostgreSQL the table is partitioned by month of txn_date (primary key
+    # (id, txn_date), see app.transactions.partitions); id alone stays unique
+    # through its sequence and is the ORM identity.
+    __table_args__ = (
+        # account pages (WHERE account_id = ? ORDER BY created_at DESC) and
+        # the cascading / batched deletes by account_id
+        Index("ix_transactions_account_id_created_at", "account_id", "created_at"),
+        # account history bounded by txn_date: pruned to its months
+        Index("ix_transactions_account_id_txn_date", "account_id", "txn_date"),
+    )
     
     def __repr__(self):
         return f"<Transaction(id={self.id}, account_id={self.account_id}, amount={self.amount})>"
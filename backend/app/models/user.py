@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, VARCHAR, Enum, DateTime, TIMESTAMP
+from sqlalchemy import Column, Integer, String, VARCHAR, Enum, DateTime, TIMESTAMP, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 import enum
 from datetime import datetime
@@ -19,8 +20,66 @@ class User(Base):
     phone = Column(String(20))
     role = Column(String(50), nullable=False, server_default="user", default="user")
     kyc_status = Column(Enum(KycStatusEnum), default=KycStatusEnum.unverified)
+    # embedded in issued tokens as `ver`; bumping it revokes every token issued before
+    token_version = Column(Integer, nullable=False, server_default="0", default=0)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    # tombstone: set when erasure starts; the row goes once the background purge finishes
+    deleted_at = Column(TIMESTAMP, nullable=True)
     budgets = relationship("Budget", back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, name={self.name})>"
+
+
+class UserSetting(Base):
+    """Per-user preferences document (JSONB on PostgreSQL), one row per user."""
+
+    __tablename__ = "user_settings"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    settings = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False, default=dict)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserSetting(user_id={self.user_id})>"
+
+
+class TokenRevocation(Base):
+    """Recent token revocations: tokens of `user_id` with `ver` below `token_version` are rejected.
+
+    Only kept for as long as an access token can live, so the whole table
+    fits in each worker's memory for stateless auth. No FK to users: rows
+    must outlive deleted accounts.
+    """
+
+    __tablename__ = "token_revocations"
+
+    user_id = Column(Integer, primary_key=True)
+    token_version = Column(Integer, nullable=False)
+    revoked_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<TokenRevocation(user_id={self.user_id}, token_version={self.token_version})>"
+
+
+class RefreshToken(Base):
+    """Issued refresh tokens, stored by SHA-256 of their `jti`.
+
+    Each refresh consumes its token and issues a child in the same family;
+    presenting an already-consumed token revokes the whole family.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    jti_hash = Column(String(64), nullable=False, unique=True, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    parent_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
+    used_at = Column(TIMESTAMP, nullable=True)
+    revoked_at = Column(TIMESTAMP, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family={self.family_id})>"
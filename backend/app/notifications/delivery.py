@@ -0,0 +1,172 @@
+"""Email delivery of due notifications.
+
+Each batch is claimed in its own short transaction: the rows are picked
+with FOR UPDATE SKIP LOCKED, get `attempts + 1` and a `claimed_until`
+lease, and the transaction commits. The emails are then sent with no
+transaction or row lock open, and the outcome is written back in a second
+short transaction: delivered rows are flagged `sent`; failed rows keep
+their error and wait NOTIFICATION_RETRY_BACKOFF_SECONDS (doubling per
+attempt) before they can be claimed again, until after
+1 + NOTIFICATION_MAX_RETRIES attempts they are skipped (`skipped_at`).
+Rows claimed by a worker that died become claimable when the lease ends.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.user import User
+from app.notifications.models import Notification
+from app.notifications.service import mark_sent_many
+from app.utils.email import EmailTransport, build_message, get_transport
+
+
+def render_notification(row) -> Tuple[str, str]:
+    """Return (subject, body) for a pending notification row."""
+    greeting = f"Hi {row.name}," if getattr(row, "name", None) else "Hi,"
+    body = f"{greeting}\n\n{row.message}\n\n— Modern Digital Banking"
+    return row.title, body
+
+
+def _fetch_batch(db: Session, after_id: int, batch_size: int, now: datetime):
+    # Keyset over id so rows handled in this run are not picked up again,
+    # and SKIP LOCKED so concurrent workers claim disjoint batches.
+    return (
+        db.query(Notification.id, Notification.title, Notification.message, Notification.attempts,
+                 User.email, User.name)
+        .join(User, User.id == Notification.user_id)
+        .filter(
+            Notification.sent.isnot(True),
+            Notification.skipped_at.is_(None),
+            Notification.id > after_id,
+            (Notification.scheduled_date.is_(None)) | (Notification.scheduled_date <= now),
+            (Notification.claimed_until.is_(None)) | (Notification.claimed_until <= now),
+        )
+        .order_by(Notification.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True, of=Notification)
+        .all()
+    )
+
+
+def _claim_batch(db: Session, after_id: int, batch_size: int, now: datetime, lease_seconds: int):
+    """Claim the next due rows and commit, releasing the row locks before any email is sent."""
+    rows = _fetch_batch(db, after_id, batch_size, now)
+    if rows:
+        db.query(Notification).filter(Notification.id.in_([r.id for r in rows])).update(
+            {
+                Notification.attempts: Notification.attempts + 1,
+                Notification.claimed_until: now + timedelta(seconds=lease_seconds),
+            },
+            synchronize_session=False,
+        )
+    db.commit()
+    return rows
+
+
+def _send_one(transport: EmailTransport, row) -> Optional[str]:
+    """Send one notification; returns None on success, else the error."""
+    subject, body = render_notification(row)
+    try:
+        transport.send(build_message(row.email, subject, body))
+        return None
+    except Exception as e:
+        transport.reset()
+        return f"{type(e).__name__}: {e}"[:1000]
+
+
+def _send_chunk(transport: EmailTransport, rows) -> List[Tuple[int, Optional[str]]]:
+    return [(r.id, _send_one(transport, r)) for r in rows]
+
+
+def _record_results(db: Session, rows, results, now: datetime, max_attempts: int, backoff_seconds: float) -> int:
+    """Persist one batch's outcome (commits); returns how many rows were skipped."""
+    attempts = {r.id: (r.attempts or 0) + 1 for r in rows}
+    failures = [
+        {
+            "id": nid,
+            "last_error": error,
+            "claimed_until": now + timedelta(seconds=backoff_seconds * (2 ** (attempts[nid] - 1))),
+            "skipped_at": now if attempts[nid] >= max_attempts else None,
+        }
+        for nid, error in results
+        if error is not None
+    ]
+    for f in failures:
+        if f["skipped_at"] is not None:
+            print(f"Notification {f['id']} skipped after {attempts[f['id']]} attempts: {f['last_error']}")
+    if failures:
+        db.execute(update(Notification), failures)
+    delivered = [nid for nid, error in results if error is None]
+    mark_sent_many(db, delivered)
+    db.commit()
+    return sum(1 for f in failures if f["skipped_at"] is not None)
+
+
+def deliver_pending(
+    db: Session,
+    transport: Optional[EmailTransport] = None,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    backoff_seconds: Optional[float] = None,
+    max_batches: Optional[int] = None,
+) -> dict:
+    """Claim due, unsent notifications in batches and email them (see module docstring).
+
+    Each batch is split across `concurrency` worker threads sharing one
+    transport (the SMTP transport keeps a connection per thread).
+    Returns a summary: {"sent": int, "failed": int, "skipped": int, "batches": int};
+    `skipped` counts the failures that used up their last attempt.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    concurrency = max(1, concurrency or settings.NOTIFICATION_SEND_CONCURRENCY)
+    max_retries = settings.NOTIFICATION_MAX_RETRIES if max_retries is None else max_retries
+    backoff_seconds = settings.NOTIFICATION_RETRY_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+
+    owns_transport = transport is None
+    transport = transport or get_transport()
+
+    sent = 0
+    failed = 0
+    skipped = 0
+    batches = 0
+    last_id = 0
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while max_batches is None or batches < max_batches:
+                rows = _claim_batch(db, last_id, batch_size, datetime.utcnow(), settings.NOTIFICATION_CLAIM_SECONDS)
+                if not rows:
+                    break
+                batches += 1
+                last_id = rows[-1].id
+
+                chunks = [rows[i::concurrency] for i in range(concurrency) if rows[i::concurrency]]
+                results: List[Tuple[int, Optional[str]]] = []
+                for chunk_results in pool.map(lambda c: _send_chunk(transport, c), chunks):
+                    results.extend(chunk_results)
+
+                skipped += _record_results(db, rows, results, datetime.utcnow(), max_retries + 1, backoff_seconds)
+                delivered = sum(1 for _, error in results if error is None)
+                sent += delivered
+                failed += len(results) - delivered
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if owns_transport:
+            transport.close()
+
+    return {"sent": sent, "failed": failed, "skipped": skipped, "batches": batches}
+
+
+def run_delivery_once(transport: Optional[EmailTransport] = None) -> dict:
+    db = SessionLocal()
+    try:
+        return deliver_pending(db, transport=transport)
+    finally:
+        db.close()
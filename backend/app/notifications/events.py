@@ -0,0 +1,160 @@
+"""Real-time event fan-out for connected clients.
+
+Producers call `publish_event` inside their DB transaction. On PostgreSQL
+this issues `pg_notify`, so the event is delivered exactly when the
+transaction commits; a single LISTEN connection per worker process
+(`start_listener`) receives every event and hands it to the in-process
+`hub`, which fans it out to the SSE subscribers of that user. On other
+databases (local SQLite) events are published to the hub directly.
+"""
+import asyncio
+import json
+import select
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import engine
+
+# pg_notify payloads are capped at 8000 bytes; keep events small (ids, titles, amounts)
+_MAX_PAYLOAD_BYTES = 7900
+
+
+class EventHub:
+    """In-process fan-out of user events to asyncio subscriber queues."""
+
+    def __init__(self, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add((loop, queue))
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subs = self._subscribers.get(user_id)
+            if not subs:
+                return
+            for sub in [s for s in subs if s[1] is queue]:
+                subs.discard(sub)
+            if not subs:
+                del self._subscribers[user_id]
+
+    def subscriber_count(self, user_id: Optional[int] = None) -> int:
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, user_id: int, event: Dict[str, Any]) -> None:
+        """Thread-safe: may be called from the listener thread or request handlers."""
+        with self._lock:
+            subs = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subs:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # subscriber's loop already closed
+                self.unsubscribe(user_id, queue)
+
+
+def _offer(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+    # Slow clients lose their oldest events rather than growing memory without bound
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(event)
+
+
+hub = EventHub()
+
+
+def _uses_pg_notify(db: Session) -> bool:
+    bind = db.get_bind()
+    return bind is not None and bind.dialect.name == "postgresql"
+
+
+def publish_event(db: Session, user_id: int, event_type: str, data: Dict[str, Any]) -> None:
+    """Queue an event for `user_id`; on PostgreSQL it is delivered when `db` commits."""
+    event = {"user_id": user_id, "type": event_type, "data": data}
+    if not _uses_pg_notify(db):
+        hub.publish(user_id, event)
+        return
+    payload = json.dumps(event, default=str)
+    if len(payload.encode("utf-8")) > _MAX_PAYLOAD_BYTES:
+        # drop the body but still tell the client to refetch
+        payload = json.dumps({"user_id": user_id, "type": event_type, "data": {"truncated": True}})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": settings.EVENTS_CHANNEL, "payload": payload})
+
+
+def _dispatch(payload: str) -> None:
+    try:
+        event = json.loads(payload)
+        hub.publish(int(event["user_id"]), event)
+    except Exception as e:
+        print("Ignoring malformed event payload:", e)
+
+
+_listener_thread: Optional[threading.Thread] = None
+_listener_stop = threading.Event()
+
+
+def _listen_loop(poll_seconds: float = 5.0):
+    # Dedicated, unpooled connection: it lives as long as the worker
+    listen_engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    backoff = 1.0
+    while not _listener_stop.is_set():
+        raw = None
+        try:
+            raw = listen_engine.raw_connection()
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN "{settings.EVENTS_CHANNEL}"')
+            backoff = 1.0
+            while not _listener_stop.is_set():
+                if select.select([conn], [], [], poll_seconds) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    _dispatch(conn.notifies.pop(0).payload)
+        except Exception as e:
+            print("Event listener error, reconnecting:", e)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            if raw is not None:
+                try:
+                    raw.close()
+                except Exception:
+                    pass
+
+
+def start_listener() -> bool:
+    """Start this worker's LISTEN thread (PostgreSQL only). Returns True if running."""
+    global _listener_thread
+    if engine.dialect.name != "postgresql":
+        return False
+    if _listener_thread is not None and _listener_thread.is_alive():
+        return True
+    _listener_stop.clear()
+    _listener_thread = threading.Thread(target=_listen_loop, name="events-listener", daemon=True)
+    _listener_thread.start()
+    return True
+
+
+def stop_listener() -> None:
+    _listener_stop.set()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -13,7 +13,23 @@ class Notification(Base):
     message = Column(Text, nullable=False)
     scheduled_date = Column(DateTime, nullable=True)
     sent = Column(Boolean, default=False)
+    # delivery bookkeeping: attempts made, the last failure, until when the row
+    # is claimed by a worker (or waits before its retry), and when it was given up
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    last_error = Column(Text, nullable=True)
+    claimed_until = Column(DateTime, nullable=True)
+    skipped_at = Column(DateTime, nullable=True)
+    read = Column(Boolean, nullable=False, default=False, server_default=text("false"))
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (
+        # newest-first listing / keyset pagination per user
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at", "id"),
+        # unread badge count is an index-only scan over this partial index
+        Index("ix_notifications_user_id_unread", "user_id", postgresql_where=text("read = false")),
+        # delivery queue: WHERE sent IS NOT TRUE AND skipped_at IS NULL AND id > ? ORDER BY id
+        Index("ix_notifications_pending_id", "id", postgresql_where=text("sent IS NOT TRUE AND skipped_at IS NULL")),
+    )
+
     def __repr__(self):
         return f"<Notification(id={self.id}, user_id={self.user_id}, type={self.type})>"
@@ -1,15 +1,102 @@
-from fastapi import APIRouter, Depends
-from typing import List
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.dependencies import get_current_user
+from app.config import settings
+from app.database import get_db, get_read_db, SessionLocal
+from app.dependencies import get_current_user, get_current_principal, user_from_token
 from app.notifications import service as notifications_service
-from app.notifications.schemas import NotificationResponse
+from app.notifications.events import hub
+from app.notifications.schemas import NotificationPage, NotificationCount, MarkReadRequest, MarkReadResponse
 from app.models.user import User
 
 router = APIRouter()
 
+optional_security = HTTPBearer(auto_error=False)
 
-@router.get("/", response_model=List[NotificationResponse])
-async def list_notifications(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return notifications_service.get_notifications_for_user(db, current_user.id)
+
+@router.get("/", response_model=NotificationPage)
+async def list_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    unread: Optional[bool] = Query(None),
+    sent: Optional[bool] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_principal),
+):
+    """Newest-first page of the current user's notifications.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    """
+    try:
+        items, next_cursor = notifications_service.list_notifications_page(
+            db, current_user.id, limit=limit, cursor=cursor, unread=unread, sent=sent
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/count", response_model=NotificationCount)
+async def count_notifications(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_principal)):
+    """Unread count for the header badge."""
+    return {"unread": notifications_service.count_unread(db, current_user.id)}
+
+
+@router.post("/mark-read", response_model=MarkReadResponse)
+async def mark_notifications_read(
+    payload: MarkReadRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    updated = notifications_service.mark_read(db, current_user.id, payload.ids)
+    return {"updated": updated}
+
+
+def _stream_user_id(token: Optional[str]) -> int:
+    # same checks as get_current_user: deleted users and revoked versions are rejected.
+    # Short-lived session: a streaming response must not pin a pooled connection
+    db = SessionLocal()
+    try:
+        return user_from_token(token, db).id
+    finally:
+        db.close()
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    """Server-sent events: new notifications and balance changes for the current user.
+
+    Browsers' EventSource cannot set headers, so the access token may also be
+    passed as `?token=`.
+    """
+    user_id = _stream_user_id(credentials.credentials if credentials else token)
+    queue = hub.subscribe(user_id)
+
+    async def event_source():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+        finally:
+            hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,15 @@
+import random
 import threading
 import time
 from datetime import datetime, timedelta
+from app.config import settings
 from app.database import SessionLocal
 from app.notifications.models import Notification
 from app.notifications.service import create_notification
+from app.notifications.delivery import run_delivery_once
+from app.rewards.expiry import expiry_enabled, run_expiry_once
+from app.auth.refresh_store import purge_expired_refresh_tokens
+from app.utils.purge import run_pending_purges
 from app.models.bill import Bill
 
 
@@ -36,6 +42,92 @@ def _scheduler_loop(interval_seconds: int = 24 * 3600):
         time.sleep(interval_seconds)
 
 
-def start_scheduler(interval_seconds: int = 24 * 3600):
-    t = threading.Thread(target=_scheduler_loop, args=(interval_seconds,), daemon=True)
+def _delivery_loop(interval_seconds: int):
+    while True:
+        try:
+            run_delivery_once()
+        except Exception as e:
+            print("Notification delivery run failed:", e)
+        time.sleep(interval_seconds)
+
+
+def _expiry_loop(interval_seconds: int):
+    while True:
+        try:
+            result = run_expiry_once()
+            if result["accounts_expired"]:
+                print("Reward points expiry:", result)
+        except Exception as e:
+            print("Reward points expiry run failed:", e)
+        time.sleep(interval_seconds)
+
+
+def _refresh_token_purge_loop(interval_seconds: int):
+    while True:
+        db = SessionLocal()
+        try:
+            purge_expired_refresh_tokens(db)
+        except Exception as e:
+            db.rollback()
+            print("Refresh token purge failed:", e)
+        finally:
+            db.close()
+        time.sleep(interval_seconds)
+
+
+def _purge_loop(interval_seconds: int):
+    # picks up purges whose request-time thread died with its worker
+    while True:
+        try:
+            run_pending_purges()
+        except Exception as e:
+            print("Purge sweep failed:", e)
+        time.sleep(interval_seconds)
+
+
+def _partition_loop(interval_seconds: int):
+    # next months' transactions partitions exist before their first row
+    from app.transactions.partitions import ensure_partitions
+
+    while True:
+        try:
+            created = ensure_partitions()
+            if created:
+                print("Created transaction partitions:", ", ".join(created))
+        except Exception as e:
+            print("Transaction partition maintenance failed:", e)
+        time.sleep(interval_seconds)
+
+
+def start_delay() -> float:
+    """Seconds a background loop waits before its first run.
+
+    Jittered between BACKGROUND_START_DELAY_SECONDS and twice that, so a
+    fleet of workers booted together neither touches the database while
+    booting nor all at the same moment afterwards.
+    """
+    base = max(0, settings.BACKGROUND_START_DELAY_SECONDS)
+    return base + random.uniform(0, base)
+
+
+def _after_start_delay(loop, *args):
+    time.sleep(start_delay())
+    loop(*args)
+
+
+def start_scheduler(interval_seconds: int = 24 * 3600, delivery_interval_seconds: int = None):
+    t = threading.Thread(target=_after_start_delay, args=(_scheduler_loop, interval_seconds), daemon=True)
     t.start()
+    # drain unsent notifications far more often than the daily reminder checks
+    delivery_interval = delivery_interval_seconds or settings.NOTIFICATION_DELIVERY_INTERVAL_SECONDS
+    d = threading.Thread(target=_after_start_delay, args=(_delivery_loop, delivery_interval), daemon=True)
+    d.start()
+    if expiry_enabled():
+        x = threading.Thread(target=_after_start_delay, args=(_expiry_loop, settings.REWARD_EXPIRY_INTERVAL_SECONDS), daemon=True)
+        x.start()
+    r = threading.Thread(target=_after_start_delay, args=(_refresh_token_purge_loop, settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS), daemon=True)
+    r.start()
+    p = threading.Thread(target=_after_start_delay, args=(_purge_loop, settings.PURGE_INTERVAL_SECONDS), daemon=True)
+    p.start()
+    m = threading.Thread(target=_after_start_delay, args=(_partition_loop, settings.TRANSACTION_PARTITION_INTERVAL_SECONDS), daemon=True)
+    m.start()
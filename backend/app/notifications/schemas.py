@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -11,7 +11,27 @@ class NotificationResponse(BaseModel):
     message: str
     scheduled_date: Optional[datetime]
     sent: bool
+    read: bool = False
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class NotificationPage(BaseModel):
+    items: List[NotificationResponse]
+    # opaque cursor for the next (older) page; None when there are no more rows
+    next_cursor: Optional[str] = None
+
+
+class NotificationCount(BaseModel):
+    unread: int
+
+
+class MarkReadRequest(BaseModel):
+    # when omitted, every unread notification of the current user is marked read
+    ids: Optional[List[int]] = None
+
+
+class MarkReadResponse(BaseModel):
+    updated: int
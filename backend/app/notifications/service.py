@@ -1,6 +1,25 @@
+import base64
+from sqlalchemy import false, func, true, tuple_
 from sqlalchemy.orm import Session
 from app.notifications.models import Notification
+from app.notifications.events import publish_event
 from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+def encode_cursor(created_at: datetime, notification_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{notification_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a pagination cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, notification_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(notification_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
 
 
 class NotificationService:
@@ -8,6 +27,60 @@ class NotificationService:
     def get_notifications_for_user(db: Session, user_id: int):
         return db.query(Notification).filter(Notification.user_id == user_id).order_by(Notification.created_at.desc()).all()
 
+    @staticmethod
+    def list_notifications_page(
+        db: Session,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        unread: Optional[bool] = None,
+        sent: Optional[bool] = None,
+    ) -> Tuple[List[Notification], Optional[str]]:
+        """Return one newest-first page of a user's notifications and the next cursor.
+
+        Uses keyset pagination on (created_at, id) so every page is a bounded
+        range scan of `ix_notifications_user_id_created_at`.
+        """
+        query = db.query(Notification).filter(Notification.user_id == user_id)
+        if unread is not None:
+            query = query.filter(Notification.read == (false() if unread else true()))
+        if sent is not None:
+            query = query.filter(Notification.sent.is_(True) if sent else Notification.sent.isnot(True))
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Notification.created_at, Notification.id) < tuple_(created_at, last_id))
+
+        # fetch one extra row to know whether another page exists
+        rows = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
+
+    @staticmethod
+    def count_unread(db: Session, user_id: int) -> int:
+        return db.query(func.count(Notification.id)).filter(
+            Notification.user_id == user_id,
+            # `read = false`, exactly the predicate of ix_notifications_user_id_unread
+            Notification.read == false(),
+        ).scalar() or 0
+
+    @staticmethod
+    def mark_read(db: Session, user_id: int, notification_ids: Optional[List[int]] = None) -> int:
+        """Mark the given (or all) unread notifications of a user as read in one UPDATE."""
+        query = db.query(Notification).filter(
+            Notification.user_id == user_id,
+            Notification.read == false(),
+        )
+        if notification_ids is not None:
+            if not notification_ids:
+                return 0
+            query = query.filter(Notification.id.in_(notification_ids))
+        updated = query.update({Notification.read: True}, synchronize_session=False)
+        db.commit()
+        return updated
+
     @staticmethod
     def create_notification(db: Session, user_id: int, type_: str, title: str, message: str, scheduled_date: datetime = None):
         n = Notification(
@@ -19,6 +92,9 @@ class NotificationService:
             sent=False,
         )
         db.add(n)
+        db.flush()
+        # push to connected clients; delivered together with the commit
+        publish_event(db, user_id, "notification", {"id": n.id, "type": type_, "title": title})
         db.commit()
         db.refresh(n)
         return n
@@ -31,10 +107,35 @@ class NotificationService:
         db.refresh(notification)
         return notification
 
+    @staticmethod
+    def mark_sent_many(db: Session, notification_ids):
+        """Flag many notifications as sent with a single UPDATE; returns rows updated."""
+        ids = list(notification_ids)
+        if not ids:
+            return 0
+        updated = db.query(Notification).filter(Notification.id.in_(ids)).update(
+            {Notification.sent: True}, synchronize_session=False
+        )
+        db.commit()
+        return updated
+
 
 # Compatibility wrappers
 def get_notifications_for_user(db: Session, user_id: int):
     return NotificationService.get_notifications_for_user(db, user_id)
 
+def list_notifications_page(db: Session, user_id: int, limit: int = 50, cursor: Optional[str] = None,
+                            unread: Optional[bool] = None, sent: Optional[bool] = None):
+    return NotificationService.list_notifications_page(db, user_id, limit, cursor, unread, sent)
+
+def count_unread(db: Session, user_id: int) -> int:
+    return NotificationService.count_unread(db, user_id)
+
+def mark_read(db: Session, user_id: int, notification_ids: Optional[List[int]] = None) -> int:
+    return NotificationService.mark_read(db, user_id, notification_ids)
+
 def create_notification(db: Session, user_id: int, type_: str, title: str, message: str, scheduled_date: datetime = None):
     return NotificationService.create_notification(db, user_id, type_, title, message, scheduled_date)
+
+def mark_sent_many(db: Session, notification_ids):
+    return NotificationService.mark_sent_many(db, notification_ids)
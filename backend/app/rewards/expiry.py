@@ -0,0 +1,158 @@
+"""Batch expiry of reward points.
+
+Points are consumed oldest first, so the points still held that are not
+older than a program's cutoff are at most the positive credits since it;
+everything else in the balance is old and expires:
+
+    max(0, balance - positive_credits_since_cutoff)
+
+Negative `adjust` entries (reward edits and deletes) therefore consume the
+oldest points like any other debit. This only needs the running totals
+row plus one indexed aggregate over the ledger. Accounts are walked in primary-key order in chunks of
+REWARD_EXPIRY_BATCH_SIZE; each chunk locks only its own balance rows,
+writes `expire` ledger entries through `ledger.record_entries` and advances
+the run's checkpoint in the same short transaction. Because expiring
+lowers the balance, re-running (or two workers racing) expires nothing
+twice.
+
+Expiry is opt-in: with REWARD_POINTS_EXPIRY_DAYS = 0 and no positive
+override nothing runs.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.reward import RewardBalance, RewardExpiryRun, RewardPointsEntry
+from app.rewards import ledger
+
+
+def _cutoff(as_of: datetime, days: Optional[int]) -> Optional[datetime]:
+    if not days or days <= 0:
+        return None
+    return as_of - timedelta(days=int(days))
+
+
+def _program_cutoff(program: str, as_of: datetime) -> Optional[datetime]:
+    overrides = settings.REWARD_POINTS_EXPIRY_OVERRIDES or {}
+    days = overrides[program] if program in overrides else settings.REWARD_POINTS_EXPIRY_DAYS
+    return _cutoff(as_of, days)
+
+
+def expiry_enabled() -> bool:
+    overrides = settings.REWARD_POINTS_EXPIRY_OVERRIDES or {}
+    return (settings.REWARD_POINTS_EXPIRY_DAYS or 0) > 0 or any((d or 0) > 0 for d in overrides.values())
+
+
+def _cutoff_expr(program_column, as_of: datetime):
+    """SQL expression giving each program's cutoff (NULL = never expires)."""
+    default = _cutoff(as_of, settings.REWARD_POINTS_EXPIRY_DAYS)
+    overrides: Dict[str, Optional[datetime]] = {
+        str(program): _cutoff(as_of, days)
+        for program, days in (settings.REWARD_POINTS_EXPIRY_OVERRIDES or {}).items()
+    }
+    if not overrides:
+        return literal(default, RewardPointsEntry.created_at.type)
+    return case(overrides, value=program_column, else_=literal(default, RewardPointsEntry.created_at.type))
+
+
+def _current_run(db: Session) -> RewardExpiryRun:
+    run = (
+        db.query(RewardExpiryRun)
+        .filter(RewardExpiryRun.status == "running")
+        .order_by(RewardExpiryRun.id.desc())
+        .first()
+    )
+    if run is None:
+        run = RewardExpiryRun(status="running", started_at=datetime.utcnow(), batches=0,
+                              accounts_expired=0, points_expired=0)
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+    return run
+
+
+def expire_batch(db: Session, run: RewardExpiryRun, batch_size: int) -> int:
+    """Expire one chunk after the run's checkpoint and commit. Returns accounts scanned."""
+    q = (
+        select(RewardBalance.user_id, RewardBalance.program_name, RewardBalance.balance)
+        .where(RewardBalance.balance > 0)
+    )
+    if run.last_user_id is not None:
+        q = q.where(
+            tuple_(RewardBalance.user_id, RewardBalance.program_name)
+            > tuple_(literal(run.last_user_id), literal(run.last_program_name))
+        )
+    accounts = db.execute(
+        q.order_by(RewardBalance.user_id, RewardBalance.program_name).limit(batch_size).with_for_update()
+    ).all()
+    if not accounts:
+        run.status = "done"
+        run.finished_at = datetime.utcnow()
+        db.commit()
+        return 0
+
+    entry = RewardPointsEntry
+    fresh = {
+        (r.user_id, r.program_name): r.credits or 0
+        for r in db.execute(
+            select(entry.user_id, entry.program_name, func.sum(entry.points).label("credits"))
+            .where(
+                entry.user_id.between(accounts[0].user_id, accounts[-1].user_id),
+                entry.entry_type.in_(ledger.CREDIT_TYPES),
+                entry.points > 0,
+                entry.created_at >= _cutoff_expr(entry.program_name, run.started_at),
+            )
+            .group_by(entry.user_id, entry.program_name)
+        )
+    }
+
+    deltas = []
+    for a in accounts:
+        if _program_cutoff(a.program_name, run.started_at) is None:
+            continue
+        due = max(0, a.balance - fresh.get((a.user_id, a.program_name), 0))
+        if due > 0:
+            deltas.append((a.user_id, a.program_name, None, -due))
+    ledger.record_entries(db, deltas, ledger.EXPIRE, note="points expired")
+
+    last = accounts[-1]
+    run.last_user_id, run.last_program_name = last.user_id, last.program_name
+    run.batches += 1
+    run.accounts_expired += len(deltas)
+    run.points_expired += -sum(d[3] for d in deltas)
+    if len(accounts) < batch_size:
+        run.status = "done"
+        run.finished_at = datetime.utcnow()
+    db.commit()
+    return len(accounts)
+
+
+def run_expiry_once(batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> dict:
+    """Run (or resume) an expiry pass until done or `max_batches` chunks were processed."""
+    if not expiry_enabled():
+        return {"run_id": None, "status": "disabled", "batches": 0, "accounts_expired": 0, "points_expired": 0}
+    batch_size = batch_size or settings.REWARD_EXPIRY_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        run = _current_run(db)
+        done = 0
+        while run.status == "running" and (max_batches is None or done < max_batches):
+            try:
+                expire_batch(db, run, batch_size)
+            except Exception:
+                db.rollback()
+                raise
+            done += 1
+        return {
+            "run_id": run.id,
+            "status": run.status,
+            "batches": run.batches,
+            "accounts_expired": run.accounts_expired,
+            "points_expired": run.points_expired,
+        }
+    finally:
+        db.close()
@@ -0,0 +1,247 @@
+"""Reward points ledger.
+
+Every change to a user's points in a program is appended to
+`reward_points_ledger`, and the matching `reward_balances` row is updated
+in the same transaction with a single UPSERT / guarded UPDATE. Reading a
+balance is therefore one primary-key lookup, while the ledger keeps the
+full, auditable history. Functions here never commit; callers own the
+transaction so grants, ledger rows and balances land together.
+
+Redeemed and expired points are also taken off the user's `rewards` rows in
+the program (oldest grant first), so GET /api/rewards shows what is left.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, text, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.reward import Reward, RewardBalance, RewardPointsEntry
+from app.utils.db import dialect_insert, is_postgres
+
+EARN = "earn"
+REDEEM = "redeem"
+EXPIRE = "expire"
+ADJUST = "adjust"
+
+# credits count towards earned_total, debits towards spent_total
+CREDIT_TYPES = (EARN, ADJUST)
+DEBIT_TYPES = (REDEEM, EXPIRE)
+
+# (user_id, program_name, reward_id or None, signed points)
+LedgerDelta = Tuple[int, str, Optional[int], int]
+
+
+class InsufficientPoints(ValueError):
+    pass
+
+
+def _totals_factors(entry_type: str) -> Tuple[int, int]:
+    """Multipliers turning a signed delta into (earned_total, spent_total) increments."""
+    if entry_type in CREDIT_TYPES:
+        return 1, 0
+    if entry_type in DEBIT_TYPES:
+        return 0, -1
+    raise ValueError(f"Unknown ledger entry type: {entry_type}")
+
+
+_RECORD_SQL = text("""
+    WITH d AS (
+        SELECT *
+        FROM unnest(CAST(:user_ids AS integer[]), CAST(:programs AS varchar[]),
+                    CAST(:reward_ids AS integer[]), CAST(:points AS integer[]))
+             AS t(user_id, program_name, reward_id, points)
+    ),
+    agg AS (
+        SELECT user_id, program_name, CAST(SUM(points) AS integer) AS points
+        FROM d GROUP BY user_id, program_name
+    ),
+    bal AS (
+        INSERT INTO reward_balances AS b (user_id, program_name, balance, earned_total, spent_total, updated_at)
+        SELECT user_id, program_name, points, points * :earned_factor, points * :spent_factor, now()
+        FROM agg
+        ON CONFLICT (user_id, program_name) DO UPDATE
+        SET balance = b.balance + EXCLUDED.balance,
+            earned_total = b.earned_total + EXCLUDED.earned_total,
+            spent_total = b.spent_total + EXCLUDED.spent_total,
+            updated_at = now()
+        RETURNING user_id, program_name, balance
+    )
+    INSERT INTO reward_points_ledger (user_id, program_name, reward_id, entry_type, points, balance_after, note)
+    SELECT d.user_id, d.program_name, d.reward_id, :entry_type, d.points, bal.balance, :note
+    FROM d
+    JOIN bal ON bal.user_id = d.user_id AND bal.program_name = d.program_name
+""")
+
+
+def record_entries(db: Session, deltas: Iterable[LedgerDelta], entry_type: str, note: Optional[str] = None) -> int:
+    """Append one ledger row per delta and fold them into the running totals.
+
+    On PostgreSQL this is a single statement however many users are touched;
+    when a batch holds several deltas for the same account their
+    `balance_after` is the balance after the whole batch. Zero deltas are
+    skipped. Returns the number of entries written. Balances are not floored
+    here: grant corrections may take an account negative; use
+    `redeem_points` for user-initiated debits.
+    """
+    rows = [(int(u), p, r, int(pts)) for u, p, r, pts in deltas if pts]
+    if not rows:
+        return 0
+    earned_factor, spent_factor = _totals_factors(entry_type)
+    if entry_type in DEBIT_TYPES:
+        _consume_grants(db, [(u, p, -pts) for u, p, _, pts in rows])
+
+    if is_postgres(db):
+        db.execute(_RECORD_SQL, {
+            "user_ids": [r[0] for r in rows],
+            "programs": [r[1] for r in rows],
+            "reward_ids": [r[2] for r in rows],
+            "points": [r[3] for r in rows],
+            "earned_factor": earned_factor,
+            "spent_factor": spent_factor,
+            "entry_type": entry_type,
+            "note": note,
+        })
+        return len(rows)
+
+    per_account: Dict[Tuple[int, str], int] = defaultdict(int)
+    for user_id, program, _, pts in rows:
+        per_account[(user_id, program)] += pts
+    balances = {
+        key: _apply_to_balance(db, key[0], key[1], pts, pts * earned_factor, pts * spent_factor)
+        for key, pts in per_account.items()
+    }
+    db.add_all([
+        RewardPointsEntry(user_id=user_id, program_name=program, reward_id=reward_id, entry_type=entry_type,
+                          points=pts, balance_after=balances[(user_id, program)], note=note)
+        for user_id, program, reward_id, pts in rows
+    ])
+    db.flush()
+    return len(rows)
+
+
+def _apply_to_balance(db: Session, user_id: int, program: str, delta: int, earned: int, spent: int) -> int:
+    insert = dialect_insert(db)
+    if insert is not None:
+        stmt = insert(RewardBalance).values(
+            user_id=user_id, program_name=program, balance=delta, earned_total=earned, spent_total=spent,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RewardBalance.user_id, RewardBalance.program_name],
+            set_={
+                "balance": RewardBalance.balance + stmt.excluded.balance,
+                "earned_total": RewardBalance.earned_total + stmt.excluded.earned_total,
+                "spent_total": RewardBalance.spent_total + stmt.excluded.spent_total,
+                "updated_at": func.now(),
+            },
+        ).returning(RewardBalance.balance)
+        return db.execute(stmt).scalar_one()
+
+    row = db.get(RewardBalance, (user_id, program), with_for_update=True)
+    if row is None:
+        row = RewardBalance(user_id=user_id, program_name=program, balance=0, earned_total=0, spent_total=0)
+        db.add(row)
+    row.balance += delta
+    row.earned_total += earned
+    row.spent_total += spent
+    db.flush()
+    return row.balance
+
+
+def _consume_grants(db: Session, debits: Iterable[Tuple[int, str, int]]) -> None:
+    """Take debited points off the matching `rewards` rows, oldest grant first.
+
+    One locking SELECT for every account in `debits` and one executemany
+    UPDATE by primary key. Points earned without a reward row (POST
+    /points/earn) have no grant to reduce, so grants never go below zero.
+    """
+    owed: Dict[Tuple[int, str], int] = defaultdict(int)
+    for user_id, program, pts in debits:
+        if pts > 0:
+            owed[(int(user_id), program)] += pts
+    if not owed:
+        return
+    grants = db.execute(
+        select(Reward.id, Reward.user_id, Reward.program_name, Reward.points_balance)
+        .where(tuple_(Reward.user_id, Reward.program_name).in_(list(owed)), Reward.points_balance > 0)
+        .order_by(Reward.id)
+        .with_for_update()
+    ).all()
+    changes = []
+    for g in grants:
+        key = (g.user_id, g.program_name)
+        take = min(owed[key], g.points_balance)
+        if take > 0:
+            owed[key] -= take
+            changes.append({"id": g.id, "points_balance": g.points_balance - take})
+    if changes:
+        db.execute(update(Reward), changes)
+
+
+def earn_points(db: Session, user_id: int, program_name: str, points: int,
+                reward_id: Optional[int] = None, note: Optional[str] = None) -> int:
+    """Credit `points` (> 0) and return the new balance."""
+    if points <= 0:
+        raise ValueError("points must be positive")
+    record_entries(db, [(user_id, program_name, reward_id, points)], EARN, note)
+    return get_balance(db, user_id, program_name)
+
+
+def redeem_points(db: Session, user_id: int, program_name: str, points: int, note: Optional[str] = None) -> int:
+    """Debit `points` (> 0) if the balance covers it; returns the new balance.
+
+    The balance check and the decrement are one guarded UPDATE, so two
+    concurrent redemptions can never spend the same points.
+    """
+    if points <= 0:
+        raise ValueError("points must be positive")
+    new_balance = db.execute(
+        update(RewardBalance)
+        .where(
+            RewardBalance.user_id == user_id,
+            RewardBalance.program_name == program_name,
+            RewardBalance.balance >= points,
+        )
+        .values(
+            balance=RewardBalance.balance - points,
+            spent_total=RewardBalance.spent_total + points,
+            updated_at=func.now(),
+        )
+        .returning(RewardBalance.balance)
+    ).scalar()
+    if new_balance is None:
+        raise InsufficientPoints(f"Insufficient points in '{program_name}'")
+    _consume_grants(db, [(user_id, program_name, points)])
+    db.add(RewardPointsEntry(user_id=user_id, program_name=program_name, entry_type=REDEEM,
+                             points=-points, balance_after=new_balance, note=note))
+    db.flush()
+    return new_balance
+
+
+def get_balance(db: Session, user_id: int, program_name: str) -> int:
+    balance = db.execute(
+        select(RewardBalance.balance).where(
+            RewardBalance.user_id == user_id, RewardBalance.program_name == program_name,
+        )
+    ).scalar()
+    return balance or 0
+
+
+def get_balances(db: Session, user_id: int) -> List[RewardBalance]:
+    return (
+        db.query(RewardBalance)
+        .filter(RewardBalance.user_id == user_id)
+        .order_by(RewardBalance.program_name)
+        .all()
+    )
+
+
+def get_history(db: Session, user_id: int, program_name: Optional[str] = None,
+                limit: int = 50, before_id: Optional[int] = None) -> List[RewardPointsEntry]:
+    """Newest-first ledger page; pass the last row's id as `before_id` for the next page."""
+    q = db.query(RewardPointsEntry).filter(RewardPointsEntry.user_id == user_id)
+    if program_name is not None:
+        q = q.filter(RewardPointsEntry.program_name == program_name)
+    if before_id is not None:
+        q = q.filter(RewardPointsEntry.id < before_id)
+    return q.order_by(RewardPointsEntry.id.desc()).limit(limit).all()
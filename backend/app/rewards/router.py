@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 import traceback
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.rewards.schemas import RewardBulkAssign, RewardResponse, RewardCreate, RewardUpdate, RewardGroupUpdate
-from app.models.reward import Reward
+from app.config import settings
+from app.database import get_db, get_read_db
+from app.rewards.schemas import (
+	RewardBulkAssign, RewardResponse, RewardCreate, RewardUpdate, RewardGroupUpdate,
+	PointsEarnRequest, PointsRedeemRequest, PointsBalanceResponse, PointsEntryResponse,
+)
+from app.models.reward import Reward, RewardBalance
 from app.models.user import User
-from app.dependencies import require_admin, get_current_user, get_current_admin
-from app.utils.validation import validate_user_ids
+from app.dependencies import require_admin, get_current_user, get_current_admin, require_write_access, get_current_principal
 from app.rewards import service as rewards_service
+from app.rewards import ledger
+from app.rewards.expiry import run_expiry_once
 
 router = APIRouter()
 
@@ -18,19 +23,16 @@ router = APIRouter()
 def assign_rewards_bulk(payload: RewardBulkAssign, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
 	"""Admin-only bulk assign: create one Reward per `user_id`.
 
-	- Validate provided user IDs.
-	- Add all Reward objects to the session.
-	- Commit once, then refresh and return created rewards.
+	- Validates user IDs and inserts every row in one multi-row INSERT.
+	- Unknown IDs reject the whole request with 422 (`missing_user_ids`).
+	- Returns the created rewards (ids and shared group_id).
 	"""
 	# Wrap the whole handler so any unexpected error becomes JSONifiable and logged
 	try:
-		# validate user ids exist
-		payload.check_ids_exist(db)
-
-		# Delegate safe bulk work to service layer which handles per-user failures
 		created = rewards_service.bulk_assign_rewards(db, payload)
-		# Return created Reward objects (includes id and group_id)
 		return created
+	except HTTPException:
+		raise
 	except Exception as exc:
 		# Log traceback for debugging and return structured error JSON
 		traceback_str = traceback.format_exc()
@@ -40,15 +42,76 @@ def assign_rewards_bulk(payload: RewardBulkAssign, db: Session = Depends(get_db)
 
 
 @router.get("/", response_model=List[RewardResponse])
-def list_rewards(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def list_rewards(db: Session = Depends(get_read_db), current_user: User = Depends(get_current_principal)):
 	"""List rewards: admins see all, users see their own."""
 	if getattr(current_user, "role", "user") == "admin":
 		return rewards_service.get_all_rewards(db)
 	return rewards_service.get_rewards_for_user(db, current_user.id)
 
 
+def _points_owner(current_user: User, user_id: Optional[int]) -> int:
+	"""Users read their own points; admins may pass `user_id` to read anyone's."""
+	if user_id is None or user_id == current_user.id:
+		return current_user.id
+	if getattr(current_user, "role", "user") != "admin":
+		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+	return user_id
+
+
+@router.get("/points", response_model=List[PointsBalanceResponse])
+def get_points_balances(user_id: Optional[int] = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
+	"""Current points balance per program (one row per program, no ledger scan)."""
+	return ledger.get_balances(db, _points_owner(current_user, user_id))
+
+
+@router.get("/points/history", response_model=List[PointsEntryResponse])
+def get_points_history(
+	program_name: Optional[str] = None,
+	limit: int = Query(50, ge=1, le=200),
+	before_id: Optional[int] = None,
+	user_id: Optional[int] = None,
+	db: Session = Depends(get_db),
+	current_user: User = Depends(get_current_principal),
+):
+	"""Ledger entries, newest first. Pass the last entry's id as `before_id` to page."""
+	return ledger.get_history(db, _points_owner(current_user, user_id), program_name, limit, before_id)
+
+
+@router.post("/points/earn", response_model=PointsBalanceResponse)
+def earn_points(payload: PointsEarnRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
+	"""Admin-only: credit points to a user's program balance."""
+	if db.query(User.id).filter(User.id == payload.user_id).first() is None:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+	ledger.earn_points(db, payload.user_id, payload.program_name, payload.points, note=payload.note)
+	db.commit()
+	return db.get(RewardBalance, (payload.user_id, payload.program_name))
+
+
+@router.post("/points/redeem", response_model=PointsBalanceResponse)
+def redeem_points(payload: PointsRedeemRequest, db: Session = Depends(get_db), current_user: User = Depends(require_write_access)):
+	"""Spend points from the caller's balance; 400 if the balance is too low."""
+	try:
+		ledger.redeem_points(db, current_user.id, payload.program_name, payload.points, note=payload.note)
+	except ledger.InsufficientPoints as e:
+		db.rollback()
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+	db.commit()
+	return db.get(RewardBalance, (current_user.id, payload.program_name))
+
+
+@router.post("/points/expire")
+def expire_points(max_batches: Optional[int] = Query(None, ge=1), current_user: User = Depends(get_current_admin)):
+	"""Admin-only: run (or resume) the points expiry batch now instead of waiting for the scheduler.
+
+	Runs at most `max_batches` (capped at REWARD_EXPIRY_REQUEST_MAX_BATCHES) chunks; call again
+	while the returned status is "running".
+	"""
+	cap = settings.REWARD_EXPIRY_REQUEST_MAX_BATCHES
+	return run_expiry_once(max_batches=min(max_batches or cap, cap))
+
+
 @router.get("/{reward_id}", response_model=RewardResponse)
-def get_reward(reward_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_reward(reward_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_principal)):
 	r = rewards_service.get_reward_by_id(db, reward_id)
 	if not r:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reward not found")
@@ -64,85 +127,28 @@ def update_reward(reward_id: int, payload: RewardUpdate, db: Session = Depends(g
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reward not found")
 
 	# Only admins can update rewards that don't belong to them
-	if getattr(current_user, "role", "user") != "admin" and r.user_id != current_user.id:
+	is_admin = getattr(current_user, "role", "user") == "admin"
+	if not is_admin and r.user_id != current_user.id:
 		raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-	# Apply other updates (program_name, points_balance)
-	for k, v in payload.dict(exclude_unset=True).items():
-		if k in ("user_id", "user_ids"):
-			continue
-		setattr(r, k, v)
-
-	db.add(r)
-	db.commit()
-	db.refresh(r)
+	# Apply other updates (program_name, points_balance); only admins may change points,
+	# and their changes are booked in the ledger as adjustments
+	r = rewards_service.update_reward(db, r, payload, allow_points=is_admin)
 	return [r]
 
 
 
 @router.put("/group/{group_id}", response_model=List[RewardResponse])
 def update_reward_group(group_id: int, payload: RewardGroupUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)):
-	"""Update a reward group by `group_id` — replace or update assignments while preserving the master id.
+	"""Update a reward group (`reward_groups.id`) — replace its members and apply changes to all.
 
 	Behavior:
-	- Validates provided `user_ids`.
-	- Reuses the master reward (id == group_id) for the first user in the new list.
-	- Reuses existing child rows where possible, creates new ones if needed, deletes extras.
-	- Applies `program_name` and `points_balance` updates to all group members if provided.
+	- Rejects unknown `user_ids` with 422 before changing anything.
+	- Deletes members not in the new list and inserts the missing ones (set operations).
+	- Applies `program_name` and `points_balance` updates to the group and all members if provided.
+	- Returns the group's member rewards.
 	"""
-	validate_user_ids(db, payload.user_ids)
-
-	master = db.query(Reward).filter(Reward.id == group_id).first()
-	if not master:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group master reward not found")
-
-	# determine new values (fall back to master's existing values)
-	new_program = payload.program_name if getattr(payload, "program_name", None) is not None else master.program_name
-	new_points = payload.points_balance if getattr(payload, "points_balance", None) is not None else master.points_balance
-
-	# gather existing group members (exclude master record itself)
-	existing_children = db.query(Reward).filter(Reward.group_id == group_id, Reward.id != group_id).order_by(Reward.id).all()
-
-	new_uids = payload.user_ids
-
-	updated: List[Reward] = []
-
-	# Update master to first new uid
-	master.user_id = new_uids[0]
-	master.program_name = new_program
-	master.points_balance = int(new_points)
-	master.group_id = group_id
-	db.add(master)
-	updated.append(master)
-
-	# Reuse/update children rows where possible
-	for idx, uid in enumerate(new_uids[1:]):
-		if idx < len(existing_children):
-			child = existing_children[idx]
-			child.user_id = uid
-			child.program_name = new_program
-			child.points_balance = int(new_points)
-			child.group_id = group_id
-			db.add(child)
-			updated.append(child)
-		else:
-			# create new child
-			c = Reward(user_id=uid, program_name=new_program, points_balance=int(new_points), group_id=group_id)
-			db.add(c)
-			updated.append(c)
-
-	# If there are extra existing children beyond the new list, delete them
-	if len(existing_children) > max(0, len(new_uids) - 1):
-		for extra in existing_children[len(new_uids) - 1:]:
-			db.delete(extra)
-
-	db.commit()
-
-	# Refresh all updated/created rows
-	for obj in updated:
-		db.refresh(obj)
-
-	return updated
+	return rewards_service.update_reward_group(db, group_id, payload)
 
 
 @router.delete("/{reward_id}")
@@ -38,8 +38,8 @@ class RewardBulkAssign(BaseModel):
 
 
 class RewardUpdate(BaseModel):
-    program_name: Optional[str]
-    points_balance: Optional[int]
+    program_name: Optional[str] = None
+    points_balance: Optional[int] = None
     # Single-reward updates do not allow changing `user_id` here; use group or admin endpoints
     class Config:
         extra = 'forbid'
@@ -47,8 +47,8 @@ class RewardUpdate(BaseModel):
 
 class RewardGroupUpdate(BaseModel):
     user_ids: List[int] = Field(..., min_items=1)
-    program_name: Optional[str]
-    points_balance: Optional[float]
+    program_name: Optional[str] = None
+    points_balance: Optional[float] = None
 
     @validator('user_ids')
     def ensure_ids_non_empty(cls, v):
@@ -67,3 +67,43 @@ class RewardResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PointsEarnRequest(BaseModel):
+    user_id: int
+    program_name: str = Field(..., min_length=1)
+    points: int = Field(..., gt=0)
+    note: Optional[str] = Field(None, max_length=255)
+
+
+class PointsRedeemRequest(BaseModel):
+    program_name: str = Field(..., min_length=1)
+    points: int = Field(..., gt=0)
+    note: Optional[str] = Field(None, max_length=255)
+
+
+class PointsBalanceResponse(BaseModel):
+    user_id: int
+    program_name: str
+    balance: int
+    earned_total: int
+    spent_total: int
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PointsEntryResponse(BaseModel):
+    id: int
+    user_id: int
+    program_name: str
+    reward_id: Optional[int]
+    entry_type: str
+    points: int
+    balance_after: int
+    note: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,14 @@
+from collections import namedtuple
+from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select, text, update
 from sqlalchemy.orm import Session
-from app.models.reward import Reward
-from app.rewards.schemas import RewardCreate, RewardUpdate, RewardBulkAssign
+from app.models.reward import Reward, RewardGroup
+from app.models.user import User
+from app.rewards.schemas import RewardCreate, RewardUpdate, RewardBulkAssign, RewardGroupUpdate
+from app.utils.validation import validate_user_ids
+from app.utils.db import is_postgres
+from app.rewards import ledger
 from datetime import datetime
 
 
@@ -14,6 +22,8 @@ class RewardService:
             points_balance=payload.points_balance,
         )
         db.add(r)
+        db.flush()
+        ledger.record_entries(db, [(user_id, r.program_name, r.id, r.points_balance or 0)], ledger.EARN)
         db.commit()
         db.refresh(r)
 
@@ -63,92 +73,276 @@ class RewardService:
         return db.query(Reward).filter(Reward.id == reward_id).first()
 
     @staticmethod
-    def update_reward(db: Session, reward: Reward, payload: RewardUpdate):
-        for k, v in payload.dict(exclude_unset=True).items():
+    def update_reward(db: Session, reward: Reward, payload: RewardUpdate, allow_points: bool = False):
+        changes = payload.dict(exclude_unset=True)
+        # a points change becomes an ADJUST credit the owner could redeem: admins only
+        if "points_balance" in changes and not allow_points:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can change points_balance")
+        # re-read under a row lock: the ledger delta must start from the committed balance
+        db.refresh(reward, with_for_update=True)
+        before = [_GrantRow(reward.id, reward.user_id, reward.program_name, reward.points_balance)]
+        for k, v in changes.items():
             setattr(reward, k, v)
         db.add(reward)
+        db.flush()
+        after = [_GrantRow(reward.id, reward.user_id, reward.program_name, reward.points_balance)]
+        _record_grant_changes(db, before, after)
         db.commit()
         db.refresh(reward)
         return reward
 
     @staticmethod
     def delete_reward(db: Session, reward: Reward):
+        db.refresh(reward, with_for_update=True)
+        before = [_GrantRow(reward.id, reward.user_id, reward.program_name, reward.points_balance)]
         db.delete(reward)
+        db.flush()
+        _record_grant_changes(db, before, [])
         db.commit()
 
 
+    @staticmethod
     def bulk_assign_rewards(db: Session, bulk_data: RewardBulkAssign):
-        """Safely assign rewards in bulk.
+        """Assign one reward per user id with a single multi-row INSERT.
 
-        Creates one Reward per user id in `bulk_data.user_ids`.
-        Uses a common group_id derived from the first inserted row.
-        Performs per-user try/except so one bad insert won't abort the whole operation.
-        Commits once; if that fails, attempts to commit individually for created rows.
-        Returns a summary dict: {"success": int, "failed": int}
+        A `reward_groups` row is created for the campaign and every member row
+        points at it. The insert joins the requested (de-duplicated) ids against
+        `users`, so unknown ids are detected by the same statement; if any are
+        missing nothing is persisted and a 422 lists them.
+        Returns the created rows as dicts (id, user_id, group_id, ...).
         """
-        success = 0
-        failed = 0
-        created = []
-        created_committed = []
-        group_id = None
-
-        # iterate and attempt to create Reward rows (add to session)
-        for idx, uid in enumerate(bulk_data.user_ids):
-            try:
-                pts = int(bulk_data.points_balance)
-                if group_id is None:
-                    # first row: add, flush to obtain id for group
-                    r = Reward(user_id=uid, program_name=bulk_data.program_name, points_balance=pts)
-                    db.add(r)
-                    db.flush()
-                    group_id = r.id
-                    r.group_id = group_id
-                    db.add(r)
-                else:
-                    r = Reward(user_id=uid, program_name=bulk_data.program_name, points_balance=pts, group_id=group_id)
-                    db.add(r)
-                created.append(r)
-            except Exception as exc:
-                failed += 1
-                print(f"Failed to create reward for user_id={uid}: {exc}")
-                import traceback
-                traceback.print_exc()
-
-        # Try commit once for all inserted rows
+        user_ids = list(dict.fromkeys(int(uid) for uid in bulk_data.user_ids))
+        if not user_ids:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="user_ids must contain at least one id")
+        pts = int(bulk_data.points_balance)
+
+        try:
+            if is_postgres(db):
+                rows = _bulk_insert_rewards_pg(db, user_ids, bulk_data.program_name, pts)
+            else:
+                rows = _bulk_insert_rewards_generic(db, user_ids, bulk_data.program_name, pts)
+
+            created_ids = {r.user_id for r in rows}
+            missing = [uid for uid in user_ids if uid not in created_ids]
+            if missing:
+                db.rollback()
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail={"missing_user_ids": missing})
+            ledger.record_entries(db, [(r.user_id, r.program_name, r.id, r.points_balance or 0) for r in rows], ledger.EARN)
+            db.commit()
+        except HTTPException:
+            raise
+        except Exception:
+            db.rollback()
+            raise
+
+        return [dict(r._mapping) for r in rows]
+
+    @staticmethod
+    def update_reward_group(db: Session, group_id: int, payload: RewardGroupUpdate):
+        """Replace a group's membership and apply program/points changes set-wise.
+
+        Members not in `payload.user_ids` are deleted, new ids are inserted and
+        remaining rows get the new program/points, each as one statement, so
+        the cost does not grow with per-row ORM work. The resulting point
+        changes are written to the ledger in one batch. Returns the member rows.
+        """
+        user_ids = list(dict.fromkeys(int(uid) for uid in payload.user_ids))
+        new_program = getattr(payload, "program_name", None)
+        new_points = getattr(payload, "points_balance", None)
+        new_points = int(new_points) if new_points is not None else None
+
         try:
+            # lock the group, then its members, before reading the ledger's starting point:
+            # concurrent edits of the group or of a member reward wait for this one
+            locked = db.execute(
+                select(RewardGroup.id).where(RewardGroup.id == group_id).with_for_update()
+            ).first()
+            if locked is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reward group not found")
+            before = _group_members(db, group_id, lock=True)
+            if is_postgres(db):
+                rows = _update_reward_group_pg(db, group_id, user_ids, new_program, new_points)
+            else:
+                rows = _update_reward_group_generic(db, group_id, user_ids, new_program, new_points)
+            _record_grant_changes(db, before, rows)
             db.commit()
-            # refresh successful rows and collect them
-            for r in created:
-                try:
-                    db.refresh(r)
-                    created_committed.append(r)
-                except Exception:
-                    failed += 1
-        except Exception as exc:
-            # Commit failed; attempt to persist rows individually
-            print("Bulk commit failed, attempting individual commits:", exc)
+        except HTTPException:
             db.rollback()
-            created_committed = []
-            for r in created:
-                try:
-                    db.add(r)
-                    db.commit()
-                    db.refresh(r)
-                    created_committed.append(r)
-                except Exception as exc2:
-                    db.rollback()
-                    failed += 1
-                    print(f"Individual commit failed for reward (user_id={getattr(r, 'user_id', None)}): {exc2}")
-                    import traceback
-                    traceback.print_exc()
+            raise
+        except Exception:
+            db.rollback()
+            raise
+
+        return [dict(r._mapping) for r in rows]
+
+
+_REWARD_COLUMNS = "id, user_id, program_name, points_balance, group_id, last_updated"
+
+_GrantRow = namedtuple("_GrantRow", ["id", "user_id", "program_name", "points_balance"])
+
+
+def _record_grant_changes(db: Session, before, after):
+    """Write ledger entries turning the `before` reward rows into `after`.
 
-        # success/failed counts (computed from created_committed)
-        success = len(created_committed)
-        failed = max(0, len(created) - success)
+    New rewards earn their points; removed, re-pointed or re-programmed
+    rewards are recorded as adjustments so every balance stays equal to the
+    sum of its ledger entries.
+    """
+    old = {r.id: r for r in before}
+    new = {r.id: r for r in after}
+    adjust, earn = [], []
+    for rid, o in old.items():
+        n = new.get(rid)
+        old_pts = o.points_balance or 0
+        if n is None:
+            # the reward row is gone, so the entry cannot reference it
+            adjust.append((o.user_id, o.program_name, None, -old_pts))
+            continue
+        new_pts = n.points_balance or 0
+        if (n.user_id, n.program_name) == (o.user_id, o.program_name):
+            adjust.append((n.user_id, n.program_name, rid, new_pts - old_pts))
+        else:
+            adjust.append((o.user_id, o.program_name, rid, -old_pts))
+            adjust.append((n.user_id, n.program_name, rid, new_pts))
+    for rid, n in new.items():
+        if rid not in old:
+            earn.append((n.user_id, n.program_name, rid, n.points_balance or 0))
+    ledger.record_entries(db, adjust, ledger.ADJUST)
+    ledger.record_entries(db, earn, ledger.EARN)
 
-        # Return list of created Reward instances so router can return ids/group_ids
-        return created_committed
 
+def _group_members(db: Session, group_id: int, lock: bool = False):
+    q = (
+        select(Reward.id, Reward.user_id, Reward.program_name, Reward.points_balance, Reward.group_id, Reward.last_updated)
+        .where(Reward.group_id == group_id)
+        .order_by(Reward.id)
+    )
+    if lock:
+        q = q.with_for_update()
+    return db.execute(q).all()
+
+
+_BULK_ASSIGN_SQL = text(f"""
+    WITH grp AS (
+        INSERT INTO reward_groups (program_name, points_balance)
+        VALUES (:program_name, :points_balance)
+        RETURNING id
+    ),
+    req AS (
+        SELECT t.user_id, t.ord
+        FROM unnest(CAST(:user_ids AS integer[])) WITH ORDINALITY AS t(user_id, ord)
+    )
+    INSERT INTO rewards (user_id, program_name, points_balance, group_id)
+    SELECT req.user_id, :program_name, :points_balance, grp.id
+    FROM req
+    JOIN users u ON u.id = req.user_id AND u.deleted_at IS NULL
+    CROSS JOIN grp
+    ORDER BY req.ord
+    RETURNING {_REWARD_COLUMNS}
+""")
+
+
+def _bulk_insert_rewards_pg(db: Session, user_ids: List[int], program_name: str, points: int):
+    result = db.execute(_BULK_ASSIGN_SQL, {
+        "user_ids": user_ids,
+        "program_name": program_name,
+        "points_balance": points,
+    })
+    return sorted(result.all(), key=lambda r: r.id)
+
+
+def _bulk_insert_rewards_generic(db: Session, user_ids: List[int], program_name: str, points: int):
+    # Fallback for databases without unnest (e.g. local SQLite): still O(1) statements
+    existing = {r[0] for r in db.query(User.id).filter(User.id.in_(user_ids), User.deleted_at.is_(None)).all()}
+    valid = [uid for uid in user_ids if uid in existing]
+    if not valid:
+        return []
+    group_id = db.execute(
+        insert(RewardGroup).values(program_name=program_name, points_balance=points).returning(RewardGroup.id)
+    ).scalar_one()
+    db.execute(insert(Reward), [
+        {"user_id": uid, "program_name": program_name, "points_balance": points, "group_id": group_id}
+        for uid in valid
+    ])
+    return _group_members(db, group_id)
+
+
+def _raise_missing_users(missing: List[int]):
+    if missing:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail={"missing_user_ids": missing})
+
+
+def _update_reward_group_pg(db: Session, group_id: int, user_ids: List[int], program_name, points):
+    params = {"gid": group_id, "ids": user_ids, "program_name": program_name, "points_balance": points}
+
+    # one primary-key probe per requested id; erased (tombstoned) users count as missing
+    missing = db.execute(text("""
+        SELECT t.user_id FROM unnest(CAST(:ids AS integer[])) AS t(user_id)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM users u WHERE u.id = t.user_id AND u.deleted_at IS NULL
+        )
+    """), params).scalars().all()
+    _raise_missing_users(sorted(missing))
+
+    group = db.execute(text("""
+        UPDATE reward_groups
+        SET program_name = COALESCE(:program_name, program_name),
+            points_balance = COALESCE(:points_balance, points_balance),
+            updated_at = now()
+        WHERE id = :gid
+        RETURNING program_name, points_balance
+    """), params).first()
+    if group is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reward group not found")
+    params["program_name"], params["points_balance"] = group.program_name, group.points_balance
+
+    db.execute(text("""
+        DELETE FROM rewards
+        WHERE group_id = :gid AND user_id <> ALL(CAST(:ids AS integer[]))
+    """), params)
+    db.execute(text("""
+        UPDATE rewards
+        SET program_name = :program_name, points_balance = :points_balance, last_updated = now()
+        WHERE group_id = :gid
+          AND (program_name IS DISTINCT FROM :program_name OR points_balance IS DISTINCT FROM :points_balance)
+    """), params)
+    db.execute(text("""
+        INSERT INTO rewards (user_id, program_name, points_balance, group_id)
+        SELECT n.user_id, :program_name, :points_balance, :gid
+        FROM (
+            SELECT unnest(CAST(:ids AS integer[])) AS user_id
+            EXCEPT
+            SELECT user_id FROM rewards WHERE group_id = :gid
+        ) n
+    """), params)
+    return _group_members(db, group_id)
+
+
+def _update_reward_group_generic(db: Session, group_id: int, user_ids: List[int], program_name, points):
+    validate_user_ids(db, user_ids)
+    group = db.query(RewardGroup).filter(RewardGroup.id == group_id).first()
+    if group is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reward group not found")
+    if program_name is not None:
+        group.program_name = program_name
+    if points is not None:
+        group.points_balance = points
+    db.flush()
+
+    db.execute(delete(Reward).where(Reward.group_id == group_id, Reward.user_id.notin_(user_ids)))
+    db.execute(
+        update(Reward)
+        .where(Reward.group_id == group_id)
+        .values(program_name=group.program_name, points_balance=group.points_balance)
+    )
+    current = {r[0] for r in db.execute(select(Reward.user_id).where(Reward.group_id == group_id)).all()}
+    to_add = [uid for uid in user_ids if uid not in current]
+    if to_add:
+        db.execute(insert(Reward), [
+            {"user_id": uid, "program_name": group.program_name, "points_balance": group.points_balance, "group_id": group_id}
+            for uid in to_add
+        ])
+    return _group_members(db, group_id)
 
 
 def create_reward(db: Session, user_id: int, payload: RewardCreate):
@@ -163,8 +357,8 @@ def get_reward(db: Session, reward_id: int, user_id: int):
 def get_reward_by_id(db: Session, reward_id: int):
     return RewardService.get_reward_by_id(db, reward_id)
 
-def update_reward(db: Session, reward: Reward, payload: RewardUpdate):
-    return RewardService.update_reward(db, reward, payload)
+def update_reward(db: Session, reward: Reward, payload: RewardUpdate, allow_points: bool = False):
+    return RewardService.update_reward(db, reward, payload, allow_points)
 
 def delete_reward(db: Session, reward: Reward):
     return RewardService.delete_reward(db, reward)
@@ -176,3 +370,7 @@ def get_all_rewards(db: Session):
 
 def bulk_assign_rewards(db: Session, bulk_data: RewardBulkAssign):
     return RewardService.bulk_assign_rewards(db, bulk_data)
+
+
+def update_reward_group(db: Session, group_id: int, payload: RewardGroupUpdate):
+    return RewardService.update_reward_group(db, group_id, payload)
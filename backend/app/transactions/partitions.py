@@ -0,0 +1,107 @@
+"""Monthly range partitions of `transactions` (PostgreSQL).
+
+`transactions` is partitioned by RANGE (txn_date): one partition per
+calendar month, named transactions_YYYY_MM, plus transactions_default for
+rows outside every range. `ensure_partitions` creates the partitions from
+the current month through TRANSACTION_PARTITION_MONTHS_AHEAD months ahead
+and runs daily on the scheduler, so new rows land in their month's
+partition and queries bounded by txn_date only read the months they cover.
+
+Creating a partition whose month already has rows in the default
+partition moves those rows into it in the same transaction.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+
+# pg_advisory_xact_lock key: one partition maintainer at a time
+PARTITION_LOCK_ID = 7421054
+DEFAULT_PARTITION = "transactions_default"
+
+
+def month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"transactions_{month.year:04d}_{month.month:02d}"
+
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = 'transactions'"
+        )
+    ).first() is not None
+
+
+def _exists(db: Session, name: str) -> bool:
+    return db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+
+
+def create_partition(db: Session, month: date) -> bool:
+    """Create `month`'s partition if missing (the caller commits); True if created."""
+    name = partition_name(month)
+    if _exists(db, name):
+        return False
+    lo, hi = month, add_months(month, 1)
+    bounds = f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+    stray = _exists(db, DEFAULT_PARTITION) and db.execute(
+        text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE txn_date >= :lo AND txn_date < :hi LIMIT 1"),
+        {"lo": lo, "hi": hi},
+    ).first() is not None
+    if not stray:
+        db.execute(text(f"CREATE TABLE {name} PARTITION OF transactions {bounds}"))
+        return True
+    # the month's rows sit in the default partition: move them, then attach
+    db.execute(text(f"CREATE TABLE {name} (LIKE transactions INCLUDING DEFAULTS)"))
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE txn_date >= :lo AND txn_date < :hi RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"lo": lo, "hi": hi},
+    )
+    db.execute(text(f"ALTER TABLE transactions ATTACH PARTITION {name} {bounds}"))
+    return True
+
+
+def ensure_partitions(months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """Create the missing partitions from this month through `months_ahead` months ahead.
+
+    Returns the names created; a no-op unless `transactions` is partitioned.
+    """
+    months_ahead = settings.TRANSACTION_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    first = month_start(today or datetime.utcnow().date())
+    db = SessionLocal()
+    try:
+        if not is_partitioned(db):
+            return []
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_ID})
+        # attaching locks the parent briefly; give up rather than queue behind long queries
+        db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        created = [
+            partition_name(month)
+            for month in (add_months(first, n) for n in range(months_ahead + 1))
+            if create_partition(db, month)
+        ]
+        db.commit()
+        return created
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
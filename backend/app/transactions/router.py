@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.dependencies import get_current_user, require_write_access
+from typing import List, Optional
+from datetime import datetime
+from app.database import get_db, get_read_db
+from app.dependencies import get_current_user, require_write_access, get_current_principal
 from app.models.user import User
 from app.models.account import Account
 from app.transactions.schemas import TransactionCreate, TransactionResponse
@@ -16,11 +17,13 @@ router = APIRouter()
 async def get_user_transactions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    since: Optional[datetime] = Query(None, description="Only transactions with txn_date >= since (default: all history)"),
+    until: Optional[datetime] = Query(None, description="Only transactions with txn_date < until"),
+    current_user: User = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
 ):
     """Return transactions across all accounts belonging to the current user."""
-    transactions = TransactionService.get_user_transactions(db, current_user.id, skip, limit)
+    transactions = TransactionService.get_user_transactions(db, current_user.id, skip, limit, since, until)
     return transactions
 
 @router.post("/{account_id}", response_model=TransactionResponse)
@@ -31,7 +34,7 @@ async def create_transaction(
     db: Session = Depends(get_db)
 ):
     # Load account (admins may act on any account)
-    account = db.query(Account).filter(Account.id == account_id).first()
+    account = db.query(Account).filter(Account.id == account_id, Account.deleted_at.is_(None)).first()
 
     if not account:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
@@ -48,12 +51,14 @@ async def get_transactions(
     account_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    since: Optional[datetime] = Query(None, description="Only transactions with txn_date >= since (default: all history)"),
+    until: Optional[datetime] = Query(None, description="Only transactions with txn_date < until"),
+    current_user: User = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
 ):
     # Verify account belongs to user
     # Load account (admins may access any account)
-    account = db.query(Account).filter(Account.id == account_id).first()
+    account = db.query(Account).filter(Account.id == account_id, Account.deleted_at.is_(None)).first()
 
     if not account:
         raise HTTPException(
@@ -65,19 +70,19 @@ async def get_transactions(
     if getattr(current_user, "role", None) != "admin" and account.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
-    transactions = TransactionService.get_account_transactions(db, account_id, skip, limit)
+    transactions = TransactionService.get_account_transactions(db, account_id, skip, limit, since, until)
     return transactions
 
 @router.get("/{account_id}/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     account_id: int,
     transaction_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     # Verify account belongs to user
     # Load account (admins may access any account)
-    account = db.query(Account).filter(Account.id == account_id).first()
+    account = db.query(Account).filter(Account.id == account_id, Account.deleted_at.is_(None)).first()
 
     if not account:
         raise HTTPException(
@@ -107,7 +112,7 @@ async def import_csv(
     db: Session = Depends(get_db)
 ):
     # Verify account belongs to user
-    account = db.query(Account).filter(Account.id == account_id).first()
+    account = db.query(Account).filter(Account.id == account_id, Account.deleted_at.is_(None)).first()
 
     if not account:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
@@ -1,14 +1,29 @@
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.models.transaction import Transaction
 from app.transactions.schemas import TransactionCreate
-from datetime import datetime
+from datetime import datetime, timedelta
 import csv
 from io import StringIO
 from decimal import Decimal
 
 
 from app.models.account import Account
-from app.budgets.service import update_budget_spent
+from app.budgets.service import apply_import_spend, update_budget_spent
+from app.notifications.events import publish_event
+from app.alerts.service import TxnFacts, evaluate_transaction, evaluate_import
+
+def _txn_date_range(query, since: datetime = None, until: datetime = None):
+    # txn_date in [since, until): on PostgreSQL only the partitions of those months are read.
+    # Without `since` the last TRANSACTION_LIST_DEFAULT_DAYS are listed (0 = no window).
+    if since is None and settings.TRANSACTION_LIST_DEFAULT_DAYS > 0:
+        since = datetime.utcnow() - timedelta(days=settings.TRANSACTION_LIST_DEFAULT_DAYS)
+    if since is not None:
+        query = query.filter(Transaction.txn_date >= since)
+    if until is not None:
+        query = query.filter(Transaction.txn_date < until)
+    return query
+
 
 class TransactionService:
     @staticmethod
@@ -44,15 +59,17 @@ class TransactionService:
                 print(f"[TXN] Account {acct.id} balance after: {acct.balance}")
 
                 db.add(acct)
+                publish_event(db, acct.user_id, "balance", {"account_id": acct.id, "balance": str(acct.balance)})
 
             db.add(new_transaction)
             db.commit()
             db.refresh(new_transaction)
 
             # If we have the account and it belongs to a user, update matching budget's spent amount
+            budget_change = None
             try:
                 if acct and getattr(acct, 'user_id', None) is not None:
-                    update_budget_spent(db, new_transaction, acct.user_id)
+                    budget_change = update_budget_spent(db, new_transaction, acct.user_id)
             except Exception:
                 # Do not fail transaction creation if budget update errors; fail silently
                 pass
@@ -64,26 +81,41 @@ class TransactionService:
                 except Exception:
                     pass
 
+            # Evaluate the owner's alert rules against this write only (no history scan)
+            try:
+                if acct and getattr(acct, 'user_id', None) is not None:
+                    facts = TxnFacts(new_transaction.id, account_id, new_transaction.amount, new_transaction.txn_type,
+                                     new_transaction.merchant, new_transaction.category)
+                    evaluate_transaction(db, acct.user_id, facts, acct.balance, budget_change)
+            except Exception as e:
+                db.rollback()
+                print(f"[TXN] Alert evaluation failed for transaction {new_transaction.id}: {e}")
+
             return new_transaction
         except Exception:
             db.rollback()
             raise
     
     @staticmethod
-    def get_account_transactions(db: Session, account_id: int, skip: int = 0, limit: int = 100):
-        return db.query(Transaction).filter(
-            Transaction.account_id == account_id
-        ).order_by(Transaction.created_at.desc()).offset(skip).limit(limit).all()
+    def get_account_transactions(db: Session, account_id: int, skip: int = 0, limit: int = 100,
+                                 since: datetime = None, until: datetime = None):
+        query = db.query(Transaction).filter(Transaction.account_id == account_id)
+        query = _txn_date_range(query, since, until)
+        return query.order_by(Transaction.created_at.desc()).offset(skip).limit(limit).all()
 
     @staticmethod
-    def get_user_transactions(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    def get_user_transactions(db: Session, user_id: int, skip: int = 0, limit: int = 100,
+                              since: datetime = None, until: datetime = None):
         """Return transactions for all accounts belonging to given user_id."""
         # join with Account via relationship or account_id -> accounts table
         from app.models.account import Account
 
-        return db.query(Transaction).join(Account, Transaction.account_id == Account.id).filter(
-            Account.user_id == user_id
-        ).order_by(Transaction.created_at.desc()).offset(skip).limit(limit).all()
+        query = db.query(Transaction).join(Account, Transaction.account_id == Account.id).filter(
+            Account.user_id == user_id,
+            Account.deleted_at.is_(None)
+        )
+        query = _txn_date_range(query, since, until)
+        return query.order_by(Transaction.created_at.desc()).offset(skip).limit(limit).all()
     
     @staticmethod
     def get_transaction_by_id(db: Session, transaction_id: int, account_id: int):
@@ -121,6 +153,7 @@ class TransactionService:
 
         # use starting balance if present
         curr_balance = Decimal(str(acct.balance)) if (acct and acct.balance is not None) else Decimal("0")
+        start_balance = curr_balance
 
         # Iterate rows with a row counter (data rows start after header)
         for idx, row in enumerate(reader, start=2):
@@ -197,10 +230,32 @@ class TransactionService:
                 if acct:
                     acct.balance = curr_balance
                     db.add(acct)
+                    publish_event(db, acct.user_id, "balance", {"account_id": acct.id, "balance": str(acct.balance)})
 
                 db.add_all(valid_transactions)
+                db.flush()
+                # capture what the alert engine needs before commit expires the rows
+                imported = [
+                    TxnFacts(t.id, account_id, t.amount, t.txn_type, t.merchant, t.category)
+                    for t in valid_transactions
+                ]
+                # and what the budgets need
+                spend = [(t.txn_type, t.txn_date, t.category, t.amount) for t in valid_transactions]
                 db.commit()
                 inserted = len(valid_transactions)
+
+                budget_changes = []
+                if acct and getattr(acct, 'user_id', None) is not None:
+                    try:
+                        budget_changes = apply_import_spend(db, spend, acct.user_id)
+                    except Exception as e:
+                        db.rollback()
+                        print(f"[CSV] Budget update failed for import into account {account_id}: {e}")
+                    try:
+                        evaluate_import(db, acct.user_id, account_id, imported, start_balance, budget_changes)
+                    except Exception as e:
+                        db.rollback()
+                        print(f"[CSV] Alert evaluation failed for import into account {account_id}: {e}")
             else:
                 inserted = 0
 
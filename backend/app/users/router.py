@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 import re
 from sqlalchemy.orm import Session
 from typing import List, Dict
@@ -9,6 +11,9 @@ from app.auth.schemas import UserResponse
 from app.users.schemas import UpdateProfile, UserSettings, ChangePasswordRequest
 from pydantic import ValidationError
 from app.users.service import UserService
+from app.models.purge import PurgeJob
+from app.utils import purge
+from app.utils.password_hash import PasswordHasherBusy
 from fastapi import Body
 
 router = APIRouter()
@@ -25,7 +30,7 @@ async def get_profile(db: Session = Depends(get_db), current_user=Depends(get_cu
 async def list_users(db: Session = Depends(get_db), current_user: User = Depends(require_admin)):
     # Admin endpoint to list all users
     # Return only non-sensitive user fields plus a limited `accounts` list per user.
-    users = db.query(type(current_user)).all()
+    users = db.query(User).filter(User.deleted_at.is_(None)).all()
 
     # Attach limited account summaries to each user object
     for u in users:
@@ -65,7 +70,7 @@ async def update_profile(profile_data: UpdateProfile = Body({}), db: Session = D
 
 @router.get("/settings", response_model=UserSettings)
 async def get_settings(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    settings = UserService.get_settings(current_user.id)
+    settings = UserService.get_settings(db, current_user.id)
     # return defaults merged with stored; validate persisted settings and
     # fall back to defaults if persisted data is malformed.
     defaults = UserSettings().dict()
@@ -79,14 +84,17 @@ async def get_settings(db: Session = Depends(get_db), current_user=Depends(get_c
 
 
 @router.put("/settings", response_model=UserSettings)
-async def update_settings(settings: UserSettings, current_user=Depends(get_current_user)):
-    saved = UserService.update_settings(current_user.id, settings.dict())
+async def update_settings(settings: UserSettings, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    saved = UserService.update_settings(db, current_user.id, settings.dict())
     return saved
 
 
 @router.post("/change-password")
 async def change_password(req: ChangePasswordRequest, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    error = UserService.change_password(db, current_user, req.current_password, req.new_password)
+    try:
+        error = await UserService.change_password_async(db, current_user, req.current_password, req.new_password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many requests in progress, please retry shortly", headers={"Retry-After": "1"})
     if error:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
     return {"message": "Password changed successfully"}
@@ -104,46 +112,25 @@ async def verify_kyc(db: Session = Depends(get_db), current_user: User = Depends
 async def delete_profile(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     """Delete the current user's account.
 
-    This removes the user record from the database and any per-user settings stored on disk.
+    The account disappears immediately; the user's data is erased by a
+    background job whose progress admins can follow at /deletions/{job_id}.
     Caller must be authenticated as the target user.
     """
     user_id = current_user.id
+    job = UserService.delete_account(db, current_user, user_id)
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder({
+        "message": f"User {user_id} scheduled for deletion",
+        "job": job
+    }))
 
-    # Cascade delete in safe order to avoid foreign key violations
-    from app.models.reward import Reward
-    from app.models.bill import Bill
-    from app.models.transaction import Transaction
-    from app.models.account import Account
-    import os
-
-    # 1) Delete rewards
-    db.query(Reward).filter(Reward.user_id == user_id).delete(synchronize_session=False)
-
-    # 2) Delete bills
-    db.query(Bill).filter(Bill.user_id == user_id).delete(synchronize_session=False)
-
-    # 3) Delete transactions for any accounts owned by the user
-    db.query(Transaction).filter(Transaction.account_id.in_(
-        db.query(Account.id).filter(Account.user_id == user_id)
-    )).delete(synchronize_session=False)
-
-    # 4) Delete accounts
-    db.query(Account).filter(Account.user_id == user_id).delete(synchronize_session=False)
 
-    # 5) Remove per-user settings file if present
-    settings_path = f"backend/user_settings_{user_id}.json"
-    if os.path.exists(settings_path):
-        try:
-            os.remove(settings_path)
-        except Exception:
-            pass
-
-    # 6) Delete user record
-    from app.models.user import User
-    db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
-
-    db.commit()
-    return {"message": f"User {user_id} and all data deleted"}
+@router.get("/deletions/{job_id}")
+async def get_deletion_progress(job_id: int, db: Session = Depends(get_db), current_user: User = Depends(require_admin)):
+    """Admin-only: progress of a background user erasure."""
+    job = db.query(PurgeJob).filter(PurgeJob.id == job_id, PurgeJob.kind == "user").first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion not found")
+    return purge.progress(job)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -154,7 +141,7 @@ async def get_user_by_id(user_id: int, db: Session = Depends(get_db), current_us
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
     # Fetch target user
-    target = db.query(User).filter(User.id == user_id).first()
+    target = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
     if not target:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -168,16 +155,13 @@ async def get_user_by_id(user_id: int, db: Session = Depends(get_db), current_us
 async def delete_user_by_id(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(require_admin)):
     """Admin-only: delete any user and cascade their data."""
     # Admin access enforced by dependency `require_admin`
-    target = db.query(type(current_user)).filter(type(current_user).id == user_id).first()
+    target = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
     if not target:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    # Reuse UserService.delete_account which takes a User object and performs cascade cleanup
-    from app.users.service import UserService as _UserService
-    try:
-        _UserService.delete_account(db, target)
-    except Exception:
-        db.rollback()
-        raise
-
-    return {"message": f"User {user_id} and all data deleted"}
+    # Reuse UserService.delete_account: tombstone now, data erased in the background
+    job = UserService.delete_account(db, target, current_user.id)
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder({
+        "message": f"User {user_id} scheduled for deletion",
+        "job": job
+    }))
@@ -1,31 +1,50 @@
-import json
 import threading
+import time
 import os
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+from datetime import datetime
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
-from app.models.user import User
+from app.config import settings as app_settings
+from app.models.user import User, UserSetting, RefreshToken
 from app.models.user import KycStatusEnum
-from app.utils.password_hash import hash_password, verify_password
+from app.utils.db import dialect_insert
+from app.auth.revocation import revoke_user_tokens
+from app.utils import purge
+from app.utils.password_hash import hash_password, verify_password, hash_password_async, verify_password_async
 
-_settings_lock = threading.Lock()
-_settings_file = "./user_settings.json"
+# user_id -> (loaded_at, settings); least recently used entries are evicted first
+_settings_cache: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_settings_cache_lock = threading.Lock()
 
 
-def _load_all_settings() -> Dict[str, Any]:
-    try:
-        with _settings_lock:
-            with open(_settings_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except Exception:
-        return {}
+def _cache_get(user_id: int) -> Optional[Dict[str, Any]]:
+    with _settings_cache_lock:
+        hit = _settings_cache.get(user_id)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] >= app_settings.USER_SETTINGS_CACHE_SECONDS:
+            del _settings_cache[user_id]
+            return None
+        _settings_cache.move_to_end(user_id)
+        return dict(hit[1])
 
 
-def _save_all_settings(all_settings: Dict[str, Any]):
-    with _settings_lock:
-        with open(_settings_file, "w", encoding="utf-8") as f:
-            json.dump(all_settings, f, indent=2)
+def _cache_put(user_id: int, value: Dict[str, Any]) -> None:
+    with _settings_cache_lock:
+        _settings_cache[user_id] = (time.monotonic(), dict(value))
+        _settings_cache.move_to_end(user_id)
+        while len(_settings_cache) > app_settings.USER_SETTINGS_CACHE_SIZE:
+            _settings_cache.popitem(last=False)
+
+
+def invalidate_settings_cache(user_id: Optional[int] = None) -> None:
+    with _settings_cache_lock:
+        if user_id is None:
+            _settings_cache.clear()
+        else:
+            _settings_cache.pop(user_id, None)
 
 
 class UserService:
@@ -34,7 +53,7 @@ class UserService:
         # Attach a list of account summaries to the user object for the profile
         from app.models.account import Account
 
-        accounts = db.query(Account).filter(Account.user_id == user.id).all()
+        accounts = db.query(Account).filter(Account.user_id == user.id, Account.deleted_at.is_(None)).all()
         # convert to simple dicts for JSON/Pydantic
         acct_list = [
             {
@@ -60,8 +79,11 @@ class UserService:
         Only include: id, bank_name, account_type, balance, currency.
         """
         from app.models.account import Account
+        from app.accounts.service import owner_not_erased
 
-        accounts = db.query(Account).filter(Account.user_id == user_id).all()
+        accounts = db.query(Account).filter(
+            Account.user_id == user_id, Account.deleted_at.is_(None), owner_not_erased()
+        ).all()
         return [
             {
                 "id": a.id,
@@ -88,16 +110,42 @@ class UserService:
         return user
 
     @staticmethod
-    def get_settings(user_id: int) -> Dict[str, Any]:
-        all_settings = _load_all_settings()
-        return all_settings.get(str(user_id), {})
+    def get_settings(db: Session, user_id: int) -> Dict[str, Any]:
+        """Stored settings for `user_id` ({} if none): a cache hit or one primary-key read."""
+        cached = _cache_get(user_id)
+        if cached is not None:
+            return cached
+        stored = db.query(UserSetting.settings).filter(UserSetting.user_id == user_id).scalar()
+        value = dict(stored or {})
+        _cache_put(user_id, value)
+        return dict(value)
+
+    @staticmethod
+    def update_settings(db: Session, user_id: int, settings: Dict[str, Any]):
+        """Replace the user's settings with a single atomic upsert."""
+        insert = dialect_insert(db)
+        if insert is not None:
+            stmt = insert(UserSetting).values(user_id=user_id, settings=settings)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserSetting.user_id],
+                set_={"settings": stmt.excluded.settings, "updated_at": func.now()},
+            )
+            db.execute(stmt)
+        else:
+            row = db.get(UserSetting, user_id, with_for_update=True)
+            if row is None:
+                db.add(UserSetting(user_id=user_id, settings=settings))
+            else:
+                row.settings = settings
+        db.commit()
+        invalidate_settings_cache(user_id)
+        return dict(settings)
 
     @staticmethod
-    def update_settings(user_id: int, settings: Dict[str, Any]):
-        all_settings = _load_all_settings()
-        all_settings[str(user_id)] = settings
-        _save_all_settings(all_settings)
-        return all_settings[str(user_id)]
+    def delete_settings(db: Session, user_id: int):
+        """Remove the user's settings row; caller commits."""
+        db.execute(delete(UserSetting).where(UserSetting.user_id == user_id))
+        invalidate_settings_cache(user_id)
 
     @staticmethod
     def change_password(db: Session, user: User, current_password: str, new_password: str) -> Optional[str]:
@@ -109,6 +157,17 @@ class UserService:
         db.commit()
         return None
 
+    @staticmethod
+    async def change_password_async(db: Session, user: User, current_password: str, new_password: str) -> Optional[str]:
+        """`change_password` with both Argon2 operations on the hashing pool."""
+        if not await verify_password_async(current_password, user.password):
+            return "Current password is incorrect"
+
+        user.password = await hash_password_async(new_password)
+        db.add(user)
+        db.commit()
+        return None
+
     @staticmethod
     def verify_kyc(db: Session, user: User):
         # Set the user's KYC status to verified and persist
@@ -119,46 +178,70 @@ class UserService:
         return user
 
     @staticmethod
-    def delete_account(db: Session, user: User):
-        """Delete the given user and remove their stored settings."""
+    def delete_account(db: Session, user: User, requested_by: int = None) -> dict:
+        """Start erasing `user` and return the background job's progress.
+
+        Only the tombstone is written here, in one short transaction: the
+        user is marked deleted, their email is released and every token they
+        hold is revoked, so they disappear at once. Their data is removed by
+        the purge job in batches (see `purge_step`).
+        """
         try:
-            # 1) Delete rewards
-            from app.models.reward import Reward
-            from app.models.bill import Bill
-            from app.models.transaction import Transaction
-            from app.models.account import Account
-
-            db.query(Reward).filter(Reward.user_id == user.id).delete(synchronize_session=False)
-
-            # 2) Delete bills
-            db.query(Bill).filter(Bill.user_id == user.id).delete(synchronize_session=False)
-
-            # 3) Delete transactions for user's accounts
-            db.query(Transaction).filter(Transaction.account_id.in_(
-                db.query(Account.id).filter(Account.user_id == user.id)
-            )).delete(synchronize_session=False)
-
-            # 4) Delete accounts
-            db.query(Account).filter(Account.user_id == user.id).delete(synchronize_session=False)
-
-            # 5) Remove user-specific settings entry from aggregated settings
-            all_settings = _load_all_settings()
-            if str(user.id) in all_settings:
-                del all_settings[str(user.id)]
-                _save_all_settings(all_settings)
-
-            # 5b) Also remove any per-user settings file if present
-            settings_path = f"./user_settings_{user.id}.json"
-            if os.path.exists(settings_path):
-                try:
-                    os.remove(settings_path)
-                except Exception:
-                    pass
-
-            # 6) Delete the user record
-            db.delete(user)
+            user.deleted_at = datetime.utcnow()
+            user.email = f"deleted-{user.id}@deleted.invalid"
+            revoke_user_tokens(db, user.id, deleted=True)
+            job = purge.enqueue(db, "user", user.id, requested_by)
             db.commit()
-            return True
         except Exception:
             db.rollback()
             raise
+        invalidate_settings_cache(user.id)
+        purge.start_purge(job.id)
+        return purge.progress(job)
+
+    @staticmethod
+    def purge_step(db: Session, user_id: int, batch_size: int):
+        """One batch of a user erasure: at most `batch_size` dependent rows, dependents first.
+
+        Once nothing is left the user row itself is deleted (with the small
+        per-user rows that would otherwise only go by ON DELETE CASCADE).
+        """
+        from app.models.reward import Reward, RewardBalance, RewardPointsEntry
+        from app.models.bill import Bill
+        from app.models.budget import Budget
+        from app.models.transaction import Transaction
+        from app.models.account import Account
+        from app.models.alert import Alert, AlertRule, KnownMerchant
+        from app.notifications.models import Notification
+
+        accounts = select(Account.id).where(Account.user_id == user_id)
+        stages = (
+            (Alert, Alert.user_id == user_id),
+            (Notification, Notification.user_id == user_id),
+            (RewardPointsEntry, RewardPointsEntry.user_id == user_id),
+            (Transaction, Transaction.account_id.in_(accounts)),
+            (Bill, Bill.user_id == user_id),
+            (Reward, Reward.user_id == user_id),
+            (Budget, Budget.user_id == user_id),
+            (AlertRule, AlertRule.user_id == user_id),
+            (RefreshToken, RefreshToken.user_id == user_id),
+            (Account, Account.user_id == user_id),
+        )
+        deleted = 0
+        for model, condition in stages:
+            deleted += purge.delete_batch(db, model, condition, batch_size - deleted)
+            if deleted >= batch_size:
+                return deleted, False
+
+        for model in (RewardBalance, KnownMerchant, UserSetting):
+            deleted += db.execute(delete(model).where(model.user_id == user_id)).rowcount or 0
+        deleted += db.execute(delete(User).where(User.id == user_id)).rowcount or 0
+
+        # legacy per-user settings file, if one was ever written
+        settings_path = f"./user_settings_{user_id}.json"
+        if os.path.exists(settings_path):
+            try:
+                os.remove(settings_path)
+            except Exception:
+                pass
+        return deleted, True
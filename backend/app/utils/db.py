@@ -0,0 +1,21 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def dialect_insert(db: Session):
+    """Return the dialect's `insert` construct supporting ON CONFLICT, or None.
+
+    PostgreSQL (production) and SQLite (local development) both provide
+    `on_conflict_do_nothing` / `on_conflict_do_update`.
+    """
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        return pg_insert
+    if name == "sqlite":
+        return sqlite_insert
+    return None
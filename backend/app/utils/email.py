@@ -1,9 +1,160 @@
-def send_email(to_email: str, subject: str, body: str) -> None:
+import os
+import smtplib
+import threading
+import uuid
+from email.message import EmailMessage
+from typing import List, Optional
+
+from app.config import settings
+
+
+def build_message(to_email: str, subject: str, body: str, from_email: Optional[str] = None) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = from_email or settings.EMAIL_FROM
+    msg["To"] = to_email
+    msg["Subject"] = subject
+    msg.set_content(body)
+    return msg
+
+
+class EmailTransport:
+    """Base class for pluggable email transports.
+
+    A single transport instance may be shared by several worker threads;
+    subclasses are responsible for their own thread-safety. `reset()` is
+    called by the delivery pipeline after a failed send so a transport can
+    drop a broken connection before the next attempt.
     """
-    Local email sender stub — prints the message to console.
 
-    Later this can be replaced with an SMTP implementation.
+    def send(self, message: EmailMessage) -> None:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConsoleTransport(EmailTransport):
+    """Prints messages to the console (local development default)."""
+
+    def send(self, message: EmailMessage) -> None:
+        print("📧 TO:", message["To"])
+        print("📧 SUBJECT:", message["Subject"])
+        print("📧 BODY:\n", message.get_content())
+
+
+class InMemoryTransport(EmailTransport):
+    """Collects messages in `outbox`; intended for tests."""
+
+    def __init__(self):
+        self.outbox: List[EmailMessage] = []
+        self._lock = threading.Lock()
+
+    def send(self, message: EmailMessage) -> None:
+        with self._lock:
+            self.outbox.append(message)
+
+
+class FileTransport(EmailTransport):
+    """Writes each message as an `.eml` file into `directory`."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or settings.EMAIL_FILE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+
+    def send(self, message: EmailMessage) -> None:
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}.eml")
+        with open(path, "wb") as f:
+            f.write(bytes(message))
+
+
+class SMTPTransport(EmailTransport):
+    """SMTP transport that keeps one open connection per worker thread.
+
+    Connections are opened lazily on first send and reused for every
+    following message sent from the same thread until `reset()`/`close()`.
     """
-    print("📧 TO:", to_email)
-    print("📧 SUBJECT:", subject)
-    print("📧 BODY:\n", body)
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, username: Optional[str] = None,
+                 password: Optional[str] = None, use_tls: Optional[bool] = None, timeout: Optional[int] = None):
+        self.host = host or settings.SMTP_HOST
+        self.port = port or settings.SMTP_PORT
+        self.username = username if username is not None else settings.SMTP_USER
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+        self.use_tls = settings.SMTP_USE_TLS if use_tls is None else use_tls
+        self.timeout = timeout or settings.SMTP_TIMEOUT_SECONDS
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[smtplib.SMTP] = []
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            conn.starttls()
+        if self.username:
+            conn.login(self.username, self.password)
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _connection(self) -> smtplib.SMTP:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def send(self, message: EmailMessage) -> None:
+        self._connection().send_message(message)
+
+    def _quit(self, conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except Exception:
+            pass
+
+    def reset(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            self._quit(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._connections = self._connections, []
+        for conn in conns:
+            self._quit(conn)
+        self._local = threading.local()
+
+
+def get_transport(name: Optional[str] = None) -> EmailTransport:
+    """Build the transport configured by `EMAIL_TRANSPORT` (or `name`)."""
+    name = (name or settings.EMAIL_TRANSPORT or "console").lower()
+    if name == "smtp":
+        return SMTPTransport()
+    if name == "file":
+        return FileTransport()
+    if name == "memory":
+        return InMemoryTransport()
+    return ConsoleTransport()
+
+
+def send_email(to_email: str, subject: str, body: str, transport: Optional[EmailTransport] = None) -> None:
+    """Send a single email through `transport` (defaults to the configured one)."""
+    message = build_message(to_email, subject, body)
+    if transport is not None:
+        transport.send(message)
+        return
+    with get_transport() as t:
+        t.send(message)
@@ -0,0 +1,155 @@
+"""Server-side FX rates.
+
+Rates live in the `fx_rates` table as units per 1 USD, layered over the
+bundled rates file (so no network access is ever needed), and are read
+into a per-process cache that is reloaded every FX_RATES_CACHE_SECONDS
+(or at once after `set_rates` in this process). Converting X units of A into B is X / per_usd[A] * per_usd[B].
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.fx_rate import FxRate
+from app.utils.db import dialect_insert
+
+DEFAULT_RATES_FILE = Path(__file__).resolve().parents[1] / "data" / "fx_rates.json"
+CENT = Decimal("0.01")
+
+
+class UnknownCurrency(ValueError):
+    pass
+
+
+def normalize_currency(code: Optional[str]) -> str:
+    # accounts created before currency was validated may hold NULL or lowercase codes
+    return (code or "USD").strip().upper()
+
+
+def load_rates_file(path: Optional[str] = None) -> Tuple[Dict[str, Decimal], Optional[datetime]]:
+    path = Path(path or settings.FX_RATES_FILE or DEFAULT_RATES_FILE)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    base = normalize_currency(data.get("base"))
+    rates = {normalize_currency(k): Decimal(str(v)) for k, v in (data.get("rates") or {}).items()}
+    if base != "USD":
+        # re-express a file quoted against another base in units per USD
+        usd = rates["USD"]
+        rates = {k: v / usd for k, v in rates.items()}
+    as_of = data.get("as_of")
+    return rates, (datetime.fromisoformat(as_of) if as_of else None)
+
+
+class FxRateStore:
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._rates: Dict[str, Decimal] = {}
+        self._as_of: Optional[datetime] = None
+        self._loaded_at: Optional[float] = None
+
+    def _fresh(self) -> bool:
+        ttl = self._ttl if self._ttl is not None else settings.FX_RATES_CACHE_SECONDS
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl
+
+    def _load(self, db: Session):
+        try:
+            rates, as_of = load_rates_file()
+        except Exception as e:
+            print("Warning: could not read the FX rates file:", e)
+            rates, as_of = {}, None
+        try:
+            rows = db.execute(select(FxRate.currency, FxRate.per_usd, FxRate.as_of)).all()
+        except Exception as e:
+            db.rollback()
+            print("Warning: could not read fx_rates, using the rates file:", e)
+            rows = []
+        # table rows override the bundled file
+        for r in rows:
+            rates[normalize_currency(r.currency)] = Decimal(r.per_usd)
+        as_of = max((d for d in [as_of] + [r.as_of for r in rows] if d), default=None)
+        rates.setdefault("USD", Decimal(1))
+        return rates, as_of
+
+    def rates(self, db: Session) -> Tuple[Dict[str, Decimal], Optional[datetime]]:
+        """Current {currency: units per USD} and their as-of date."""
+        with self._lock:
+            if self._fresh():
+                return self._rates, self._as_of
+        rates, as_of = self._load(db)
+        with self._lock:
+            self._rates, self._as_of, self._loaded_at = rates, as_of, time.monotonic()
+        return rates, as_of
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def rate(self, db: Session, from_currency: str, to_currency: str) -> Decimal:
+        """Units of `to_currency` per 1 unit of `from_currency`."""
+        rates, _ = self.rates(db)
+        src, dst = normalize_currency(from_currency), normalize_currency(to_currency)
+        for code in (src, dst):
+            if code not in rates or not rates[code]:
+                raise UnknownCurrency(f"No FX rate for {code}")
+        return rates[dst] / rates[src]
+
+
+fx_rates = FxRateStore()
+
+
+def convert_totals(db: Session, totals: Dict[str, Decimal], base: str):
+    """Convert per-currency totals into `base`.
+
+    Returns (rows, missing): one row per currency with its rate and the
+    converted amount, and the currencies that have no rate (left out of any
+    sum the caller makes).
+    """
+    rates, _ = fx_rates.rates(db)
+    base = normalize_currency(base)
+    if base not in rates:
+        raise UnknownCurrency(f"No FX rate for {base}")
+    rows, missing = [], []
+    for currency, amount in sorted(totals.items()):
+        if not rates.get(currency):
+            missing.append(currency)
+            continue
+        rate = rates[base] / rates[currency]
+        rows.append({
+            "currency": currency,
+            "balance": Decimal(amount),
+            "rate": rate.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP),
+            "converted": (Decimal(amount) * rate).quantize(CENT, rounding=ROUND_HALF_UP),
+        })
+    return rows, missing
+
+
+def set_rates(db: Session, rates: Dict[str, Decimal], as_of: Optional[datetime] = None) -> int:
+    """Upsert rates (units per USD), commit, and drop this process's cache."""
+    as_of = as_of or datetime.utcnow()
+    rows = [
+        {"currency": normalize_currency(c), "per_usd": Decimal(str(v)), "as_of": as_of}
+        for c, v in rates.items()
+    ]
+    if not rows:
+        return 0
+    insert = dialect_insert(db)
+    if insert is not None:
+        stmt = insert(FxRate).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[FxRate.currency],
+            set_={"per_usd": stmt.excluded.per_usd, "as_of": stmt.excluded.as_of, "updated_at": func.now()},
+        ))
+    else:
+        for row in rows:
+            db.merge(FxRate(**row))
+    db.commit()
+    fx_rates.invalidate()
+    return len(rows)
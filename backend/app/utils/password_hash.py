@@ -1,9 +1,88 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from app.config import settings
+
+# Argon2 cost is configurable per deployment; existing hashes keep verifying
+# with the parameters embedded in them.
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when every hashing slot is taken; callers should answer 429."""
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with other parameters than the configured ones (cheap, no hashing)."""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except Exception:
+        return False
+
+
+# argon2-cffi releases the GIL while hashing, so a thread pool runs hashes
+# truly in parallel without blocking the event loop.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def _pool_size() -> int:
+    return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = _pool_size()
+                # running + queued hashes; anything beyond is rejected rather than queued
+                _slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING or workers * 4)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+    return _executor, _slots
+
+
+async def _run_in_pool(fn, *args):
+    executor, slots = _get_executor()
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    """`hash_password` on the bounded hashing pool; raises PasswordHasherBusy when saturated."""
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` on the bounded hashing pool; raises PasswordHasherBusy when saturated."""
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+
+def shutdown_hasher() -> None:
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor, _slots = None, None
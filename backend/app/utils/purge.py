@@ -0,0 +1,161 @@
+"""Background purges of large object graphs.
+
+A purge is a `purge_jobs` row naming what to delete (`kind`, `target_id`).
+A worker claims the job with a guarded UPDATE, then calls the kind's step
+function repeatedly; each step deletes at most PURGE_BATCH_SIZE rows and
+is committed together with the job's progress, so locks are held for one
+batch only and a crashed worker's job is resumed where it stopped (steps
+are idempotent: they delete whatever is left). Jobs whose heartbeat
+(`updated_at`) is older than PURGE_STALE_SECONDS are taken over.
+"""
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.purge import PurgeJob
+
+# step(db, target_id, batch_size) -> (rows deleted, finished); must not commit
+PurgeStep = Callable[[Session, int, int], Tuple[int, bool]]
+
+
+def _account_step(db: Session, target_id: int, batch_size: int) -> Tuple[int, bool]:
+    from app.accounts.service import AccountService
+    return AccountService.purge_step(db, target_id, batch_size)
+
+
+def _user_step(db: Session, target_id: int, batch_size: int) -> Tuple[int, bool]:
+    from app.users.service import UserService
+    return UserService.purge_step(db, target_id, batch_size)
+
+
+_STEPS: Dict[str, PurgeStep] = {
+    "account": _account_step,
+    "user": _user_step,
+}
+
+
+def delete_batch(db: Session, model, condition, batch_size: int) -> int:
+    """Delete up to `batch_size` rows of `model` matching `condition`; returns the count."""
+    ids = select(model.id).where(condition).limit(batch_size).scalar_subquery()
+    result = db.execute(
+        delete(model).where(model.id.in_(ids)),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount or 0
+
+
+def enqueue(db: Session, kind: str, target_id: int, requested_by: Optional[int] = None) -> PurgeJob:
+    """Add a pending job (or return the unfinished one for the same target). Does not commit."""
+    if kind not in _STEPS:
+        raise ValueError(f"Unknown purge kind: {kind}")
+    job = (
+        db.query(PurgeJob)
+        .filter(PurgeJob.kind == kind, PurgeJob.target_id == target_id, PurgeJob.status.in_(("pending", "running")))
+        .first()
+    )
+    if job is None:
+        job = PurgeJob(kind=kind, target_id=target_id, requested_by=requested_by, status="pending",
+                       rows_deleted=0, batches=0, updated_at=datetime.utcnow())
+        db.add(job)
+        db.flush()
+    return job
+
+
+def _claim(db: Session, job_id: int) -> bool:
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.PURGE_STALE_SECONDS)
+    result = db.execute(
+        update(PurgeJob)
+        .where(
+            PurgeJob.id == job_id,
+            or_(
+                PurgeJob.status == "pending",
+                (PurgeJob.status == "running") & (PurgeJob.updated_at < stale),
+            ),
+        )
+        .values(status="running", updated_at=now)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def run_purge_job(job_id: int, batch_size: Optional[int] = None) -> Optional[dict]:
+    """Claim and run one job to completion. Returns its final progress, or None if not claimed."""
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        if not _claim(db, job_id):
+            return None
+        job = db.get(PurgeJob, job_id)
+        step = _STEPS[job.kind]
+        finished = False
+        while not finished:
+            try:
+                deleted, finished = step(db, job.target_id, batch_size)
+                job.rows_deleted += deleted
+                job.batches += 1
+                job.updated_at = datetime.utcnow()
+                if finished:
+                    job.status = "done"
+                    job.finished_at = job.updated_at
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                job.status = "failed"
+                job.error = str(e)[:2000]
+                job.updated_at = datetime.utcnow()
+                db.commit()
+                print(f"Purge job {job_id} ({job.kind} {job.target_id}) failed:", e)
+                break
+        return progress(job)
+    finally:
+        db.close()
+
+
+def run_pending_purges() -> int:
+    """Run every pending (or stale running) job; returns how many this worker completed."""
+    db = SessionLocal()
+    try:
+        stale = datetime.utcnow() - timedelta(seconds=settings.PURGE_STALE_SECONDS)
+        job_ids = [
+            r[0] for r in db.execute(
+                select(PurgeJob.id)
+                .where(or_(
+                    PurgeJob.status == "pending",
+                    (PurgeJob.status == "running") & (PurgeJob.updated_at < stale),
+                ))
+                .order_by(PurgeJob.id)
+            )
+        ]
+    finally:
+        db.close()
+    done = 0
+    for job_id in job_ids:
+        result = run_purge_job(job_id)
+        if result and result["status"] == "done":
+            done += 1
+    return done
+
+
+def start_purge(job_id: int):
+    """Run a just-committed job on a background thread instead of waiting for the sweep."""
+    threading.Thread(target=run_purge_job, args=(job_id,), daemon=True).start()
+
+
+def progress(job: PurgeJob) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "target_id": job.target_id,
+        "status": job.status,
+        "rows_deleted": int(job.rows_deleted or 0),
+        "batches": job.batches or 0,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
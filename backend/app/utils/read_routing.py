@@ -0,0 +1,91 @@
+"""Read-your-writes stickiness for replica reads.
+
+After a successful write (any method but GET/HEAD/OPTIONS answered below
+400) the caller's reads go to the primary for READ_YOUR_WRITES_SECONDS,
+so a listing fetched right after a change never comes from a replica that
+has not replayed it yet. Two signals, either of which pins reads:
+
+- this worker remembers the writer's user id (from the bearer token);
+- the response carries `X-Primary-Until` (epoch seconds), which the
+  frontend echoes on its next requests, so the pin holds on every worker.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+
+PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+
+_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+_MAX_TRACKED = 10000
+
+_recent_writes: Dict[int, float] = {}
+_lock = threading.Lock()
+
+
+def _token_user_id(headers: Headers) -> Optional[int]:
+    auth = headers.get("authorization") or ""
+    if not auth.lower().startswith("bearer "):
+        return None
+    from app.utils.jwt_handler import verify_token
+    payload = verify_token(auth[7:].strip())
+    try:
+        return int(payload["sub"]) if payload else None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def note_write(headers: Headers) -> float:
+    """Pin the caller's reads to the primary; returns until when (epoch seconds)."""
+    until = time.time() + settings.READ_YOUR_WRITES_SECONDS
+    user_id = _token_user_id(headers)
+    if user_id is not None:
+        with _lock:
+            if len(_recent_writes) >= _MAX_TRACKED:
+                now = time.time()
+                for uid in [u for u, t in _recent_writes.items() if t <= now]:
+                    del _recent_writes[uid]
+            _recent_writes[user_id] = until
+    return until
+
+
+def reads_from_primary(headers: Headers) -> bool:
+    """True if the caller wrote within the stickiness window."""
+    now = time.time()
+    try:
+        if float(headers.get(PRIMARY_UNTIL_HEADER) or 0) > now:
+            return True
+    except ValueError:
+        pass
+    user_id = _token_user_id(headers)
+    if user_id is None:
+        return False
+    with _lock:
+        return _recent_writes.get(user_id, 0) > now
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware recording successful writes (see `note_write`).
+
+    Plain ASGI rather than BaseHTTPMiddleware so streaming responses (SSE)
+    pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = note_write(Headers(scope=scope))
+                MutableHeaders(scope=message).append(PRIMARY_UNTIL_HEADER, f"{until:.3f}")
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
@@ -0,0 +1,78 @@
+"""Schema facts that code branches on, read from the catalog once per process.
+
+The first caller loads them (startup stays free of catalog queries); after
+that nothing here touches the catalog again.
+"""
+import threading
+from contextlib import nullcontext
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from app.database import engine
+
+# (table, column) foreign keys whose ON DELETE CASCADE the code relies on
+_CASCADE_CANDIDATES = (
+    ("transactions", "account_id"),
+    ("bills", "account_id"),
+)
+_COLUMN_TABLES = ("bills", "accounts", "users")
+
+
+class SchemaFacts:
+    def __init__(self, columns: Dict[str, FrozenSet[str]], cascades: Set[Tuple[str, str]]):
+        self.columns = columns
+        self.cascades = frozenset(cascades)
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in self.columns.get(table, ())
+
+    def cascades_on_delete(self, table: str, column: str) -> bool:
+        return (table, column) in self.cascades
+
+    def __repr__(self):
+        return f"<SchemaFacts(cascades={sorted(self.cascades)})>"
+
+
+_facts: Optional[SchemaFacts] = None
+_lock = threading.Lock()
+
+
+def _foreign_keys_enforced(conn) -> bool:
+    if conn.dialect.name != "sqlite":
+        return True
+    # SQLite ignores foreign keys (and so cascades) unless the pragma is on
+    return bool(conn.execute(text("PRAGMA foreign_keys")).scalar())
+
+
+def load_schema_facts(bind=None) -> SchemaFacts:
+    """(Re)load the facts through `bind`: an engine (default: the app's) or an open connection."""
+    global _facts
+    bind = bind or engine
+    with (nullcontext(bind) if isinstance(bind, Connection) else bind.connect()) as conn:
+        inspector = inspect(conn)
+        tables = set(inspector.get_table_names())
+        columns = {
+            t: frozenset(c["name"] for c in inspector.get_columns(t))
+            for t in _COLUMN_TABLES if t in tables
+        }
+        cascades = set()
+        if _foreign_keys_enforced(conn):
+            for table, column in _CASCADE_CANDIDATES:
+                if table not in tables:
+                    continue
+                for fk in inspector.get_foreign_keys(table):
+                    ondelete = (fk.get("options") or {}).get("ondelete") or ""
+                    if fk.get("constrained_columns") == [column] and ondelete.upper() == "CASCADE":
+                        cascades.add((table, column))
+    with _lock:
+        _facts = SchemaFacts(columns, cascades)
+    return _facts
+
+
+def schema_facts() -> SchemaFacts:
+    facts = _facts
+    if facts is None:
+        facts = load_schema_facts()
+    return facts
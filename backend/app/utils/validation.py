@@ -7,7 +7,7 @@ from app.models.user import User
 
 
 def validate_user_ids(db: Session, user_ids: Iterable[int]) -> bool:
-    """Ensure all provided user IDs exist in the database.
+    """Ensure all provided user IDs exist in the database (erased users do not).
 
     Raises HTTPException(status 422) if any ids are missing.
     Returns True on success.
@@ -16,7 +16,7 @@ def validate_user_ids(db: Session, user_ids: Iterable[int]) -> bool:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="user_ids must contain at least one id")
 
     # Query existing ids
-    rows = db.query(User.id).filter(User.id.in_(list(user_ids))).all()
+    rows = db.query(User.id).filter(User.id.in_(list(user_ids)), User.deleted_at.is_(None)).all()
     existing = {r[0] for r in rows}
 
     missing = [uid for uid in user_ids if uid not in existing]
@@ -1,5 +1,5 @@
 """
-Ensure the Postgres database exists and create tables using SQLAlchemy metadata.
+Ensure the Postgres database exists and bring its schema to the latest Alembic revision.
 Run from workspace root with your Python environment:
 
 PowerShell example:
@@ -8,7 +8,7 @@ C:/Users/ASUS/AppData/Local/Microsoft/WindowsApps/python3.11.exe backend/ensure_
 This script will:
 - Read `DATABASE_URL` from `app.config.settings` or use the default in config.py
 - Connect to the server's `postgres` database and create the target DB if missing
-- Use SQLAlchemy `Base.metadata.create_all` to create tables
+- Run `alembic upgrade head` (the same step every deploy runs before starting the app)
 """
 import sys
 import time
@@ -16,9 +16,8 @@ from urllib.parse import urlparse
 
 try:
     from app.config import settings
-    from app.database import Base
 except Exception as e:
-    print('Could not import app settings or Base:', e)
+    print('Could not import app settings:', e)
     print('Make sure you run this from the project root where `backend` is on sys.path.')
     sys.exit(1)
 
@@ -70,15 +69,17 @@ except Exception as e:
 # Wait a moment for server to register new DB
 time.sleep(1)
 
-# Create tables using SQLAlchemy
+# Create / upgrade tables through the migration chain
 try:
-    from sqlalchemy import create_engine
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-    print('Creating tables (if not exist) using Base.metadata.create_all...')
-    Base.metadata.create_all(bind=engine)
-    print('Tables created / ensured')
+    from pathlib import Path
+    from alembic import command
+    from alembic.config import Config
+    alembic_cfg = Config(str(Path(__file__).resolve().parent / 'alembic.ini'))
+    print('Applying migrations (alembic upgrade head)...')
+    command.upgrade(alembic_cfg, 'head')
+    print('Schema is up to date')
 except Exception as e:
-    print('Error creating tables:', e)
+    print('Error applying migrations:', e)
     sys.exit(1)
 
 print('Done')
@@ -0,0 +1,129 @@
+"""Login throughput benchmark.
+
+Local mode (default) measures Argon2 verification through the hashing pool
+with the configured ARGON2_* parameters, for increasing pool sizes, and
+reports logins/second overall and per pool thread (one thread per core
+is the intended sizing):
+
+    python scripts/bench_login.py --seconds 5 --workers 1,2,4
+
+HTTP mode drives POST /api/auth/login on a running server with N
+concurrent clients (the account must exist) and reports throughput,
+latency percentiles and how many requests were shed with 429:
+
+    python scripts/bench_login.py --url http://localhost:8000 \
+        --email bench@example.com --password secret --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# ensure project root is on path so `app` package can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def bench_local(seconds: float, worker_counts):
+    from app.config import settings
+    from app.utils import password_hash as ph
+
+    hashed = ph.hash_password("benchmark-password")
+    print(f"argon2 t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST}KiB "
+          f"p={settings.ARGON2_PARALLELISM}, {os.cpu_count()} CPUs")
+
+    for workers in worker_counts:
+        ph.shutdown_hasher()
+        settings.PASSWORD_HASH_WORKERS = workers
+        settings.PASSWORD_HASH_MAX_PENDING = workers * 4
+
+        async def run():
+            done = 0
+            deadline = time.perf_counter() + seconds
+
+            async def client():
+                nonlocal done
+                while time.perf_counter() < deadline:
+                    await ph.verify_password_async("benchmark-password", hashed)
+                    done += 1
+
+            await asyncio.gather(*(client() for _ in range(workers * 2)))
+            return done
+
+        start = time.perf_counter()
+        done = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed
+        print(f"workers={workers:<3} logins/s={rate:8.1f}  per worker={rate / workers:6.1f}  "
+              f"ms/login={1000 * elapsed * workers / max(done, 1):6.1f}")
+    ph.shutdown_hasher()
+
+
+def bench_http(url: str, email: str, password: str, concurrency: int, seconds: float):
+    body = json.dumps({"email": email, "password": password}).encode("utf-8")
+    endpoint = url.rstrip("/") + "/api/auth/login"
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        latencies, shed, errors = [], 0, 0
+        while time.perf_counter() < deadline:
+            req = urllib.request.Request(endpoint, data=body, headers={"Content-Type": "application/json"})
+            t0 = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req, timeout=30) as resp:
+                    resp.read()
+                latencies.append(time.perf_counter() - t0)
+            except urllib.error.HTTPError as e:
+                if e.code == 429:
+                    shed += 1
+                else:
+                    errors += 1
+            except Exception:
+                errors += 1
+        return latencies, shed, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: client(), range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for r in results for l in r[0])
+    shed = sum(r[1] for r in results)
+    errors = sum(r[2] for r in results)
+    ok = len(latencies)
+
+    def pct(p):
+        return 1000 * latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+    print(f"ok={ok} shed(429)={shed} errors={errors} in {elapsed:.1f}s")
+    print(f"logins/s={ok / elapsed:.1f}  p50={pct(0.50):.0f}ms  p95={pct(0.95):.0f}ms  p99={pct(0.99):.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", default=None, help="comma-separated pool sizes (local mode)")
+    parser.add_argument("--url", help="base URL of a running server (HTTP mode)")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.email or not args.password:
+            parser.error("--email and --password are required with --url")
+        bench_http(args.url, args.email, args.password, args.concurrency, args.seconds)
+        return
+
+    cpus = os.cpu_count() or 1
+    counts = [int(w) for w in args.workers.split(",")] if args.workers else sorted({1, max(1, cpus // 2), cpus})
+    bench_local(args.seconds, counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Index audit: EXPLAIN the hot service queries against a seeded dataset.
+
+Seeds users with accounts, transactions, bills, budgets, rewards,
+notifications, alerts, ledger entries and refresh tokens inside one
+transaction, calls each service function while recording the SQL it
+issues, EXPLAINs every statement and finally rolls everything back.
+A query fails the check when its plan reads a table sequentially:
+
+- PostgreSQL: `enable_seqscan` is turned off for the transaction, so a
+  Seq Scan that is still planned means no usable index exists (the result
+  does not depend on how large the seeded dataset is);
+- SQLite: a `SCAN <table>` step that does not use an index.
+
+Run it against a database migrated to head; it exits 1 on failures:
+
+    python scripts/check_indexes.py --users 50 --transactions 40
+"""
+import argparse
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+
+# ensure project root is on path so `app` package can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.database import Base, engine  # noqa: E402
+from app.models.account import Account  # noqa: E402
+from app.models.alert import Alert, AlertRule  # noqa: E402
+from app.models.bill import Bill  # noqa: E402
+from app.models.budget import Budget  # noqa: E402
+from app.models.reward import Reward, RewardPointsEntry  # noqa: E402
+from app.models.transaction import Transaction  # noqa: E402
+from app.models.user import RefreshToken, User  # noqa: E402
+from app.notifications.models import Notification  # noqa: E402
+from app.utils.schema import load_schema_facts  # noqa: E402
+
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+def seed(conn, users: int, accounts_per_user: int, txns_per_account: int) -> dict:
+    """Insert the dataset; returns the ids the checks query for."""
+    tag = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+
+    user_ids = conn.execute(
+        insert(User).returning(User.id),
+        [{"name": f"Index check {i}", "email": f"index-check-{tag}-{i}@example.invalid",
+          "password": "!", "role": "user"} for i in range(users)],
+    ).scalars().all()
+    accounts = conn.execute(
+        insert(Account).returning(Account.id, Account.user_id),
+        [{"user_id": uid, "bank_name": "Index Bank", "account_type": "checking", "masked_account": "****0000",
+          "currency": "USD", "balance": 1000} for uid in user_ids for _ in range(accounts_per_user)],
+    ).all()
+    txn_ids = conn.execute(
+        insert(Transaction).returning(Transaction.id),
+        [{"account_id": a.id, "description": "seed", "category": f"cat{n % 5}", "amount": n + 1,
+          "currency": "USD", "txn_type": "debit" if n % 3 else "credit", "merchant": f"merchant{n % 7}",
+          "txn_date": now - timedelta(days=n), "created_at": now - timedelta(days=n)}
+         for a in accounts for n in range(txns_per_account)],
+    ).scalars().all()
+    conn.execute(insert(Bill), [
+        {"user_id": a.user_id, "account_id": a.id, "biller_name": f"Biller {n}",
+         "due_date": (now + timedelta(days=10 * n - 15)).date(), "amount_due": 50,
+         "status": "paid" if n % 2 else "upcoming"}
+        for a in accounts for n in range(4)
+    ])
+    conn.execute(insert(Budget), [
+        {"user_id": uid, "month": m, "year": now.year, "category": f"cat{c}", "limit_amount": 500, "spent_amount": 0}
+        for uid in user_ids for m in range(1, 13) for c in range(3)
+    ])
+    reward_ids = conn.execute(
+        insert(Reward).returning(Reward.id),
+        [{"user_id": uid, "program_name": f"program{p}", "points_balance": 100}
+         for uid in user_ids for p in range(2)],
+    ).scalars().all()
+    conn.execute(insert(RewardPointsEntry), [
+        {"user_id": uid, "program_name": "program0", "reward_id": reward_ids[0], "entry_type": "earn",
+         "points": 10, "balance_after": 10 * (n + 1), "created_at": now - timedelta(days=n)}
+        for uid in user_ids for n in range(10)
+    ])
+    conn.execute(insert(Notification), [
+        {"user_id": uid, "type": "bill_reminder", "title": f"Notice {n}", "message": "seed",
+         "sent": n > 2, "read": n > 5, "created_at": now - timedelta(hours=n)}
+        for uid in user_ids for n in range(20)
+    ])
+    rule_ids = conn.execute(
+        insert(AlertRule).returning(AlertRule.id),
+        [{"user_id": a.user_id, "rule_type": "large_transaction", "threshold": 100, "account_id": a.id,
+          "enabled": True} for a in accounts],
+    ).scalars().all()
+    conn.execute(insert(Alert), [
+        {"user_id": a.user_id, "rule_id": rule_ids[i], "transaction_id": txn_ids[i * txns_per_account],
+         "type": "large_transaction", "message": "seed"}
+        for i, a in enumerate(accounts)
+    ])
+    conn.execute(insert(RefreshToken), [
+        {"jti_hash": uuid.uuid4().hex * 2, "family_id": uuid.uuid4().hex, "user_id": uid,
+         "expires_at": now + timedelta(days=7)}
+        for uid in user_ids for _ in range(3)
+    ])
+
+    user_accounts = [a.id for a in accounts if a.user_id == user_ids[0]]
+    return {
+        "user_id": user_ids[0],
+        "account_id": user_accounts[0],
+        # purged last, after every read check ran
+        "purge_account_id": user_accounts[-1],
+        "purge_user_id": user_ids[-1],
+    }
+
+
+def service_calls(ids: dict, now: datetime) -> List[Tuple[str, Callable[[Session], object]]]:
+    from app.accounts.service import AccountService
+    from app.alerts.service import AlertService
+    from app.bills.service import BillService
+    from app.budgets.service import BudgetService
+    from app.notifications import delivery
+    from app.notifications.service import NotificationService
+    from app.rewards import ledger
+    from app.rewards.service import RewardService
+    from app.transactions.service import TransactionService
+    from app.users.service import UserService
+
+    uid, account_id = ids["user_id"], ids["account_id"]
+    everything = 10 ** 9
+    return [
+        ("accounts: list", lambda db: AccountService.get_user_accounts(db, uid)),
+        ("accounts: summary", lambda db: AccountService.get_account_summaries(db, uid, now)),
+        ("transactions: account page", lambda db: TransactionService.get_account_transactions(db, account_id)),
+        ("transactions: user page", lambda db: TransactionService.get_user_transactions(db, uid)),
+        ("bills: list", lambda db: BillService.get_bills_for_user(db, uid)),
+        # as in notifications.scheduler.run_checks_once
+        ("bills: reminder sweep", lambda db: db.query(Bill).filter(
+            Bill.status != 'paid', Bill.due_date <= now.date() + timedelta(days=3)).all()),
+        ("budgets: month", lambda db: BudgetService.get_user_budgets(db, uid, now.month, now.year)),
+        ("rewards: list", lambda db: RewardService.get_rewards_for_user(db, uid)),
+        ("rewards: points history", lambda db: ledger.get_history(db, uid)),
+        ("notifications: page", lambda db: NotificationService.list_notifications_page(db, uid)),
+        ("notifications: unread count", lambda db: NotificationService.count_unread(db, uid)),
+        ("notifications: delivery batch", lambda db: delivery._fetch_batch(db, 0, 100, now)),
+        ("alerts: list", lambda db: AlertService.get_alerts_for_user(db, uid)),
+        ("alerts: rules", lambda db: AlertService.get_rules_for_user(db, uid)),
+        ("accounts: purge step", lambda db: AccountService.purge_step(db, ids["purge_account_id"], everything)),
+        ("users: purge step", lambda db: UserService.purge_step(db, ids["purge_user_id"], everything)),
+    ]
+
+
+def record(conn, db: Session, call) -> List[Tuple[str, object]]:
+    """Run `call` and return the explainable statements (with parameters) it executed."""
+    statements = []
+
+    def before_cursor_execute(_conn, _cursor, statement, parameters, _context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            statements.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", before_cursor_execute)
+    try:
+        call(db)
+    finally:
+        event.remove(conn, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+def table_scans(conn, statement: str, parameters) -> List[str]:
+    """EXPLAIN `statement`; returns the sequential table scans in its plan."""
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        return [
+            f"Seq Scan on {n.get('Relation Name')}"
+            for n in _plan_nodes(plan[0]["Plan"])
+            if n["Node Type"] == "Seq Scan"
+        ]
+    scans = []
+    for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all():
+        detail = row[-1]
+        match = re.match(r"SCAN (\w+)$", detail)
+        if match and match.group(1) in Base.metadata.tables:
+            scans.append(detail)
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--accounts", type=int, default=3, help="accounts per user")
+    parser.add_argument("--transactions", type=int, default=40, help="transactions per account")
+    args = parser.parse_args()
+    if args.users < 2:
+        parser.error("--users must be at least 2")
+
+    engine.echo = False
+    now = datetime.utcnow()
+    failures = 0
+    with engine.connect() as conn:
+        outer = conn.begin()
+        try:
+            # the purge steps consult the schema facts; load them on this connection
+            # before seeding (on SQLite a second connection would wait on the seed's write lock)
+            load_schema_facts(conn)
+            ids = seed(conn, args.users, args.accounts, args.transactions)
+            if conn.dialect.name == "postgresql":
+                for table in Base.metadata.tables:
+                    conn.exec_driver_sql(f"ANALYZE {table}")
+                conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+            # the session joins the outer transaction, which is always rolled back
+            db = Session(bind=conn)
+            for label, call in service_calls(ids, now):
+                statements = record(conn, db, call)
+                problems = [
+                    (scan, statement)
+                    for statement, parameters in statements
+                    for scan in table_scans(conn, statement, parameters)
+                ]
+                if not statements:
+                    print(f"SKIP {label}: no statements (cached?)")
+                elif problems:
+                    failures += 1
+                    print(f"FAIL {label}")
+                    for scan, statement in problems:
+                        print(f"     {scan}\n     in: {' '.join(statement.split())[:200]}")
+                else:
+                    print(f"ok   {label} ({len(statements)} statements)")
+            db.close()
+        finally:
+            outer.rollback()
+
+    print(f"{failures} of the checked queries scan a table" if failures else "all checked queries use indexes")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
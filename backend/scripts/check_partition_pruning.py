@@ -0,0 +1,183 @@
+"""Partition pruning check for the monthly `transactions` partitions (PostgreSQL).
+
+Seeds one account with a transaction on every day of the last --months
+months inside one transaction, creates their partitions, calls the
+transaction listings with and without a txn_date range while recording
+the SQL they issue, EXPLAINs every statement and finally rolls everything
+back. A ranged listing fails the check when its plan reads any partition
+other than the months the range covers (the default partition included);
+the listing without a range must read every seeded month inside
+TRANSACTION_LIST_DEFAULT_DAYS, or all of them when it is 0 (which shows the
+check sees through the partition tree), and none older.
+
+Run it against a database migrated to head; it exits 1 on failures and
+2 when `transactions` is not partitioned (e.g. SQLite):
+
+    python scripts/check_partition_pruning.py --months 6
+"""
+import argparse
+import importlib
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Set
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+# ensure project root is on path so `app` package can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import MODELS  # noqa: E402
+from app.models.account import Account  # noqa: E402
+from app.models.transaction import Transaction  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.transactions.partitions import (  # noqa: E402
+    DEFAULT_PARTITION, add_months, create_partition, is_partitioned, month_start, partition_name,
+)
+
+
+def as_datetime(month) -> datetime:
+    return datetime(month.year, month.month, 1)
+
+
+def seed(conn, months: int, now: datetime) -> dict:
+    """Insert a user and an account with daily transactions; returns their ids."""
+    tag = uuid.uuid4().hex[:8]
+    user_id = conn.execute(
+        insert(User).returning(User.id),
+        {"name": "Partition check", "email": f"partition-check-{tag}@example.invalid", "password": "!", "role": "user"},
+    ).scalar()
+    account_id = conn.execute(
+        insert(Account).returning(Account.id),
+        {"user_id": user_id, "bank_name": "Partition Bank", "account_type": "checking",
+         "masked_account": "****0000", "currency": "USD", "balance": 1000},
+    ).scalar()
+    first = add_months(month_start(now), 1 - months)
+    days = (now - as_datetime(first)).days + 1
+    conn.execute(insert(Transaction), [
+        {"account_id": account_id, "description": "seed", "category": "cat", "amount": n + 1, "currency": "USD",
+         "txn_type": "debit", "merchant": "merchant", "txn_date": now - timedelta(days=n),
+         "created_at": now - timedelta(days=n)}
+        for n in range(days)
+    ])
+    return {"user_id": user_id, "account_id": account_id}
+
+
+def record(conn, db: Session, call) -> List[tuple]:
+    """Run `call` and return the SELECT statements (with parameters) it executed."""
+    statements = []
+
+    def before_cursor_execute(_conn, _cursor, statement, parameters, _context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", before_cursor_execute)
+    try:
+        call(db)
+    finally:
+        event.remove(conn, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+def partitions_read(conn, statement: str, parameters) -> Set[str]:
+    """EXPLAIN `statement`; returns the transactions partitions its plan reads."""
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    return {
+        n["Relation Name"]
+        for n in _plan_nodes(plan[0]["Plan"])
+        if n.get("Relation Name", "").startswith("transactions_")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months", type=int, default=6, help="months of history to seed")
+    args = parser.parse_args()
+    if args.months < 3:
+        parser.error("--months must be at least 3")
+
+    # every mapped class, so relationships resolve
+    for module in MODELS:
+        importlib.import_module(module)
+    from app.transactions.service import TransactionService
+
+    engine.echo = False
+    now = datetime.utcnow()
+    failures = 0
+    with engine.connect() as conn:
+        outer = conn.begin()
+        try:
+            # the session joins the outer transaction, which is always rolled back
+            db = Session(bind=conn)
+            if not is_partitioned(db):
+                print("transactions is not partitioned here (PostgreSQL at alembic head required)")
+                sys.exit(2)
+            months = [add_months(month_start(now), -n) for n in range(args.months)]
+            for month in months:
+                create_partition(db, month)
+            ids = seed(conn, args.months, now)
+            conn.exec_driver_sql("ANALYZE transactions")
+
+            uid, account_id = ids["user_id"], ids["account_id"]
+            last, previous, oldest = months[0], months[1], months[-1]
+            checks = [
+                ("account page, this month", {partition_name(last)},
+                 lambda db: TransactionService.get_account_transactions(
+                     db, account_id, since=as_datetime(last), until=as_datetime(add_months(last, 1)))),
+                ("account page, last two months", {partition_name(previous), partition_name(last)},
+                 lambda db: TransactionService.get_account_transactions(
+                     db, account_id, since=as_datetime(previous), until=as_datetime(add_months(last, 1)))),
+                ("user page, oldest month", {partition_name(oldest)},
+                 lambda db: TransactionService.get_user_transactions(
+                     db, uid, since=as_datetime(oldest), until=as_datetime(add_months(oldest, 1)))),
+            ]
+            for label, expected, call in checks:
+                read = set()
+                for statement, parameters in record(conn, db, call):
+                    read |= partitions_read(conn, statement, parameters)
+                if read == expected:
+                    print(f"ok   {label}: {', '.join(sorted(read))}")
+                else:
+                    failures += 1
+                    print(f"FAIL {label}\n     expected {sorted(expected)}\n     read     {sorted(read)}")
+
+            # without `since` the listing covers TRANSACTION_LIST_DEFAULT_DAYS: every
+            # seeded month inside that window is read, nothing older
+            read = set()
+            for statement, parameters in record(
+                    conn, db, lambda db: TransactionService.get_account_transactions(db, account_id)):
+                read |= partitions_read(conn, statement, parameters)
+            window = settings.TRANSACTION_LIST_DEFAULT_DAYS
+            oldest_read = month_start(now - timedelta(days=window)) if window > 0 else None
+            expected = {partition_name(m) for m in months if oldest_read is None or m >= oldest_read}
+            too_old = {
+                name for name in read
+                if oldest_read is not None and name != DEFAULT_PARTITION and name < partition_name(oldest_read)
+            }
+            if expected - read or too_old:
+                failures += 1
+                print(f"FAIL account page, default window\n     missing {sorted(expected - read)}"
+                      f"\n     older than the window {sorted(too_old)}")
+            else:
+                print(f"ok   account page, default window: {len(read)} partitions")
+            db.close()
+        finally:
+            outer.rollback()
+
+    print(f"{failures} of the checked queries read partitions outside their range"
+          if failures else "all ranged queries are pruned to their months")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
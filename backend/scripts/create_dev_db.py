@@ -0,0 +1,39 @@
+"""Create a throwaway development database straight from the models.
+
+The Alembic chain targets PostgreSQL; for a local SQLite file this creates
+every table from the SQLAlchemy models and stamps the database at the
+current head, so a later `alembic upgrade head` has nothing to replay:
+
+    DATABASE_URL=sqlite:///./banking.db python scripts/create_dev_db.py
+
+Never point this at a shared database: use `alembic upgrade head` there.
+"""
+import sys
+from pathlib import Path
+
+# ensure project root is on path so `app` package can be imported
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def main():
+    from alembic import command
+    from alembic.config import Config
+
+    from app.database import Base, engine
+    from app.main import create_app
+
+    # building the app imports every router, registering every model on Base.metadata
+    create_app(profile="all", routers="")
+
+    if engine.dialect.name == "postgresql":
+        print("Refusing to create_all on PostgreSQL; run `alembic upgrade head` instead.")
+        return 1
+    Base.metadata.create_all(bind=engine)
+    command.stamp(Config(str(ROOT / "alembic.ini")), "head")
+    print("Created tables and stamped head on", engine.url)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Worker boot profile.
+
+Boots the app the way a worker does (import `app.main`, `create_app()`,
+startup hooks) in a fresh interpreter with `-X importtime`, then reports:
+
+- the boot phases recorded on `app.state.boot` (import, app creation with
+  a per-router breakdown, startup hooks);
+- import time per top-level package (fastapi, sqlalchemy, app...), summing
+  each module's own time, so a package is not charged for what it imports;
+- the slowest `app.*` modules by cumulative and by self import time.
+
+    python scripts/profile_startup.py --top 15
+    python scripts/profile_startup.py --profile ingestion   # one deployment role
+
+Background loops only start their threads during the profile: they wait
+BACKGROUND_START_DELAY_SECONDS before touching the database, and the
+profiled interpreter exits long before that.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_BOOT = (
+    "import asyncio, json\n"
+    "from app.config import settings\n"
+    "from app.main import create_app\n"
+    "app = create_app()\n"
+    "asyncio.run(app.router.startup())\n"
+    "print('BOOT ' + json.dumps(dict(app.state.boot, budget_seconds=settings.BOOT_TIME_BUDGET_SECONDS)))\n"
+)
+
+
+def parse_importtime(stderr: str):
+    """Yield (depth, self_us, cumulative_us, module) from `-X importtime` output."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        yield depth, int(self_us), int(cumulative_us), name.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=10, help="rows per table")
+    parser.add_argument("--profile", help="deployment role to boot (default: APP_PROFILE)")
+    parser.add_argument("--routers", help="comma-separated router tags (default: APP_ROUTERS)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    if args.profile:
+        env["APP_PROFILE"] = args.profile
+    if args.routers is not None:
+        env["APP_ROUTERS"] = args.routers
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _BOOT],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    boot_lines = [l for l in proc.stdout.splitlines() if l.startswith("BOOT ")]
+    if proc.returncode != 0 or not boot_lines:
+        print(proc.stdout[-2000:])
+        print(proc.stderr[-4000:])
+        return 1
+    boot = json.loads(boot_lines[-1][len("BOOT "):])
+    imports = list(parse_importtime(proc.stderr))
+
+    print(f"profile {boot['profile']}: boot total {boot['total_seconds']:.3f}s  (budget {boot['budget_seconds']}s)")
+    print(f"  import app.main   {boot['import_seconds']:.3f}s")
+    print(f"  create_app()      {boot['create_app_seconds']:.3f}s")
+    for tag, seconds in sorted(boot["routers"].items(), key=lambda kv: kv[1], reverse=True):
+        print(f"    router {tag:<14} {seconds:.3f}s")
+    print(f"  startup hooks     {boot['startup_seconds']:.3f}s")
+
+    packages = defaultdict(int)
+    for _depth, self_us, _cumulative_us, name in imports:
+        packages[name.split(".")[0]] += self_us
+    print("\nimport time by top-level package")
+    for name, us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {us / 1e6:7.3f}s  {name}")
+
+    own = [i for i in imports if i[3] == "app" or i[3].startswith("app.")]
+    print("\napp modules by cumulative import time")
+    for _depth, _self_us, cumulative_us, name in sorted(own, key=lambda i: i[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1e6:7.3f}s  {name}")
+    print("\napp modules by self import time")
+    for _depth, self_us, _cumulative_us, name in sorted(own, key=lambda i: i[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1e6:7.3f}s  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -46,3 +46,21 @@ export const deleteAccount = async (accountId) => {
     throw error.response?.data || error.message;
   }
 };
+
+export const getNetWorth = async (base = "USD") => {
+  try {
+    const response = await axiosClient.get("/accounts/net-worth", { params: { base } });
+    return response.data;
+  } catch (error) {
+    throw error.response?.data || error.message;
+  }
+};
+
+export const getFxRates = async (base = "USD") => {
+  try {
+    const response = await axiosClient.get("/accounts/fx-rates", { params: { base } });
+    return response.data;
+  } catch (error) {
+    throw error.response?.data || error.message;
+  }
+};
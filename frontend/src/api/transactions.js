@@ -1,10 +1,12 @@
 import axiosClient from "../utils/axiosClient";
 
-export const getTransactions = async (accountId, skip = 0, limit = 100) => {
+// `since`/`until` (ISO datetimes) bound txn_date; without them the API
+// returns all history (unless TRANSACTION_LIST_DEFAULT_DAYS is set)
+export const getTransactions = async (accountId, skip = 0, limit = 100, { since, until } = {}) => {
   try {
     const response = await axiosClient.get(
       `/transactions/${accountId}`,
-      { params: { skip, limit } }
+      { params: { skip, limit, since, until } }
     );
     return response.data;
   } catch (error) {
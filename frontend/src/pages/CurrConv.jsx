@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { ArrowRightLeft, RefreshCw, TrendingUp } from 'lucide-react';
+import { getFxRates } from '../api/accounts';
 
 export default function CurrencyConverter() {
   const [amount, setAmount] = useState('1');
@@ -11,6 +12,8 @@ export default function CurrencyConverter() {
   const [error, setError] = useState(null);
   const [currencies, setCurrencies] = useState([]);
   const [lastUpdated, setLastUpdated] = useState(null);
+  // units per 1 USD, from the server's rate store; cross rates are computed locally
+  const [usdRates, setUsdRates] = useState(null);
 
   const popularCurrencies = [
     { code: 'USD', name: 'US Dollar', symbol: '$' },
@@ -37,14 +40,16 @@ export default function CurrencyConverter() {
     }, 400);
 
     return () => clearTimeout(timer);
-  }, [amount, fromCurrency, toCurrency]);
+  }, [amount, fromCurrency, toCurrency, usdRates]);
 
   const fetchCurrencies = async () => {
     try {
-      const response = await fetch('https://api.exchangerate-api.com/v4/latest/USD');
-      const data = await response.json();
-      const currencyList = Object.keys(data.rates).sort();
-      setCurrencies(currencyList);
+      const data = await getFxRates('USD');
+      const rates = Object.fromEntries(
+        Object.entries(data.rates).map(([code, rate]) => [code, parseFloat(rate)])
+      );
+      setUsdRates(rates);
+      setCurrencies(Object.keys(rates).sort());
     } catch (err) {
       console.error('Failed to fetch currencies:', err);
       setCurrencies(popularCurrencies.map(c => c.code));
@@ -61,13 +66,9 @@ export default function CurrencyConverter() {
     setError(null);
 
     try {
-      const response = await fetch(
-        `https://api.exchangerate-api.com/v4/latest/${fromCurrency}`
-      );
-      const data = await response.json();
-      
-      const rate = data?.rates?.[toCurrency];
-      if (!rate) throw new Error("Rate not found");
+      if (!usdRates) return;
+      const rate = usdRates[toCurrency] / usdRates[fromCurrency];
+      if (!rate || !isFinite(rate)) throw new Error("Rate not found");
       setExchangeRate(rate);
       setConvertedAmount((parseFloat(amount) * rate).toFixed(2));
       setLastUpdated(new Date().toLocaleTimeString());
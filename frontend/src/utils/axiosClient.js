@@ -9,6 +9,11 @@ const axiosClient = axios.create({
   },
 });
 
+// After a write the API answers with X-Primary-Until (epoch seconds); echoing
+// it makes reads until then come from the primary database, not a replica.
+const PRIMARY_UNTIL_HEADER = "X-Primary-Until";
+const PRIMARY_UNTIL_KEY = "primary_until";
+
 axiosClient.interceptors.request.use(
   (config) => {
     const token = localStorage.getItem("access_token");
@@ -16,6 +21,11 @@ axiosClient.interceptors.request.use(
       config.headers = config.headers || {};
       config.headers.Authorization = `Bearer ${token}`;
     }
+    const primaryUntil = Number(localStorage.getItem(PRIMARY_UNTIL_KEY));
+    if (primaryUntil && primaryUntil > Date.now() / 1000) {
+      config.headers = config.headers || {};
+      config.headers[PRIMARY_UNTIL_HEADER] = String(primaryUntil);
+    }
     return config;
   },
   (error) => Promise.reject(error)
@@ -38,7 +48,13 @@ const refreshAccessToken = async () => {
 };
 
 axiosClient.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const primaryUntil = response.headers?.[PRIMARY_UNTIL_HEADER.toLowerCase()];
+    if (primaryUntil) {
+      localStorage.setItem(PRIMARY_UNTIL_KEY, primaryUntil);
+    }
+    return response;
+  },
   async (error) => {
     const originalRequest = error.config;
 